@@ -0,0 +1,85 @@
+"""esquema inicial
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-05-01 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "usuarios",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("nome", sa.String(), nullable=True),
+        sa.Column("email", sa.String(), nullable=True),
+        sa.Column("senha", sa.String(), nullable=True),
+        sa.Column("tipo", sa.String(), nullable=True),
+        sa.Column("cpf", sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("cpf"),
+    )
+    op.create_index("ix_usuarios_id", "usuarios", ["id"])
+    op.create_index("ix_usuarios_nome", "usuarios", ["nome"])
+    op.create_index("ix_usuarios_email", "usuarios", ["email"], unique=True)
+
+    op.create_table(
+        "medicamentos",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("nome", sa.String(), nullable=True),
+        sa.Column("descricao", sa.Text(), nullable=True),
+        sa.Column("dosagem", sa.String(), nullable=True),
+        sa.Column("frequencia", sa.String(), nullable=True),
+        sa.Column("medico_id", sa.Integer(), sa.ForeignKey("usuarios.id"), nullable=True),
+        sa.Column("paciente_id", sa.Integer(), sa.ForeignKey("usuarios.id"), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_medicamentos_id", "medicamentos", ["id"])
+    op.create_index("ix_medicamentos_nome", "medicamentos", ["nome"])
+
+    op.create_table(
+        "consultas",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("data", sa.DateTime(), nullable=True),
+        sa.Column("descricao", sa.Text(), nullable=True),
+        sa.Column("medico_id", sa.Integer(), sa.ForeignKey("usuarios.id"), nullable=True),
+        sa.Column("paciente_id", sa.Integer(), sa.ForeignKey("usuarios.id"), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_consultas_id", "consultas", ["id"])
+
+    op.create_table(
+        "gastos",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("descricao", sa.Text(), nullable=True),
+        sa.Column("valor", sa.Float(), nullable=True),
+        sa.Column("categoria", sa.String(), nullable=True),
+        sa.Column("data", sa.DateTime(), nullable=True),
+        sa.Column("medico_id", sa.Integer(), sa.ForeignKey("usuarios.id"), nullable=True),
+        sa.Column("paciente_id", sa.Integer(), sa.ForeignKey("usuarios.id"), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_gastos_id", "gastos", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_gastos_id", table_name="gastos")
+    op.drop_table("gastos")
+    op.drop_index("ix_consultas_id", table_name="consultas")
+    op.drop_table("consultas")
+    op.drop_index("ix_medicamentos_nome", table_name="medicamentos")
+    op.drop_index("ix_medicamentos_id", table_name="medicamentos")
+    op.drop_table("medicamentos")
+    op.drop_index("ix_usuarios_email", table_name="usuarios")
+    op.drop_index("ix_usuarios_nome", table_name="usuarios")
+    op.drop_index("ix_usuarios_id", table_name="usuarios")
+    op.drop_table("usuarios")
@@ -0,0 +1,49 @@
+"""consolidação mensal de gastos
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-06-01 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.services.gastos_mensais import COLUNAS_CONSOLIDACAO, consolidacao_mensal
+
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    gastos_mensais = op.create_table(
+        "gastos_mensais",
+        sa.Column("paciente_id", sa.Integer(), sa.ForeignKey("usuarios.id"), nullable=False),
+        sa.Column("medico_id", sa.Integer(), sa.ForeignKey("usuarios.id"), nullable=False),
+        sa.Column("mes", sa.String(), nullable=False),
+        sa.Column("categoria", sa.String(), nullable=False),
+        sa.Column("total", sa.Float(), nullable=False),
+        sa.Column("quantidade", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("paciente_id", "medico_id", "mes", "categoria"),
+    )
+
+    # Consolida os gastos já existentes
+    gastos = sa.table(
+        "gastos",
+        sa.column("id", sa.Integer),
+        sa.column("valor", sa.Float),
+        sa.column("categoria", sa.String),
+        sa.column("data", sa.DateTime),
+        sa.column("medico_id", sa.Integer),
+        sa.column("paciente_id", sa.Integer),
+    )
+    op.execute(
+        gastos_mensais.insert().from_select(COLUNAS_CONSOLIDACAO, consolidacao_mensal(gastos))
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("gastos_mensais")
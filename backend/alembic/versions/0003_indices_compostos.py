@@ -0,0 +1,37 @@
+"""índices compostos para os filtros por médico, paciente, categoria e data
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-07-01 00:00:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_usuarios_tipo", "usuarios", ["tipo"])
+    op.create_index("ix_medicamentos_medico_id_id", "medicamentos", ["medico_id", "id"])
+    op.create_index("ix_medicamentos_paciente_id_id", "medicamentos", ["paciente_id", "id"])
+    op.create_index("ix_consultas_medico_id_data", "consultas", ["medico_id", "data"])
+    op.create_index("ix_consultas_paciente_id_data", "consultas", ["paciente_id", "data"])
+    op.create_index("ix_gastos_paciente_id_categoria_data", "gastos", ["paciente_id", "categoria", "data"])
+    op.create_index("ix_gastos_medico_id_data", "gastos", ["medico_id", "data"])
+    op.create_index("ix_gastos_mensais_medico_id_categoria", "gastos_mensais", ["medico_id", "categoria"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_gastos_mensais_medico_id_categoria", table_name="gastos_mensais")
+    op.drop_index("ix_gastos_medico_id_data", table_name="gastos")
+    op.drop_index("ix_gastos_paciente_id_categoria_data", table_name="gastos")
+    op.drop_index("ix_consultas_paciente_id_data", table_name="consultas")
+    op.drop_index("ix_consultas_medico_id_data", table_name="consultas")
+    op.drop_index("ix_medicamentos_paciente_id_id", table_name="medicamentos")
+    op.drop_index("ix_medicamentos_medico_id_id", table_name="medicamentos")
+    op.drop_index("ix_usuarios_tipo", table_name="usuarios")
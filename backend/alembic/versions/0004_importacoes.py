@@ -0,0 +1,34 @@
+"""progresso das importações em lote
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-08-01 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "importacoes",
+        sa.Column("arquivo", sa.String(), nullable=False),
+        sa.Column("tipo", sa.String(), nullable=False),
+        sa.Column("registros", sa.Integer(), nullable=False),
+        sa.Column("inseridos", sa.Integer(), nullable=False),
+        sa.Column("rejeitados", sa.Integer(), nullable=False),
+        sa.Column("concluida", sa.Boolean(), nullable=False),
+        sa.Column("atualizado_em", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("arquivo", "tipo"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("importacoes")
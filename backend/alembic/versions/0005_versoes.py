@@ -0,0 +1,29 @@
+"""contadores de versão por escopo (ETags)
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2025-09-01 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "versoes",
+        sa.Column("escopo", sa.String(), nullable=False),
+        sa.Column("versao", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("escopo"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("versoes")
@@ -0,0 +1,70 @@
+"""busca textual (FTS5) em consultas e medicamentos
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2025-10-01 00:00:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+# rowid no índice: id * 2 para consultas, id * 2 + 1 para medicamentos.
+# A coluna dono ("m<medico_id> p<paciente_id>") é indexada para que o
+# filtro por usuário seja resolvido pelo próprio FTS5.
+DONO = "trim(coalesce('m' || {r}.medico_id, '') || ' ' || coalesce('p' || {r}.paciente_id, ''))"
+TEXTO_CONSULTA = "coalesce({r}.descricao, '')"
+TEXTO_MEDICAMENTO = (
+    "trim(coalesce({r}.nome, '') || ' - ' || coalesce({r}.descricao, '') || ' - ' || "
+    "coalesce({r}.dosagem, '') || ' - ' || coalesce({r}.frequencia, ''))"
+)
+
+ORIGENS = {
+    # tabela: (deslocamento do rowid, expressão do texto, colunas que disparam a atualização)
+    "consultas": (0, TEXTO_CONSULTA, "descricao, medico_id, paciente_id"),
+    "medicamentos": (1, TEXTO_MEDICAMENTO, "nome, descricao, dosagem, frequencia, medico_id, paciente_id"),
+}
+
+
+def upgrade() -> None:
+    # FTS5 é do SQLite; em outros bancos a rota /busca responde 501
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    op.execute(
+        "CREATE VIRTUAL TABLE busca_textual USING fts5("
+        "texto, dono, tokenize = 'unicode61 remove_diacritics 2', prefix = '3')"
+    )
+    for tabela, (deslocamento, texto, colunas) in ORIGENS.items():
+        rowid = f"{{r}}.id * 2 + {deslocamento}"
+        inserir = (
+            f"INSERT INTO busca_textual(rowid, texto, dono) "
+            f"VALUES ({rowid.format(r='new')}, {texto.format(r='new')}, {DONO.format(r='new')});"
+        )
+        remover = f"DELETE FROM busca_textual WHERE rowid = {rowid.format(r='old')};"
+
+        op.execute(
+            f"INSERT INTO busca_textual(rowid, texto, dono) "
+            f"SELECT {rowid.format(r=tabela)}, {texto.format(r=tabela)}, {DONO.format(r=tabela)} FROM {tabela}"
+        )
+        op.execute(f"CREATE TRIGGER busca_{tabela}_insercao AFTER INSERT ON {tabela} BEGIN {inserir} END")
+        op.execute(f"CREATE TRIGGER busca_{tabela}_remocao AFTER DELETE ON {tabela} BEGIN {remover} END")
+        op.execute(
+            f"CREATE TRIGGER busca_{tabela}_atualizacao AFTER UPDATE OF {colunas} ON {tabela} "
+            f"BEGIN {remover} {inserir} END"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    for tabela in ORIGENS:
+        for evento in ("insercao", "remocao", "atualizacao"):
+            op.execute(f"DROP TRIGGER IF EXISTS busca_{tabela}_{evento}")
+    op.execute("DROP TABLE IF EXISTS busca_textual")
@@ -0,0 +1,48 @@
+import logging
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from typing import Any
+
+from ..db.session import async_engine
+
+router = APIRouter()
+
+logger = logging.getLogger(__name__)
+
+
+class Prontidao:
+    """
+    Estado do servidor para as sondas: pronto só depois que a inicialização
+    conferiu as migrações e aqueceu os pools, e deixa de estar no
+    encerramento, para o balanceador parar de enviar requisições.
+    """
+
+    def __init__(self):
+        self.pronto = False
+
+
+prontidao = Prontidao()
+
+@router.get("/vivo")
+async def vivo() -> Any:
+    """
+    Liveness: o processo está respondendo.
+    """
+    return {"status": "vivo"}
+
+@router.get("/pronto")
+async def pronto() -> Any:
+    """
+    Readiness: a inicialização terminou e o banco responde.
+    """
+    if not prontidao.pronto:
+        return JSONResponse({"status": "iniciando"}, status_code=503)
+    try:
+        async with async_engine.connect() as conexao:
+            await conexao.execute(text("SELECT 1"))
+    except Exception:
+        logger.exception("Sonda de prontidão: banco indisponível")
+        return JSONResponse({"status": "banco indisponível"}, status_code=503)
+    return {"status": "pronto"}
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from .endpoints import auth, pacientes, medicamentos, consultas, gastos, estatisticas
+from .endpoints import auth, pacientes, medicamentos, consultas, gastos, estatisticas, exportacao, dashboard, busca
 
 api_router = APIRouter()
 
@@ -8,4 +8,7 @@ api_router.include_router(pacientes.router, prefix="/pacientes", tags=["paciente
 api_router.include_router(medicamentos.router, prefix="/medicamentos", tags=["medicamentos"])
 api_router.include_router(consultas.router, prefix="/consultas", tags=["consultas"])
 api_router.include_router(gastos.router, prefix="/gastos", tags=["gastos"])
-api_router.include_router(estatisticas.router, prefix="/estatisticas", tags=["estatisticas"]) 
\ No newline at end of file
+api_router.include_router(estatisticas.router, prefix="/estatisticas", tags=["estatisticas"])
+api_router.include_router(exportacao.router, prefix="/exportacao", tags=["exportacao"])
+api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
+api_router.include_router(busca.router, prefix="/busca", tags=["busca"])
\ No newline at end of file
@@ -0,0 +1,140 @@
+import hashlib
+from datetime import date
+from typing import Awaitable, Callable, Collection, Iterable, List, Optional
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...core.cache import sincronizar_versoes
+from ...core.compressao import etag_sem_codificacao
+from ...core.config import settings
+from ...core.security import Principal, get_current_user
+from ...db.session import get_async_db
+from ...models.models import Versao
+from ...services.estatisticas_service import escopo_medico, escopo_paciente
+from ...services.versoes import ESCOPO_PACIENTES
+
+# Função que diz de quais escopos depende a resposta de uma rota. Ela
+# também recusa (403/404) quem não pode ler o recurso, antes de qualquer 304.
+Escopos = Callable[[Request, Principal, AsyncSession], Awaitable[Iterable[str]]]
+
+
+def _acesso_negado() -> HTTPException:
+    return HTTPException(status_code=403, detail="Acesso negado")
+
+
+async def do_usuario(request: Request, usuario: Principal, db: AsyncSession) -> List[str]:
+    if usuario.tipo == "medico":
+        return [escopo_medico(usuario.id)]
+    return [escopo_paciente(usuario.id)]
+
+
+async def do_paciente(request: Request, usuario: Principal, db: AsyncSession) -> List[str]:
+    paciente_id = request.path_params.get("paciente_id", "")
+    # Um id inválido é recusado pela validação da rota; aqui só não pode quebrar
+    if not paciente_id.isdigit():
+        return []
+    if usuario.tipo != "medico" and usuario.id != int(paciente_id):
+        raise _acesso_negado()
+    return [escopo_paciente(int(paciente_id))]
+
+
+async def da_lista_de_pacientes(request: Request, usuario: Principal, db: AsyncSession) -> List[str]:
+    return [ESCOPO_PACIENTES]
+
+
+def do_registro(modelo, parametro: str, nao_encontrado: str, apenas_do_medico: bool = False) -> Escopos:
+    """
+    Escopos do paciente e do médico donos do registro cujo id está em
+    `parametro`: quem lê o registro de outro usuário tem que revalidar
+    contra as escritas do dono, não contra as próprias.
+
+    O paciente só lê os próprios registros; o médico lê qualquer um, ou só
+    os que registrou quando `apenas_do_medico`.
+    """
+    async def escopos(request: Request, usuario: Principal, db: AsyncSession) -> List[str]:
+        registro_id = request.path_params.get(parametro, "")
+        if not registro_id.isdigit():
+            return []
+        dono = (await db.execute(
+            select(modelo.paciente_id, modelo.medico_id).where(modelo.id == int(registro_id))
+        )).first()
+        if dono is None:
+            raise HTTPException(status_code=404, detail=nao_encontrado)
+        paciente_id, medico_id = dono
+        if usuario.tipo == "medico":
+            if apenas_do_medico and medico_id != usuario.id:
+                raise _acesso_negado()
+        elif paciente_id != usuario.id:
+            raise _acesso_negado()
+        return [escopo_paciente(paciente_id), escopo_medico(medico_id)]
+
+    return escopos
+
+
+def _etag_correspondente(cabecalho: str, etag: str) -> Optional[str]:
+    """
+    A ETag de If-None-Match que corresponde à versão atual, ou None.
+
+    If-None-Match usa comparação fraca (W/"x" equivale a "x") e o sufixo da
+    codificação (veja core.compressao) é ignorado: gzip, br e identity
+    são a mesma versão.
+    """
+    for parte in cabecalho.split(","):
+        parte = parte.strip().removeprefix("W/")
+        if parte == "*":
+            return etag
+        if etag_sem_codificacao(parte) == etag:
+            return parte
+    return None
+
+
+def condicional(*escopos: Escopos, tipos: Optional[Collection[str]] = None):
+    """
+    Dependência de rotas GET: envia um ETag forte derivado das versões dos
+    escopos da resposta e responde 304 quando o cliente já tem essa versão.
+
+    A verificação roda antes do endpoint, então um 304 não executa as
+    consultas da rota nem serializa nada. O ETag também muda de um dia para
+    o outro, porque as estatísticas dependem da data corrente.
+
+    Pelo mesmo motivo a autorização fica aqui: usuários fora de `tipos` e
+    os que as funções de escopo recusam recebem 403/404 antes da
+    comparação, inclusive com If-None-Match: *.
+
+    As versões lidas também descartam dos caches de resultados o que foi
+    calculado em uma versão anterior.
+    """
+    async def verificar(
+        request: Request,
+        response: Response,
+        db: AsyncSession = Depends(get_async_db),
+        current_user: Principal = Depends(get_current_user)
+    ) -> None:
+        if tipos is not None and current_user.tipo not in tipos:
+            raise _acesso_negado()
+        nomes = sorted({nome for funcao in escopos for nome in await funcao(request, current_user, db)})
+        versoes = dict((await db.execute(
+            select(Versao.escopo, Versao.versao).where(Versao.escopo.in_(nomes))
+        )).all()) if nomes else {}
+        # Antes do endpoint: o corpo em cache tem que ser o desta versão
+        sincronizar_versoes({nome: versoes.get(nome, 0) for nome in nomes})
+
+        conteudo = "|".join([
+            settings.VERSION,
+            date.today().isoformat(),
+            str(current_user.id),
+            request.url.path,
+            str(request.query_params),
+            *(f"{nome}={versoes.get(nome, 0)}" for nome in nomes),
+        ])
+        etag = '"' + hashlib.sha256(conteudo.encode()).hexdigest()[:32] + '"'
+
+        # O 304 repete a ETag que o cliente tem, com o sufixo da codificação
+        correspondente = _etag_correspondente(request.headers.get("if-none-match", ""), etag)
+        if correspondente:
+            raise HTTPException(status_code=304, headers={"ETag": correspondente})
+        response.headers["ETag"] = etag
+
+    return Depends(verificar)
@@ -1,53 +1,58 @@
+import logging
+
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 from typing import Any
 
-from ....db.session import get_db
-from ....core.security import verify_password, create_access_token, get_password_hash, oauth2_scheme, get_current_user
+from ....db.session import get_async_db
+from ....core.security import verify_and_update_password_async, create_user_access_token, get_password_hash_async, oauth2_scheme, get_current_user, Principal
 from ....core.config import settings
+from ....core.senhas import executor_senhas
+from ....services.versoes import ESCOPO_PACIENTES, incrementar_versoes
 from ....models.models import Usuario
 from ....schemas.schemas import Token, UsuarioCreate, UsuarioResponse
 
 router = APIRouter()
 
+logger = logging.getLogger(__name__)
+
 @router.post("/token", response_model=Token)
-def login(
-    db: Session = Depends(get_db),
+async def login(
+    db: AsyncSession = Depends(get_async_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """
     OAuth2 compatible token login, get an access token for future requests
     """
-    print(f"Tentando login com email: {form_data.username}")
-    
-    user = db.query(Usuario).filter(Usuario.email == form_data.username).first()
+    user = await db.scalar(select(Usuario).where(Usuario.email == form_data.username))
     if not user:
-        print(f"Usuário não encontrado: {form_data.username}")
+        logger.info("Login recusado: usuário não encontrado", extra={"email": form_data.username})
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email ou senha incorretos",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    print(f"Usuário encontrado: {user.email}")
-    print(f"Senha fornecida: {form_data.password}")
-    print(f"Hash armazenado: {user.senha}")
-    
-    if not verify_password(form_data.password, user.senha):
-        print(f"Senha incorreta para o usuário: {form_data.username}")
+    senha_valida, novo_hash = await verify_and_update_password_async(form_data.password, user.senha)
+    if not senha_valida:
+        logger.info("Login recusado: senha incorreta", extra={"usuario_id": user.id})
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email ou senha incorretos",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    print(f"Login bem-sucedido para o usuário: {form_data.username}")
+    # Hash gerado com outro BCRYPT_ROUNDS: regrava com o custo atual
+    if novo_hash:
+        user.senha = novo_hash
+        await db.commit()
+    
+    logger.info("Login bem-sucedido", extra={"usuario_id": user.id, "custo_atualizado": bool(novo_hash)})
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
-    )
+    access_token = create_user_access_token(user, expires_delta=access_token_expires)
     
     return {
         "access_token": access_token,
@@ -55,8 +60,8 @@ def login(
     }
 
 @router.get("/me", response_model=UsuarioResponse)
-def read_users_me(
-    current_user: Usuario = Depends(get_current_user)
+async def read_users_me(
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Get current user.
@@ -64,25 +69,23 @@ def read_users_me(
     return current_user
 
 @router.post("/register", response_model=UsuarioResponse)
-def register(
+async def register(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_in: UsuarioCreate,
 ) -> Any:
     """
     Register new user.
     """
-    print(f"Tentando registrar usuário: {user_in.email}")
-    
-    user = db.query(Usuario).filter(Usuario.email == user_in.email).first()
+    user = await db.scalar(select(Usuario).where(Usuario.email == user_in.email))
     if user:
-        print(f"Email já registrado: {user_in.email}")
+        logger.info("Cadastro recusado: email já registrado", extra={"email": user_in.email})
         raise HTTPException(
             status_code=400,
             detail="Email já registrado",
         )
     
-    hashed_password = get_password_hash(user_in.senha)
+    hashed_password = await get_password_hash_async(user_in.senha)
     user = Usuario(
         nome=user_in.nome,
         email=user_in.email,
@@ -92,14 +95,27 @@ def register(
     
     try:
         db.add(user)
-        db.commit()
-        db.refresh(user)
-        print(f"Usuário registrado com sucesso: {user_in.email}")
+        if user.tipo == "paciente":
+            await db.run_sync(incrementar_versoes, [ESCOPO_PACIENTES])
+        await db.commit()
+        await db.refresh(user)
+        logger.info("Usuário registrado", extra={"usuario_id": user.id, "tipo": user.tipo})
         return user
-    except Exception as e:
-        print(f"Erro ao registrar usuário: {str(e)}")
-        db.rollback()
+    except Exception:
+        logger.exception("Erro ao registrar usuário", extra={"email": user_in.email})
+        await db.rollback()
         raise HTTPException(
             status_code=500,
             detail="Erro ao registrar usuário",
-        ) 
\ No newline at end of file
+        ) 
+
+@router.get("/senhas")
+async def obter_estatisticas_senhas(
+    current_user: Principal = Depends(get_current_user)
+) -> Any:
+    """
+    Obtém a ocupação do pool de hash de senhas (em execução, fila e recusas).
+    """
+    if current_user.tipo != "medico":
+        raise HTTPException(status_code=403, detail="Acesso negado")
+    return executor_senhas.estatisticas()
\ No newline at end of file
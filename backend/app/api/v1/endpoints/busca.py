@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, List, Literal, Optional
+
+from ....core.config import settings
+from ....db.session import get_async_db
+from ....schemas.schemas import ResultadoBusca
+from ....services.busca import buscar, dono_usuario, expressao_busca
+from ..condicional import condicional, do_usuario
+from ..paginacao import CABECALHO_PROXIMO_CURSOR, codificar_cursor, decodificar_cursor
+from ....core.security import get_current_user, Principal
+
+router = APIRouter()
+
+@router.get("/", response_model=List[ResultadoBusca], dependencies=[condicional(do_usuario)])
+async def buscar_registros(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="Termos buscados (todos, como prefixo)"),
+    tipo: Optional[Literal["consulta", "medicamento"]] = Query(None),
+    cursor: Optional[str] = Query(None, description="Cursor devolvido em X-Proximo-Cursor"),
+    limite: int = Query(20, ge=1, le=settings.PAGINACAO_LIMITE_MAXIMO, description="Itens por página"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+) -> Any:
+    """
+    Busca textual nas consultas e nos medicamentos do usuário (os que o
+    médico registrou, ou os do próprio paciente), ordenada por relevância.
+
+    A próxima página vem no cabeçalho X-Proximo-Cursor.
+    """
+    if db.get_bind().dialect.name != "sqlite":
+        raise HTTPException(status_code=501, detail="Busca textual disponível apenas com SQLite (FTS5)")
+
+    expressao = expressao_busca(q, dono_usuario(current_user.id, current_user.tipo))
+    if expressao is None:
+        raise HTTPException(status_code=400, detail="Informe ao menos uma palavra")
+
+    apos = None
+    if cursor:
+        relevancia, rowid = decodificar_cursor(cursor, 2)
+        if not isinstance(relevancia, (int, float)) or not isinstance(rowid, int):
+            raise HTTPException(status_code=400, detail="Cursor inválido")
+        apos = (relevancia, rowid)
+
+    itens, proxima = await db.run_sync(buscar, expressao, limite, tipo, apos)
+    if proxima is not None:
+        response.headers[CABECALHO_PROXIMO_CURSOR] = codificar_cursor(list(proxima))
+    return itens
\ No newline at end of file
@@ -1,22 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Body, Depends, HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Any
 from datetime import datetime
 
-from ....db.session import get_db
+from ....db.session import get_async_db
 from ....models.models import Consulta, Usuario
-from ....schemas.schemas import ConsultaCreate, ConsultaResponse
+from ....schemas.schemas import ConsultaCreate, ConsultaResponse, LoteResultado
 from .auth import oauth2_scheme
-from ....core.security import get_current_user
+from ..paginacao import Pagina, Periodo, filtrar_periodo, paginar
+from ..lote import inserir_lote, montar_resultado, validar_pacientes
+from ..condicional import condicional, do_registro, do_usuario
+from ....core.config import settings
+from ....core.security import get_current_user, Principal
+from ....services.estatisticas_service import invalidar_estatisticas
+from ....services.versoes import escopos_escrita, incrementar_versoes
 
 router = APIRouter()
 
 @router.post("/", response_model=ConsultaResponse)
-def criar_consulta(
+async def criar_consulta(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     consulta_in: ConsultaCreate,
-    current_user: Usuario = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Cria uma nova consulta.
@@ -25,10 +32,10 @@ def criar_consulta(
         raise HTTPException(status_code=403, detail="Acesso negado")
     
     # Verifica se o paciente existe
-    paciente = db.query(Usuario).filter(
+    paciente = await db.scalar(select(Usuario.id).where(
         Usuario.id == consulta_in.paciente_id,
         Usuario.tipo == "paciente"
-    ).first()
+    ))
     if not paciente:
         raise HTTPException(status_code=404, detail="Paciente não encontrado")
     
@@ -38,34 +45,72 @@ def criar_consulta(
         data=datetime.now()
     )
     db.add(consulta)
-    db.commit()
-    db.refresh(consulta)
+    await db.run_sync(incrementar_versoes, escopos_escrita([consulta.paciente_id], current_user.id))
+    await db.commit()
+    await db.refresh(consulta)
+    invalidar_estatisticas(consulta.paciente_id, current_user.id)
     return consulta
 
-@router.get("/", response_model=List[ConsultaResponse])
-def listar_consultas(
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+@router.post("/lote", response_model=LoteResultado)
+async def criar_consultas_lote(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    consultas_in: List[ConsultaCreate] = Body(..., min_length=1, max_length=settings.LOTE_TAMANHO_MAXIMO),
+    current_user: Principal = Depends(get_current_user)
+) -> Any:
+    """
+    Cria várias consultas em uma única transação, com o resultado de cada item.
+
+    Itens de pacientes inexistentes são recusados sem impedir os demais.
+    """
+    if current_user.tipo != "medico":
+        raise HTTPException(status_code=403, detail="Acesso negado")
+    
+    validos, erros = await validar_pacientes(db, consultas_in)
+    agora = datetime.now()
+    linhas = [
+        dict(consultas_in[indice].dict(), medico_id=current_user.id, data=agora)
+        for indice in validos
+    ]
+    ids = await inserir_lote(db, Consulta, linhas)
+    await db.run_sync(incrementar_versoes, escopos_escrita([linha["paciente_id"] for linha in linhas], current_user.id))
+    await db.commit()
+    for paciente_id in {linha["paciente_id"] for linha in linhas}:
+        invalidar_estatisticas(paciente_id, current_user.id)
+    return montar_resultado(ids, validos, erros)
+
+@router.get("/", response_model=List[ConsultaResponse], dependencies=[condicional(do_usuario)])
+async def listar_consultas(
+    response: Response,
+    pagina: Pagina = Depends(),
+    periodo: Periodo = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
-    Lista todas as consultas.
+    Lista as consultas, paginadas por (data, id).
     """
     if current_user.tipo == "medico":
-        consultas = db.query(Consulta).filter(Consulta.medico_id == current_user.id).all()
+        query = select(Consulta).where(Consulta.medico_id == current_user.id)
     else:
-        consultas = db.query(Consulta).filter(Consulta.paciente_id == current_user.id).all()
-    return consultas
+        query = select(Consulta).where(Consulta.paciente_id == current_user.id)
+    query = filtrar_periodo(query, Consulta.data, periodo)
+    return await paginar(db, query, pagina, response, Consulta.id, Consulta.data, ConsultaResponse)
 
-@router.get("/{consulta_id}", response_model=ConsultaResponse)
-def obter_consulta(
+@router.get(
+    "/{consulta_id}",
+    response_model=ConsultaResponse,
+    dependencies=[condicional(do_registro(Consulta, "consulta_id", "Consulta não encontrada", apenas_do_medico=True))]
+)
+async def obter_consulta(
     consulta_id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Obtém uma consulta específica.
     """
-    consulta = db.query(Consulta).filter(Consulta.id == consulta_id).first()
+    consulta = await db.get(Consulta, consulta_id)
     if not consulta:
         raise HTTPException(status_code=404, detail="Consulta não encontrada")
     
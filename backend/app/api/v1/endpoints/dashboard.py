@@ -0,0 +1,85 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any
+
+from ....core.config import settings
+from ....db.session import get_async_db
+from ....models.models import Consulta, Gasto, GastoMensal, Medicamento, Usuario
+from ....schemas.schemas import DashboardMedicoResponse
+from ..paginacao import Pagina, buscar_pagina
+from ..condicional import condicional, da_lista_de_pacientes, do_usuario
+from ....core.security import get_current_user, Principal
+
+router = APIRouter()
+
+def _limite(descricao: str):
+    return Query(
+        settings.PAGINACAO_LIMITE_PADRAO,
+        ge=1,
+        le=settings.PAGINACAO_LIMITE_MAXIMO,
+        description=descricao
+    )
+
+@router.get(
+    "/medico",
+    response_model=DashboardMedicoResponse,
+    dependencies=[condicional(do_usuario, da_lista_de_pacientes, tipos={"medico"})]
+)
+async def obter_dashboard_medico(
+    limite_pacientes: int = _limite("Quantidade máxima de pacientes"),
+    limite_medicamentos: int = _limite("Quantidade máxima de medicamentos"),
+    limite_consultas: int = _limite("Quantidade máxima de consultas"),
+    limite_gastos: int = _limite("Quantidade máxima de gastos"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+) -> Any:
+    """
+    Obtém em uma única requisição as listas e os totais do dashboard do médico.
+
+    Cada lista traz a primeira página da rota de listagem correspondente; o
+    cursor da página seguinte vem em `cursores`.
+    """
+    if current_user.tipo != "medico":
+        raise HTTPException(status_code=403, detail="Acesso negado")
+
+    secoes = {
+        "pacientes": (
+            select(Usuario).where(Usuario.tipo == "paciente"),
+            limite_pacientes, Usuario.id, None
+        ),
+        "medicamentos": (
+            select(Medicamento).where(Medicamento.medico_id == current_user.id),
+            limite_medicamentos, Medicamento.id, None
+        ),
+        "consultas": (
+            select(Consulta).where(Consulta.medico_id == current_user.id),
+            limite_consultas, Consulta.id, Consulta.data
+        ),
+        "gastos": (
+            select(Gasto).where(Gasto.medico_id == current_user.id),
+            limite_gastos, Gasto.id, Gasto.data
+        ),
+    }
+
+    resposta = {"cursores": {}}
+    for nome, (query, limite, coluna_id, coluna_data) in secoes.items():
+        pagina = Pagina(cursor=None, limite=limite, ordem="desc", rapido=False)
+        itens, cursor = await buscar_pagina(db, query, pagina, coluna_id, coluna_data)
+        resposta[nome] = itens
+        if cursor:
+            resposta["cursores"][nome] = cursor
+
+    # Todos os totais em um único SELECT
+    totais = (await db.execute(select(
+        select(func.count(Usuario.id)).where(Usuario.tipo == "paciente").scalar_subquery(),
+        select(func.count(Medicamento.id)).where(Medicamento.medico_id == current_user.id).scalar_subquery(),
+        select(func.count(Consulta.id)).where(Consulta.medico_id == current_user.id).scalar_subquery(),
+        select(func.coalesce(func.sum(GastoMensal.quantidade), 0)).where(GastoMensal.medico_id == current_user.id).scalar_subquery(),
+        select(func.coalesce(func.sum(GastoMensal.total), 0.0)).where(GastoMensal.medico_id == current_user.id).scalar_subquery(),
+    ))).one()
+    resposta["totais"] = dict(zip(
+        ["pacientes", "medicamentos", "consultas", "gastos", "gasto_total"],
+        totais
+    ))
+    return resposta
@@ -1,146 +1,206 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Any, List
-from datetime import datetime, timedelta
 
-from ....db.session import get_db
-from ....models.models import Gasto, Usuario, Consulta
+from ....db.session import get_async_db
+from ....models.models import GastoMensal
 from .auth import oauth2_scheme
-from ....core.security import get_current_user
+from ..condicional import condicional, do_paciente, do_usuario
+from ..paginacao import Periodo
+from ....core.cache import cache_estatisticas, cache_series
+from ....core.security import get_current_user, Principal
+from ....services.analise_gastos import (
+    PERCENTIS_PADRAO,
+    SerieGastos,
+    carregar_serie,
+    medias_moveis,
+    percentis_por_categoria,
+    previsao_proximo_mes
+)
+from ....services.estatisticas_service import (
+    calcular_estatisticas_medico,
+    calcular_estatisticas_paciente,
+    escopo_medico,
+    escopo_paciente
+)
 
 router = APIRouter()
 
-@router.get("/paciente/{paciente_id}")
-def obter_estatisticas_paciente(
+logger = logging.getLogger(__name__)
+
+def _escopo_usuario(usuario: Principal) -> str:
+    if usuario.tipo == "medico":
+        return escopo_medico(usuario.id)
+    return escopo_paciente(usuario.id)
+
+def _filtro_usuario(usuario: Principal):
+    if usuario.tipo == "medico":
+        return GastoMensal.medico_id == usuario.id
+    return GastoMensal.paciente_id == usuario.id
+
+async def _serie_usuario(db: AsyncSession, usuario: Principal, periodo: Periodo) -> SerieGastos:
+    """
+    Gastos do usuário como colunas NumPy, lidos uma vez e compartilhados
+    pelas rotas de /analise até a próxima escrita no escopo.
+    """
+    escopo = _escopo_usuario(usuario)
+    filtro = {"medico_id": usuario.id} if usuario.tipo == "medico" else {"paciente_id": usuario.id}
+    return await cache_series.obter_ou_calcular_async(
+        f"serie:{escopo}:{periodo.data_inicio}:{periodo.data_fim}",
+        [escopo],
+        lambda: db.run_sync(
+            carregar_serie,
+            data_inicio=periodo.data_inicio,
+            data_fim=periodo.data_fim,
+            **filtro
+        )
+    )
+
+@router.get("/paciente/{paciente_id}", dependencies=[condicional(do_paciente)])
+async def obter_estatisticas_paciente(
     paciente_id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Obtém estatísticas detalhadas de um paciente.
     """
-    print(f"Buscando estatísticas para o paciente {paciente_id}")
-    
     # Verifica se o usuário tem permissão
     if current_user.tipo == "paciente" and current_user.id != paciente_id:
         raise HTTPException(status_code=403, detail="Acesso negado")
     
-    # Verifica se o paciente existe
-    paciente = db.query(Usuario).filter(
-        Usuario.id == paciente_id,
-        Usuario.tipo == "paciente"
-    ).first()
-    if not paciente:
+    resultado = await cache_estatisticas.obter_ou_calcular_async(
+        f"estatisticas:{escopo_paciente(paciente_id)}",
+        [escopo_paciente(paciente_id)],
+        lambda: db.run_sync(calcular_estatisticas_paciente, paciente_id)
+    )
+    if resultado is None:
         raise HTTPException(status_code=404, detail="Paciente não encontrado")
 
-    # Calcula gastos totais
-    gasto_total = db.query(func.sum(Gasto.valor)).filter(
-        Gasto.paciente_id == paciente_id
-    ).scalar() or 0
-    print(f"Gasto total: {gasto_total}")
-
-    # Calcula gastos com consultas
-    gasto_consultas = db.query(func.sum(Gasto.valor)).filter(
-        Gasto.paciente_id == paciente_id,
-        Gasto.categoria == "consulta"
-    ).scalar() or 0
-    print(f"Gasto consultas: {gasto_consultas}")
-
-    # Calcula gastos com medicamentos
-    gasto_medicamentos = db.query(func.sum(Gasto.valor)).filter(
-        Gasto.paciente_id == paciente_id,
-        Gasto.categoria == "medicamento"
-    ).scalar() or 0
-    print(f"Gasto medicamentos: {gasto_medicamentos}")
-
-    # Calcula total de consultas
-    total_consultas = db.query(func.count(Consulta.id)).filter(
-        Consulta.paciente_id == paciente_id
-    ).scalar() or 0
-    print(f"Total consultas: {total_consultas}")
-
-    # Gera dados para o gráfico (últimos 6 meses)
-    dados_grafico = []
-    for i in range(5, -1, -1):  # Inverte a ordem para começar do mês mais antigo
-        data = datetime.now() - timedelta(days=30*i)
-        mes_ano = data.strftime("%Y-%m")
-        
-        # Gastos com consultas no mês
-        valor_consulta = db.query(func.sum(Gasto.valor)).filter(
-            Gasto.paciente_id == paciente_id,
-            Gasto.categoria == "consulta",
-            func.strftime("%Y-%m", Gasto.data) == mes_ano
-        ).scalar() or 0
-
-        # Gastos com medicamentos no mês
-        valor_medicamento = db.query(func.sum(Gasto.valor)).filter(
-            Gasto.paciente_id == paciente_id,
-            Gasto.categoria == "medicamento",
-            func.strftime("%Y-%m", Gasto.data) == mes_ano
-        ).scalar() or 0
-
-        total = float(valor_consulta + valor_medicamento)
-        print(f"Mês {mes_ano}: Consultas={valor_consulta}, Medicamentos={valor_medicamento}, Total={total}")
-
-        dados_grafico.append({
-            "data": mes_ano,
-            "valor_consulta": float(valor_consulta),
-            "valor_medicamento": float(valor_medicamento),
-            "total": total
-        })
-
-    resultado = {
-        "gasto_total": float(gasto_total),
-        "gasto_consultas": float(gasto_consultas),
-        "gasto_medicamentos": float(gasto_medicamentos),
-        "total_consultas": total_consultas,
-        "dados_grafico": dados_grafico
-    }
-    
-    print("Resultado final:", resultado)
+    logger.debug("Estatísticas do paciente", extra={"paciente_id": paciente_id})
     return resultado
 
-@router.get("/gastos/total")
-def obter_total_gastos(
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+@router.get("/medico", dependencies=[condicional(do_usuario, tipos={"medico"})])
+async def obter_estatisticas_medico(
+    periodo: Periodo = Depends(),
+    maiores: int = Query(10, ge=1, le=100, description="Quantidade de pacientes em maiores_gastos"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+) -> Any:
+    """
+    Obtém a visão de coorte dos pacientes do médico: totais por paciente,
+    maiores gastos, tendência mensal e consultas por paciente.
+
+    data_inicio/data_fim limitam gastos e consultas ao período.
+    """
+    if current_user.tipo != "medico":
+        raise HTTPException(status_code=403, detail="Acesso negado")
+
+    escopo = escopo_medico(current_user.id)
+    return await cache_estatisticas.obter_ou_calcular_async(
+        f"estatisticas_medico:{escopo}:{periodo.data_inicio}:{periodo.data_fim}:{maiores}",
+        [escopo],
+        lambda: db.run_sync(
+            calcular_estatisticas_medico,
+            current_user.id,
+            periodo.data_inicio,
+            periodo.data_fim,
+            maiores
+        )
+    )
+
+@router.get("/gastos/total", dependencies=[condicional(do_usuario)])
+async def obter_total_gastos(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Obtém o total de gastos.
     """
-    if current_user.tipo == "medico":
-        total = db.query(func.sum(Gasto.valor)).filter(
-            Gasto.medico_id == current_user.id
-        ).scalar() or 0
-    else:
-        total = db.query(func.sum(Gasto.valor)).filter(
-            Gasto.paciente_id == current_user.id
-        ).scalar() or 0
-    
-    return {"total": total}
+    async def calcular():
+        total = await db.scalar(
+            select(func.sum(GastoMensal.total)).where(_filtro_usuario(current_user))
+        ) or 0
+        return {"total": total}
 
-@router.get("/gastos/categoria")
-def obter_gastos_por_categoria(
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    escopo = _escopo_usuario(current_user)
+    return await cache_estatisticas.obter_ou_calcular_async(f"gastos_total:{escopo}", [escopo], calcular)
+
+@router.get("/gastos/categoria", dependencies=[condicional(do_usuario)])
+async def obter_gastos_por_categoria(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Obtém os gastos agrupados por categoria.
     """
-    if current_user.tipo == "medico":
-        gastos = db.query(
-            Gasto.categoria,
-            func.sum(Gasto.valor).label("total")
-        ).filter(
-            Gasto.medico_id == current_user.id
-        ).group_by(Gasto.categoria).all()
-    else:
-        gastos = db.query(
-            Gasto.categoria,
-            func.sum(Gasto.valor).label("total")
-        ).filter(
-            Gasto.paciente_id == current_user.id
-        ).group_by(Gasto.categoria).all()
-    
-    return [{"categoria": g.categoria, "total": g.total} for g in gastos] 
\ No newline at end of file
+    async def calcular():
+        gastos = (await db.execute(
+            select(
+                GastoMensal.categoria,
+                func.sum(GastoMensal.total).label("total")
+            ).where(
+                _filtro_usuario(current_user)
+            ).group_by(GastoMensal.categoria)
+        )).all()
+        return [{"categoria": g.categoria, "total": g.total} for g in gastos]
+
+    escopo = _escopo_usuario(current_user)
+    return await cache_estatisticas.obter_ou_calcular_async(f"gastos_categoria:{escopo}", [escopo], calcular)
+
+@router.get("/analise/medias-moveis", dependencies=[condicional(do_usuario)])
+async def obter_medias_moveis(
+    periodo: Periodo = Depends(),
+    janela: int = Query(3, ge=1, le=24, description="Meses da média móvel"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+) -> Any:
+    """
+    Obtém o total mensal de gastos, geral e por categoria, com a média móvel.
+    """
+    serie = await _serie_usuario(db, current_user, periodo)
+    return await run_in_threadpool(medias_moveis, serie, janela)
+
+@router.get("/analise/percentis", dependencies=[condicional(do_usuario)])
+async def obter_percentis_por_categoria(
+    periodo: Periodo = Depends(),
+    percentis: List[float] = Query(list(PERCENTIS_PADRAO), description="Percentis entre 0 e 100"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+) -> Any:
+    """
+    Obtém quantidade, total, média e percentis do valor dos gastos por categoria.
+    """
+    if any(p < 0 or p > 100 for p in percentis):
+        raise HTTPException(status_code=400, detail="Percentis devem estar entre 0 e 100")
+    serie = await _serie_usuario(db, current_user, periodo)
+    return await run_in_threadpool(percentis_por_categoria, serie, percentis)
+
+@router.get("/analise/previsao", dependencies=[condicional(do_usuario)])
+async def obter_previsao_gastos(
+    meses: int = Query(6, ge=1, le=36, description="Meses de histórico da regressão"),
+    limite: int = Query(100, ge=1, le=10000, description="Pacientes listados, pelos de maior previsão"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+) -> Any:
+    """
+    Obtém a previsão de gasto do próximo mês para cada paciente, por
+    tendência linear dos meses completos anteriores ao corrente.
+    """
+    serie = await _serie_usuario(db, current_user, Periodo(data_inicio=None, data_fim=None))
+    return await run_in_threadpool(previsao_proximo_mes, serie, meses, None, limite)
+
+@router.get("/cache")
+async def obter_estatisticas_cache(
+    current_user: Principal = Depends(get_current_user)
+) -> Any:
+    """
+    Obtém os contadores de acertos e faltas do cache de estatísticas.
+    """
+    if current_user.tipo != "medico":
+        raise HTTPException(status_code=403, detail="Acesso negado")
+    return cache_estatisticas.estatisticas()
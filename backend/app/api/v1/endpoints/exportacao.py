@@ -0,0 +1,103 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from typing import Any, AsyncIterator, Literal, Optional
+from datetime import datetime
+import csv
+import io
+import json
+
+from ....db.session import AsyncSessionLocal
+from ....models.models import Consulta, Gasto
+from ....core.security import get_current_user, Principal
+from ..paginacao import Periodo, filtrar_periodo
+
+router = APIRouter()
+
+# Linhas buscadas do cursor do banco por vez
+LINHAS_POR_LOTE = 1000
+
+TIPOS_CONTEUDO = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+def _valor(valor: Any) -> Any:
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    return valor
+
+async def _gerar_linhas(consulta, colunas, formato: str) -> AsyncIterator[str]:
+    """
+    Executa a consulta em uma sessão própria e produz o conteúdo lote a lote.
+
+    A sessão é aberta aqui, e não via get_async_db, porque o corpo da
+    resposta é produzido depois que o endpoint retorna.
+    """
+    async with AsyncSessionLocal() as db:
+        resultado = await db.stream(consulta.execution_options(yield_per=LINHAS_POR_LOTE))
+        if formato == "csv":
+            buffer = io.StringIO()
+            escritor = csv.writer(buffer)
+            escritor.writerow(colunas)
+            async for lote in resultado.partitions():
+                escritor.writerows([[_valor(v) for v in linha] for linha in lote])
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue()
+        else:
+            async for lote in resultado.partitions():
+                yield "".join(
+                    json.dumps(dict(zip(colunas, map(_valor, linha))), ensure_ascii=False) + "\n"
+                    for linha in lote
+                )
+
+def _resposta(consulta, colunas, formato: str, nome: str) -> StreamingResponse:
+    return StreamingResponse(
+        _gerar_linhas(consulta, colunas, formato),
+        media_type=TIPOS_CONTEUDO[formato],
+        headers={"Content-Disposition": f'attachment; filename="{nome}.{formato}"'}
+    )
+
+@router.get("/gastos")
+async def exportar_gastos(
+    formato: Literal["ndjson", "csv"] = Query("ndjson"),
+    periodo: Periodo = Depends(),
+    categoria: Optional[str] = Query(None),
+    current_user: Principal = Depends(get_current_user)
+) -> Any:
+    """
+    Exporta todos os gastos do usuário em NDJSON ou CSV, sem carregá-los em memória.
+    """
+    colunas = ["id", "data", "categoria", "descricao", "valor", "paciente_id", "medico_id"]
+    consulta = select(*[getattr(Gasto, coluna) for coluna in colunas])
+    if current_user.tipo == "medico":
+        consulta = consulta.where(Gasto.medico_id == current_user.id)
+    else:
+        consulta = consulta.where(Gasto.paciente_id == current_user.id)
+    consulta = filtrar_periodo(consulta, Gasto.data, periodo)
+    if categoria:
+        consulta = consulta.where(Gasto.categoria == categoria)
+    consulta = consulta.order_by(Gasto.data, Gasto.id)
+    return _resposta(consulta, colunas, formato, "gastos")
+
+@router.get("/consultas")
+async def exportar_consultas(
+    formato: Literal["ndjson", "csv"] = Query("ndjson"),
+    periodo: Periodo = Depends(),
+    current_user: Principal = Depends(get_current_user)
+) -> Any:
+    """
+    Exporta todas as consultas do usuário em NDJSON ou CSV, sem carregá-las em memória.
+    """
+    colunas = ["id", "data", "descricao", "paciente_id", "medico_id"]
+    consulta = select(*[getattr(Consulta, coluna) for coluna in colunas])
+    if current_user.tipo == "medico":
+        consulta = consulta.where(Consulta.medico_id == current_user.id)
+    else:
+        consulta = consulta.where(Consulta.paciente_id == current_user.id)
+    consulta = filtrar_periodo(consulta, Consulta.data, periodo)
+    consulta = consulta.order_by(Consulta.data, Consulta.id)
+    return _resposta(consulta, colunas, formato, "consultas")
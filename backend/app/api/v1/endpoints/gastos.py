@@ -1,22 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List, Any
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Any, Optional
 from datetime import datetime
 
-from ....db.session import get_db
+from ....db.session import get_async_db
 from ....models.models import Gasto, Usuario
-from ....schemas.schemas import GastoCreate, GastoResponse
+from ....schemas.schemas import GastoCreate, GastoResponse, LoteResultado
 from .auth import oauth2_scheme
-from ....core.security import get_current_user
+from ..paginacao import Pagina, Periodo, filtrar_periodo, paginar
+from ..lote import inserir_lote, montar_resultado, validar_pacientes
+from ..condicional import condicional, do_paciente, do_usuario
+from ....core.config import settings
+from ....core.security import get_current_user, Principal
+from ....services.estatisticas_service import invalidar_estatisticas
+from ....services.gastos_mensais import acumular_variacoes, aplicar_variacoes, registrar_gasto
+from ....services.versoes import escopos_escrita, incrementar_versoes
 
 router = APIRouter()
 
+def _filtrar(query, periodo: Periodo, categoria: Optional[str]):
+    query = filtrar_periodo(query, Gasto.data, periodo)
+    if categoria:
+        query = query.filter(Gasto.categoria == categoria)
+    return query
+
 @router.post("/", response_model=GastoResponse)
-def criar_gasto(
+async def criar_gasto(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     gasto_in: GastoCreate,
-    current_user: Usuario = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Cria um novo gasto.
@@ -25,10 +39,10 @@ def criar_gasto(
         raise HTTPException(status_code=403, detail="Acesso negado")
     
     # Verifica se o paciente existe
-    paciente = db.query(Usuario).filter(
+    paciente = await db.scalar(select(Usuario.id).where(
         Usuario.id == gasto_in.paciente_id,
         Usuario.tipo == "paciente"
-    ).first()
+    ))
     if not paciente:
         raise HTTPException(status_code=404, detail="Paciente não encontrado")
     
@@ -38,47 +52,94 @@ def criar_gasto(
         data=datetime.now()
     )
     db.add(gasto)
-    db.commit()
-    db.refresh(gasto)
+    await db.run_sync(registrar_gasto, gasto)
+    await db.run_sync(incrementar_versoes, escopos_escrita([gasto.paciente_id], gasto.medico_id))
+    await db.commit()
+    await db.refresh(gasto)
+    invalidar_estatisticas(gasto.paciente_id, gasto.medico_id)
     return gasto
 
-@router.get("/", response_model=List[GastoResponse])
-def listar_gastos(
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+@router.post("/lote", response_model=LoteResultado)
+async def criar_gastos_lote(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    gastos_in: List[GastoCreate] = Body(..., min_length=1, max_length=settings.LOTE_TAMANHO_MAXIMO),
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
-    Lista todos os gastos.
+    Cria vários gastos em uma única transação, com o resultado de cada item.
+
+    Itens de pacientes inexistentes são recusados sem impedir os demais.
+    """
+    if current_user.tipo != "medico":
+        raise HTTPException(status_code=403, detail="Acesso negado")
+    
+    validos, erros = await validar_pacientes(db, gastos_in)
+    agora = datetime.now()
+    linhas = [
+        dict(gastos_in[indice].dict(), medico_id=current_user.id, data=agora)
+        for indice in validos
+    ]
+    ids = await inserir_lote(db, Gasto, linhas)
+    variacoes = acumular_variacoes(Gasto(**linha) for linha in linhas)
+    await db.run_sync(aplicar_variacoes, variacoes)
+    await db.run_sync(incrementar_versoes, escopos_escrita([linha["paciente_id"] for linha in linhas], current_user.id))
+    await db.commit()
+    for paciente_id in {linha["paciente_id"] for linha in linhas}:
+        invalidar_estatisticas(paciente_id, current_user.id)
+    return montar_resultado(ids, validos, erros)
+
+@router.get("/", response_model=List[GastoResponse], dependencies=[condicional(do_usuario)])
+async def listar_gastos(
+    response: Response,
+    pagina: Pagina = Depends(),
+    periodo: Periodo = Depends(),
+    categoria: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+) -> Any:
+    """
+    Lista os gastos, paginados por (data, id).
     """
     if current_user.tipo == "medico":
-        gastos = db.query(Gasto).filter(Gasto.medico_id == current_user.id).all()
+        query = select(Gasto).where(Gasto.medico_id == current_user.id)
     else:
-        gastos = db.query(Gasto).filter(Gasto.paciente_id == current_user.id).all()
-    return gastos
+        query = select(Gasto).where(Gasto.paciente_id == current_user.id)
+    query = _filtrar(query, periodo, categoria)
+    return await paginar(db, query, pagina, response, Gasto.id, Gasto.data, GastoResponse)
 
-@router.get("/paciente/{paciente_id}", response_model=List[GastoResponse])
-def listar_gastos_paciente(
+@router.get(
+    "/paciente/{paciente_id}",
+    response_model=List[GastoResponse],
+    dependencies=[condicional(do_usuario, do_paciente, tipos={"medico"})]
+)
+async def listar_gastos_paciente(
     paciente_id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    response: Response,
+    pagina: Pagina = Depends(),
+    periodo: Periodo = Depends(),
+    categoria: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
-    Lista todos os gastos de um paciente específico.
+    Lista os gastos de um paciente específico, paginados por (data, id).
     """
     if current_user.tipo != "medico":
         raise HTTPException(status_code=403, detail="Acesso negado")
     
-    gastos = db.query(Gasto).filter(
+    query = select(Gasto).where(
         Gasto.paciente_id == paciente_id,
         Gasto.medico_id == current_user.id
-    ).all()
-    return gastos
+    )
+    query = _filtrar(query, periodo, categoria)
+    return await paginar(db, query, pagina, response, Gasto.id, Gasto.data, GastoResponse)
 
 @router.delete("/{gasto_id}")
-def deletar_gasto(
+async def deletar_gasto(
     gasto_id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Deleta um gasto específico.
@@ -86,14 +147,17 @@ def deletar_gasto(
     if current_user.tipo != "medico":
         raise HTTPException(status_code=403, detail="Acesso negado")
     
-    gasto = db.query(Gasto).filter(
+    gasto = await db.scalar(select(Gasto).where(
         Gasto.id == gasto_id,
         Gasto.medico_id == current_user.id
-    ).first()
+    ))
     
     if not gasto:
         raise HTTPException(status_code=404, detail="Gasto não encontrado")
     
-    db.delete(gasto)
-    db.commit()
+    await db.run_sync(registrar_gasto, gasto, sinal=-1)
+    await db.delete(gasto)
+    await db.run_sync(incrementar_versoes, escopos_escrita([gasto.paciente_id], gasto.medico_id))
+    await db.commit()
+    invalidar_estatisticas(gasto.paciente_id, gasto.medico_id)
     return {"message": "Gasto deletado com sucesso"} 
\ No newline at end of file
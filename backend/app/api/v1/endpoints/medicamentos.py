@@ -1,21 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Body, Depends, HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Any
 
-from ....db.session import get_db
+from ....db.session import get_async_db
 from ....models.models import Medicamento, Usuario
-from ....schemas.schemas import MedicamentoCreate, MedicamentoResponse
+from ....schemas.schemas import MedicamentoCreate, MedicamentoResponse, LoteResultado
 from .auth import oauth2_scheme
-from ....core.security import get_current_user
+from ..paginacao import Pagina, paginar
+from ..lote import inserir_lote, montar_resultado, validar_pacientes
+from ..condicional import condicional, do_registro, do_usuario
+from ....core.config import settings
+from ....core.security import get_current_user, Principal
+from ....services.versoes import escopos_escrita, incrementar_versoes
 
 router = APIRouter()
 
 @router.post("/", response_model=MedicamentoResponse)
-def criar_medicamento(
+async def criar_medicamento(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     medicamento_in: MedicamentoCreate,
-    current_user: Usuario = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Cria um novo medicamento.
@@ -24,10 +30,10 @@ def criar_medicamento(
         raise HTTPException(status_code=403, detail="Acesso negado")
     
     # Verifica se o paciente existe
-    paciente = db.query(Usuario).filter(
+    paciente = await db.scalar(select(Usuario.id).where(
         Usuario.id == medicamento_in.paciente_id,
         Usuario.tipo == "paciente"
-    ).first()
+    ))
     if not paciente:
         raise HTTPException(status_code=404, detail="Paciente não encontrado")
     
@@ -36,43 +42,75 @@ def criar_medicamento(
         medico_id=current_user.id
     )
     db.add(medicamento)
-    db.commit()
-    db.refresh(medicamento)
+    await db.run_sync(incrementar_versoes, escopos_escrita([medicamento.paciente_id], current_user.id))
+    await db.commit()
+    await db.refresh(medicamento)
     return medicamento
 
-@router.get("/", response_model=List[MedicamentoResponse])
-def listar_medicamentos(
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+@router.post("/lote", response_model=LoteResultado)
+async def criar_medicamentos_lote(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    medicamentos_in: List[MedicamentoCreate] = Body(..., min_length=1, max_length=settings.LOTE_TAMANHO_MAXIMO),
+    current_user: Principal = Depends(get_current_user)
+) -> Any:
+    """
+    Cria vários medicamentos em uma única transação, com o resultado de cada item.
+
+    Itens de pacientes inexistentes são recusados sem impedir os demais.
+    """
+    if current_user.tipo != "medico":
+        raise HTTPException(status_code=403, detail="Acesso negado")
+    
+    validos, erros = await validar_pacientes(db, medicamentos_in)
+    linhas = [
+        dict(medicamentos_in[indice].dict(), medico_id=current_user.id)
+        for indice in validos
+    ]
+    ids = await inserir_lote(db, Medicamento, linhas)
+    await db.run_sync(incrementar_versoes, escopos_escrita([linha["paciente_id"] for linha in linhas], current_user.id))
+    await db.commit()
+    return montar_resultado(ids, validos, erros)
+
+@router.get("/", response_model=List[MedicamentoResponse], dependencies=[condicional(do_usuario)])
+async def listar_medicamentos(
+    response: Response,
+    pagina: Pagina = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
-    Lista todos os medicamentos.
+    Lista os medicamentos, paginados por id.
     """
     if current_user.tipo == "medico":
-        medicamentos = db.query(Medicamento).filter(Medicamento.medico_id == current_user.id).all()
+        query = select(Medicamento).where(Medicamento.medico_id == current_user.id)
     else:
-        medicamentos = db.query(Medicamento).filter(Medicamento.paciente_id == current_user.id).all()
-    return medicamentos
+        query = select(Medicamento).where(Medicamento.paciente_id == current_user.id)
+    return await paginar(db, query, pagina, response, Medicamento.id, schema=MedicamentoResponse)
 
-@router.get("/{medicamento_id}", response_model=MedicamentoResponse)
-def obter_medicamento(
+@router.get(
+    "/{medicamento_id}",
+    response_model=MedicamentoResponse,
+    dependencies=[condicional(do_registro(Medicamento, "medicamento_id", "Medicamento não encontrado"))]
+)
+async def obter_medicamento(
     medicamento_id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Obtém um medicamento específico.
     """
-    medicamento = db.query(Medicamento).filter(Medicamento.id == medicamento_id).first()
+    medicamento = await db.get(Medicamento, medicamento_id)
     if not medicamento:
         raise HTTPException(status_code=404, detail="Medicamento não encontrado")
     return medicamento
 
 @router.delete("/{medicamento_id}")
-def deletar_medicamento(
+async def deletar_medicamento(
     medicamento_id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Deleta um medicamento específico.
@@ -80,14 +118,15 @@ def deletar_medicamento(
     if current_user.tipo != "medico":
         raise HTTPException(status_code=403, detail="Acesso negado")
     
-    medicamento = db.query(Medicamento).filter(
+    medicamento = await db.scalar(select(Medicamento).where(
         Medicamento.id == medicamento_id,
         Medicamento.medico_id == current_user.id
-    ).first()
+    ))
     
     if not medicamento:
         raise HTTPException(status_code=404, detail="Medicamento não encontrado")
     
-    db.delete(medicamento)
-    db.commit()
+    await db.delete(medicamento)
+    await db.run_sync(incrementar_versoes, escopos_escrita([medicamento.paciente_id], medicamento.medico_id))
+    await db.commit()
     return {"message": "Medicamento deletado com sucesso"} 
\ No newline at end of file
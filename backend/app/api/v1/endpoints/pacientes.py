@@ -1,21 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
 from typing import List, Any
 
-from ....db.session import get_db
-from ....models.models import Usuario
-from ....schemas.schemas import UsuarioResponse, UsuarioCreate
+from ....db.session import get_async_db
+from ....models.models import Consulta, Gasto, Medicamento, Usuario
+from ....schemas.schemas import UsuarioResponse, UsuarioCreate, ProntuarioResponse
 from .auth import oauth2_scheme
-from ....core.security import get_current_user, get_password_hash
+from ..paginacao import Pagina, Periodo, paginar
+from ..condicional import condicional, da_lista_de_pacientes, do_paciente
+from ....core.security import get_current_user, get_password_hash_async, Principal
+from ....services.versoes import ESCOPO_PACIENTES, incrementar_versoes
 
 router = APIRouter()
 
 @router.post("/", response_model=UsuarioResponse)
-def criar_paciente(
+async def criar_paciente(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     paciente_in: UsuarioCreate,
-    current_user: Usuario = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Cria um novo paciente.
@@ -24,11 +29,11 @@ def criar_paciente(
         raise HTTPException(status_code=403, detail="Acesso negado")
     
     # Verifica se o email já está em uso
-    if db.query(Usuario).filter(Usuario.email == paciente_in.email).first():
+    if await db.scalar(select(Usuario.id).where(Usuario.email == paciente_in.email)):
         raise HTTPException(status_code=400, detail="Email já registrado")
     
     # Cria o novo paciente
-    hashed_password = get_password_hash(paciente_in.senha)
+    hashed_password = await get_password_hash_async(paciente_in.senha)
     paciente = Usuario(
         nome=paciente_in.nome,
         email=paciente_in.email,
@@ -38,32 +43,35 @@ def criar_paciente(
     
     try:
         db.add(paciente)
-        db.commit()
-        db.refresh(paciente)
+        await db.run_sync(incrementar_versoes, [ESCOPO_PACIENTES])
+        await db.commit()
+        await db.refresh(paciente)
         return paciente
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Erro ao criar paciente")
 
-@router.get("/", response_model=List[UsuarioResponse])
-def listar_pacientes(
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+@router.get("/", response_model=List[UsuarioResponse], dependencies=[condicional(da_lista_de_pacientes, tipos={"medico"})])
+async def listar_pacientes(
+    response: Response,
+    pagina: Pagina = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
-    Lista todos os pacientes.
+    Lista os pacientes, paginados por id.
     """
     if current_user.tipo != "medico":
         raise HTTPException(status_code=403, detail="Acesso negado")
     
-    pacientes = db.query(Usuario).filter(Usuario.tipo == "paciente").all()
-    return pacientes
+    query = select(Usuario).where(Usuario.tipo == "paciente")
+    return await paginar(db, query, pagina, response, Usuario.id, schema=UsuarioResponse)
 
-@router.get("/{paciente_id}", response_model=UsuarioResponse)
-def obter_paciente(
+@router.get("/{paciente_id}", response_model=UsuarioResponse, dependencies=[condicional(do_paciente, tipos={"medico"})])
+async def obter_paciente(
     paciente_id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Obtém um paciente específico.
@@ -71,12 +79,60 @@ def obter_paciente(
     if current_user.tipo != "medico":
         raise HTTPException(status_code=403, detail="Acesso negado")
     
-    paciente = db.query(Usuario).filter(
+    paciente = await db.scalar(select(Usuario).where(
         Usuario.id == paciente_id,
         Usuario.tipo == "paciente"
-    ).first()
+    ))
     
     if not paciente:
         raise HTTPException(status_code=404, detail="Paciente não encontrado")
     
-    return paciente 
\ No newline at end of file
+    return paciente
+
+@router.get("/{paciente_id}/prontuario", response_model=ProntuarioResponse, dependencies=[condicional(do_paciente)])
+async def obter_prontuario(
+    paciente_id: int,
+    periodo: Periodo = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+) -> Any:
+    """
+    Obtém o paciente com medicamentos, consultas e gastos em uma única resposta.
+
+    data_inicio/data_fim limitam consultas e gastos ao período. Médicos veem
+    apenas os gastos que eles mesmos registraram.
+    """
+    if current_user.tipo != "medico" and current_user.id != paciente_id:
+        raise HTTPException(status_code=403, detail="Acesso negado")
+    
+    filtros_consultas = []
+    filtros_gastos = []
+    if periodo.data_inicio:
+        filtros_consultas.append(Consulta.data >= periodo.data_inicio)
+        filtros_gastos.append(Gasto.data >= periodo.data_inicio)
+    if periodo.data_fim:
+        filtros_consultas.append(Consulta.data <= periodo.data_fim)
+        filtros_gastos.append(Gasto.data <= periodo.data_fim)
+    if current_user.tipo == "medico":
+        filtros_gastos.append(Gasto.medico_id == current_user.id)
+    
+    # Uma consulta por coleção (selectinload), com o médico de cada item no mesmo SELECT
+    paciente = await db.scalar(
+        select(Usuario)
+        .where(Usuario.id == paciente_id, Usuario.tipo == "paciente")
+        .options(
+            selectinload(Usuario.medicamentos_paciente).joinedload(Medicamento.medico),
+            selectinload(Usuario.consultas_paciente.and_(*filtros_consultas)).joinedload(Consulta.medico),
+            selectinload(Usuario.gastos_paciente.and_(*filtros_gastos)),
+        )
+    )
+    
+    if not paciente:
+        raise HTTPException(status_code=404, detail="Paciente não encontrado")
+    
+    return {
+        "paciente": paciente,
+        "medicamentos": sorted(paciente.medicamentos_paciente, key=lambda m: m.id, reverse=True),
+        "consultas": sorted(paciente.consultas_paciente, key=lambda c: (c.data, c.id), reverse=True),
+        "gastos": sorted(paciente.gastos_paciente, key=lambda g: (g.data, g.id), reverse=True),
+    }
\ No newline at end of file
@@ -0,0 +1,48 @@
+from typing import Dict, List, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...db.funcoes import ids_na_ordem, insert_retornando_ids
+from ...models.models import Usuario
+from ...schemas.schemas import ItemLoteResultado, LoteResultado
+
+
+async def validar_pacientes(db: AsyncSession, itens: Sequence) -> Tuple[List[int], Dict[int, str]]:
+    """
+    Verifica em uma única consulta os paciente_id de todos os itens.
+
+    Retorna os índices dos itens válidos e o erro de cada item inválido.
+    """
+    existentes = set(await db.scalars(select(Usuario.id).where(
+        Usuario.id.in_({item.paciente_id for item in itens}),
+        Usuario.tipo == "paciente"
+    )))
+    validos = [indice for indice, item in enumerate(itens) if item.paciente_id in existentes]
+    erros = {
+        indice: "Paciente não encontrado"
+        for indice, item in enumerate(itens)
+        if item.paciente_id not in existentes
+    }
+    return validos, erros
+
+
+async def inserir_lote(db: AsyncSession, modelo, linhas: List[dict]) -> List[int]:
+    """
+    Insere as linhas com um único executemany e retorna os ids na mesma ordem.
+
+    Não faz commit.
+    """
+    if not linhas:
+        return []
+    return ids_na_ordem(db, await db.scalars(insert_retornando_ids(db, modelo), linhas))
+
+
+def montar_resultado(ids: List[int], validos: List[int], erros: dict) -> LoteResultado:
+    """
+    Combina os ids inseridos (na ordem de `validos`) e os erros por índice.
+    """
+    itens = [ItemLoteResultado(indice=indice, erro=erro) for indice, erro in erros.items()]
+    itens += [ItemLoteResultado(indice=indice, id=id_) for indice, id_ in zip(validos, ids)]
+    itens.sort(key=lambda item: item.indice)
+    return LoteResultado(criados=len(ids), erros=len(erros), itens=itens)
@@ -0,0 +1,171 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Literal, Optional, Tuple, Type
+
+import orjson
+from fastapi import HTTPException, Query, Response
+from pydantic import BaseModel
+from sqlalchemy import Select, literal, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...core.config import settings
+
+# Cabeçalho com o cursor da próxima página (ausente na última página)
+CABECALHO_PROXIMO_CURSOR = "X-Proximo-Cursor"
+
+
+class Pagina:
+    """
+    Parâmetros de paginação por cursor (keyset) comuns às listagens.
+    """
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description="Cursor devolvido em X-Proximo-Cursor"),
+        limite: int = Query(
+            settings.PAGINACAO_LIMITE_PADRAO,
+            ge=1,
+            le=settings.PAGINACAO_LIMITE_MAXIMO,
+            description="Quantidade máxima de itens na página"
+        ),
+        ordem: Literal["asc", "desc"] = Query("desc", description="Ordem dos itens"),
+        rapido: bool = Query(
+            False,
+            description="Monta os itens direto das colunas, sem objetos do ORM nem validação do schema"
+        )
+    ):
+        self.cursor = cursor
+        self.limite = limite
+        self.ordem = ordem
+        self.rapido = rapido
+
+
+class RespostaRapida(Response):
+    """
+    Resposta JSON serializada com orjson.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
+class Periodo:
+    """
+    Filtro opcional por intervalo de datas, inclusivo nas duas pontas.
+    """
+
+    def __init__(
+        self,
+        data_inicio: Optional[datetime] = Query(None),
+        data_fim: Optional[datetime] = Query(None)
+    ):
+        if data_inicio and data_fim and data_inicio > data_fim:
+            raise HTTPException(status_code=400, detail="data_inicio posterior a data_fim")
+        self.data_inicio = data_inicio
+        self.data_fim = data_fim
+
+
+def filtrar_periodo(query: Select, coluna, periodo: Periodo) -> Select:
+    if periodo.data_inicio:
+        query = query.filter(coluna >= periodo.data_inicio)
+    if periodo.data_fim:
+        query = query.filter(coluna <= periodo.data_fim)
+    return query
+
+
+def codificar_cursor(valores: list) -> str:
+    texto = json.dumps(valores, default=lambda v: v.isoformat(), separators=(",", ":"))
+    return base64.urlsafe_b64encode(texto.encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str, colunas: int) -> list:
+    try:
+        texto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        valores = json.loads(texto)
+        if not isinstance(valores, list) or len(valores) != colunas:
+            raise ValueError
+        return valores
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+async def buscar_pagina(
+    db: AsyncSession,
+    query: Select,
+    pagina: Pagina,
+    coluna_id,
+    coluna_data=None,
+    colunas_resposta: Optional[list] = None
+) -> Tuple[List, Optional[str]]:
+    """
+    Aplica a paginação por cursor em (data, id), ou apenas id, e retorna a
+    página com o cursor da próxima (None na última página).
+
+    Com `colunas_resposta`, a consulta seleciona só essas colunas e a página
+    vem como linhas (Row) em vez de objetos do ORM.
+    """
+    colunas = [coluna_data, coluna_id] if coluna_data is not None else [coluna_id]
+    chave = tuple_(*colunas) if len(colunas) > 1 else coluna_id
+
+    if pagina.cursor:
+        valores = decodificar_cursor(pagina.cursor, len(colunas))
+        try:
+            valores[-1] = int(valores[-1])
+            if coluna_data is not None:
+                valores[0] = datetime.fromisoformat(valores[0])
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Cursor inválido")
+        valores = [literal(valor, coluna.type) for valor, coluna in zip(valores, colunas)]
+        limite = tuple_(*valores) if len(colunas) > 1 else valores[0]
+        query = query.filter(chave < limite if pagina.ordem == "desc" else chave > limite)
+
+    if pagina.ordem == "desc":
+        query = query.order_by(*[coluna.desc() for coluna in colunas])
+    else:
+        query = query.order_by(*[coluna.asc() for coluna in colunas])
+
+    if colunas_resposta is None:
+        itens = (await db.scalars(query.limit(pagina.limite + 1))).all()
+    else:
+        query = query.with_only_columns(*colunas_resposta, maintain_column_froms=True)
+        itens = (await db.execute(query.limit(pagina.limite + 1))).all()
+    if len(itens) <= pagina.limite:
+        return itens, None
+    itens = itens[:pagina.limite]
+    ultimo = itens[-1]
+    return itens, codificar_cursor([getattr(ultimo, coluna.key) for coluna in colunas])
+
+
+async def paginar(
+    db: AsyncSession,
+    query: Select,
+    pagina: Pagina,
+    response: Response,
+    coluna_id,
+    coluna_data=None,
+    schema: Optional[Type[BaseModel]] = None
+) -> Any:
+    """
+    Retorna a página e envia o cursor da próxima no cabeçalho X-Proximo-Cursor.
+
+    Com `rapido=true` e o `schema` da resposta, os itens são montados direto
+    das colunas correspondentes aos campos do schema e serializados com
+    orjson, sem passar pelo ORM nem pela validação do response_model.
+    """
+    if not (pagina.rapido and schema is not None):
+        itens, cursor = await buscar_pagina(db, query, pagina, coluna_id, coluna_data)
+        if cursor:
+            response.headers[CABECALHO_PROXIMO_CURSOR] = cursor
+        return itens
+
+    nomes = list(schema.model_fields)
+    colunas = [getattr(coluna_id.class_, nome) for nome in nomes]
+    linhas, cursor = await buscar_pagina(db, query, pagina, coluna_id, coluna_data, colunas)
+    resposta = RespostaRapida([dict(zip(nomes, linha)) for linha in linhas])
+    # Os cabeçalhos já definidos (ETag) não são copiados quando a rota retorna uma Response
+    resposta.headers.update(response.headers)
+    if cursor:
+        resposta.headers[CABECALHO_PROXIMO_CURSOR] = cursor
+    return resposta
@@ -0,0 +1,179 @@
+"""
+Comandos administrativos do backend.
+
+Uso (a partir da pasta backend):
+    python -m app.cli preparar
+    python -m app.cli migrar
+    python -m app.cli popular
+    python -m app.cli reconstruir-gastos-mensais
+    python -m app.cli importar gastos historico/gastos.csv --tamanho-lote 5000
+    python -m app.cli gerar-dados --medicos 100 --pacientes-por-medico 1000 --anos 3
+"""
+import argparse
+import json
+import sys
+
+from app.models.base import SessionLocal
+
+
+def preparar_banco(popular: bool = True) -> None:
+    """
+    Aplica as migrações e, se pedido, popula os dados de teste. O servidor
+    não faz isso na inicialização: só confere se o banco está na revisão
+    esperada.
+    """
+    from app.db.migracoes import executar_migracoes
+    from app.models.base import engine
+    from app.services.seed import seed_database
+
+    executar_migracoes(engine)
+    if not popular:
+        return
+    db = SessionLocal()
+    try:
+        seed_database(db)
+    finally:
+        db.close()
+
+
+def migrar(args: argparse.Namespace) -> None:
+    from app.db.migracoes import revisao_esperada
+
+    preparar_banco(popular=False)
+    print(f"Banco na revisão {revisao_esperada()}")
+
+
+def popular(args: argparse.Namespace) -> None:
+    from app.services.seed import seed_database
+
+    db = SessionLocal()
+    try:
+        seed_database(db)
+        print("Dados de teste verificados")
+    finally:
+        db.close()
+
+
+def preparar(args: argparse.Namespace) -> None:
+    migrar(args)
+    popular(args)
+
+
+def reconstruir_gastos_mensais(args: argparse.Namespace) -> None:
+    from app.services.gastos_mensais import reconstruir_gastos_mensais as reconstruir
+
+    db = SessionLocal()
+    try:
+        linhas = reconstruir(db)
+        print(f"Tabela gastos_mensais reconstruída: {linhas} linhas")
+    finally:
+        db.close()
+
+
+def importar(args: argparse.Namespace) -> None:
+    from app.services.importacao import importar as importar_arquivo
+
+    caminho_rejeitados = args.rejeitados or f"{args.arquivo}.rejeitados.ndjson"
+    db = SessionLocal()
+    try:
+        # Uma retomada continua o arquivo de rejeitados; --reiniciar começa outro
+        with open(caminho_rejeitados, "w" if args.reiniciar else "a", encoding="utf-8") as rejeitados:
+            def rejeitar(rejeitado: dict) -> None:
+                rejeitados.write(json.dumps(rejeitado, ensure_ascii=False) + "\n")
+                rejeitados.flush()
+
+            resumo = importar_arquivo(
+                db,
+                args.arquivo,
+                args.tipo,
+                formato=args.formato,
+                tamanho_lote=args.tamanho_lote,
+                reiniciar=args.reiniciar,
+                rejeitar=rejeitar,
+            )
+        if resumo["rejeitados"]:
+            print(f"Registros rejeitados em {caminho_rejeitados}")
+        print(json.dumps(resumo, indent=2, ensure_ascii=False))
+    finally:
+        db.close()
+
+
+def gerar_dados(args: argparse.Namespace) -> None:
+    from datetime import date
+
+    from app.services.dados_sinteticos import gerar_dados as gerar
+
+    db = SessionLocal()
+    try:
+        resumo = gerar(
+            db,
+            medicos=args.medicos,
+            pacientes_por_medico=args.pacientes_por_medico,
+            anos=args.anos,
+            semente=args.semente,
+            ate=date.fromisoformat(args.ate) if args.ate else None,
+            tamanho_lote=args.tamanho_lote,
+        )
+        print(json.dumps(resumo, indent=2, ensure_ascii=False))
+    finally:
+        db.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Comandos do Compilador Médico")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    subparsers.add_parser(
+        "preparar",
+        help="Aplica as migrações e popula os dados de teste (migrar + popular)"
+    ).set_defaults(func=preparar)
+    subparsers.add_parser(
+        "migrar",
+        help="Aplica as migrações pendentes (alembic upgrade head)"
+    ).set_defaults(func=migrar)
+    subparsers.add_parser(
+        "popular",
+        help="Cria os usuários e registros de teste, se o banco estiver vazio"
+    ).set_defaults(func=popular)
+
+    reconstruir = subparsers.add_parser(
+        "reconstruir-gastos-mensais",
+        help="Recalcula a consolidação mensal de gastos a partir da tabela gastos"
+    )
+    reconstruir.set_defaults(func=reconstruir_gastos_mensais)
+
+    importacao = subparsers.add_parser(
+        "importar",
+        help="Importa consultas, gastos ou medicamentos de um arquivo CSV ou NDJSON, em lotes"
+    )
+    importacao.add_argument("tipo", choices=["consultas", "gastos", "medicamentos"])
+    importacao.add_argument("arquivo")
+    importacao.add_argument("--formato", choices=["csv", "ndjson"], help="padrão: pela extensão do arquivo")
+    importacao.add_argument("--tamanho-lote", type=int, default=5000, help="registros por transação")
+    importacao.add_argument("--rejeitados", help="arquivo NDJSON dos registros rejeitados (padrão: <arquivo>.rejeitados.ndjson)")
+    importacao.add_argument(
+        "--reiniciar",
+        action="store_true",
+        help="ignora o progresso salvo e importa o arquivo desde o início"
+    )
+    importacao.set_defaults(func=importar)
+
+    sinteticos = subparsers.add_parser(
+        "gerar-dados",
+        help="Gera médicos, pacientes e histórico sintéticos (determinísticos pela semente) para testes de carga"
+    )
+    sinteticos.add_argument("--medicos", type=int, default=10)
+    sinteticos.add_argument("--pacientes-por-medico", type=int, default=100)
+    sinteticos.add_argument("--anos", type=float, default=3, help="anos de histórico")
+    sinteticos.add_argument("--semente", type=int, default=42)
+    sinteticos.add_argument("--ate", help="data final do histórico, AAAA-MM-DD (padrão: hoje)")
+    sinteticos.add_argument("--tamanho-lote", type=int, default=20000, help="linhas por transação")
+    sinteticos.set_defaults(func=gerar_dados)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from .config import settings
+
+# Valor usado para diferenciar "não está no cache" de um resultado None
+AUSENTE = object()
+
+
+class BackendCache(ABC):
+    """
+    Interface de armazenamento do cache de resultados.
+
+    Cada entrada pertence a um ou mais escopos (por exemplo "paciente:3"),
+    que permitem invalidar de uma vez tudo o que depende de um registro.
+    Um backend compartilhado (Redis, memcached) deve implementar os mesmos
+    métodos para ser usado no lugar do cache em memória.
+    """
+
+    @abstractmethod
+    def obter(self, chave: str) -> Any:
+        """Retorna o valor armazenado ou AUSENTE."""
+
+    @abstractmethod
+    def definir(self, chave: str, valor: Any, escopos: Iterable[str]) -> None:
+        """Armazena o valor associado aos escopos informados."""
+
+    @abstractmethod
+    def invalidar(self, escopo: str) -> int:
+        """Remove as entradas do escopo e retorna quantas foram removidas."""
+
+    @abstractmethod
+    def limpar(self) -> None:
+        """Remove todas as entradas."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Quantidade de entradas armazenadas."""
+
+
+class CacheMemoria(BackendCache):
+    """
+    Cache LRU em memória do processo, limitado por quantidade e por tempo de vida.
+    """
+
+    def __init__(self, tamanho_maximo: int = 1024, ttl: float = 300.0):
+        self.tamanho_maximo = tamanho_maximo
+        self.ttl = ttl
+        self._entradas: "OrderedDict[str, Tuple[float, Any, Tuple[str, ...]]]" = OrderedDict()
+        self._escopos: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def obter(self, chave: str) -> Any:
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                return AUSENTE
+            expira_em, valor, _ = entrada
+            if expira_em <= time.monotonic():
+                self._remover(chave)
+                return AUSENTE
+            self._entradas.move_to_end(chave)
+            return valor
+
+    def definir(self, chave: str, valor: Any, escopos: Iterable[str]) -> None:
+        escopos = tuple(escopos)
+        with self._lock:
+            if chave in self._entradas:
+                self._remover(chave)
+            self._entradas[chave] = (time.monotonic() + self.ttl, valor, escopos)
+            for escopo in escopos:
+                self._escopos.setdefault(escopo, set()).add(chave)
+            while len(self._entradas) > self.tamanho_maximo:
+                self._remover(next(iter(self._entradas)))
+
+    def invalidar(self, escopo: str) -> int:
+        with self._lock:
+            chaves = self._escopos.pop(escopo, set())
+            for chave in chaves:
+                self._remover(chave)
+            return len(chaves)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+            self._escopos.clear()
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def _remover(self, chave: str) -> None:
+        entrada = self._entradas.pop(chave, None)
+        if entrada is None:
+            return
+        for escopo in entrada[2]:
+            chaves = self._escopos.get(escopo)
+            if chaves is not None:
+                chaves.discard(chave)
+                if not chaves:
+                    del self._escopos[escopo]
+
+
+class CacheResultados:
+    """
+    Cache de resultados com contadores de acertos, faltas e invalidações.
+    """
+
+    def __init__(self, backend: BackendCache):
+        self.backend = backend
+        self.acertos = 0
+        self.faltas = 0
+        self.invalidacoes = 0
+        # Geração de cada escopo: impede que um cálculo iniciado antes de uma
+        # invalidação seja armazenado depois dela
+        self._geracoes: Dict[str, int] = {}
+        # Última versão (tabela versoes) vista de cada escopo neste processo
+        self._versoes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def obter_ou_calcular(self, chave: str, escopos: Iterable[str], calcular: Callable[[], Any]) -> Any:
+        """
+        Retorna o valor em cache ou calcula, armazena e retorna um novo.
+
+        Resultados None não são armazenados.
+        """
+        valor, geracoes = self._consultar(chave, escopos)
+        if valor is AUSENTE:
+            valor = calcular()
+            self._armazenar(chave, valor, geracoes)
+        return valor
+
+    async def obter_ou_calcular_async(
+        self,
+        chave: str,
+        escopos: Iterable[str],
+        calcular: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Versão de obter_ou_calcular para cálculos assíncronos.
+        """
+        valor, geracoes = self._consultar(chave, escopos)
+        if valor is AUSENTE:
+            valor = await calcular()
+            self._armazenar(chave, valor, geracoes)
+        return valor
+
+    def _consultar(self, chave: str, escopos: Iterable[str]) -> Tuple[Any, Dict[str, int]]:
+        valor = self.backend.obter(chave)
+        with self._lock:
+            if valor is not AUSENTE:
+                self.acertos += 1
+                return valor, {}
+            self.faltas += 1
+            return AUSENTE, {escopo: self._geracoes.get(escopo, 0) for escopo in escopos}
+
+    def _armazenar(self, chave: str, valor: Any, geracoes: Dict[str, int]) -> None:
+        if valor is None:
+            return
+        with self._lock:
+            atual = {escopo: self._geracoes.get(escopo, 0) for escopo in geracoes}
+        if atual == geracoes:
+            self.backend.definir(chave, valor, geracoes.keys())
+
+    def invalidar(self, *escopos: str) -> None:
+        for escopo in escopos:
+            with self._lock:
+                self._geracoes[escopo] = self._geracoes.get(escopo, 0) + 1
+            removidas = self.backend.invalidar(escopo)
+            with self._lock:
+                self.invalidacoes += removidas
+
+    def sincronizar_versoes(self, versoes: Dict[str, int]) -> None:
+        """
+        Invalida os escopos cuja versão mudou desde a última vez que foi
+        vista neste processo.
+
+        Escritas de outros processos, ou que não passam pelas rotas (como a
+        importação em lote), incrementam a versão sem limpar este cache; sem
+        isso ele serviria o resultado antigo com o ETag da versão nova.
+        """
+        mudaram = []
+        with self._lock:
+            for escopo, versao in versoes.items():
+                if self._versoes.get(escopo) != versao:
+                    self._versoes[escopo] = versao
+                    mudaram.append(escopo)
+        if mudaram:
+            self.invalidar(*mudaram)
+
+    def estatisticas(self) -> Dict[str, Any]:
+        consultas = self.acertos + self.faltas
+        return {
+            "acertos": self.acertos,
+            "faltas": self.faltas,
+            "taxa_acerto": self.acertos / consultas if consultas else 0.0,
+            "invalidacoes": self.invalidacoes,
+            "entradas": len(self.backend),
+        }
+
+
+def criar_cache(backend: Optional[BackendCache] = None) -> CacheResultados:
+    return CacheResultados(backend or CacheMemoria(
+        tamanho_maximo=settings.CACHE_TAMANHO_MAXIMO,
+        ttl=settings.CACHE_TTL_SEGUNDOS
+    ))
+
+
+# Cache das rotas de /estatisticas
+cache_estatisticas = criar_cache()
+
+# Séries de gastos (arrays NumPy) lidas pela análise vetorizada: poucas
+# entradas, porque cada uma pode ocupar dezenas de MB
+cache_series = criar_cache(CacheMemoria(
+    tamanho_maximo=settings.ANALISE_SERIES_CACHE_TAMANHO,
+    ttl=settings.CACHE_TTL_SEGUNDOS
+))
+
+
+def sincronizar_versoes(versoes: Dict[str, int]) -> None:
+    """
+    Alinha os caches de resultados às versões dos escopos lidas do banco.
+    """
+    cache_estatisticas.sincronizar_versoes(versoes)
+    cache_series.sincronizar_versoes(versoes)
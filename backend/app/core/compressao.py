@@ -0,0 +1,102 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware, IdentityResponder
+from starlette.types import Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional: sem ele, só gzip
+    brotli = None
+
+# Codificações aplicadas pelo middleware; cada uma ganha o próprio ETag
+CODIFICACOES = ("gzip", "br")
+
+
+def etag_codificado(etag: str, codificacao: str) -> str:
+    """
+    ETag da representação comprimida: o mesmo valor com o sufixo da
+    codificação ("abc" -> "abc-gzip"). Um ETag forte identifica os bytes
+    enviados, então identity, gzip e br não podem compartilhar o mesmo.
+    """
+    if not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{codificacao}"'
+
+
+def etag_sem_codificacao(etag: str) -> str:
+    """
+    Desfaz etag_codificado: o ETag da versão, qualquer que seja a codificação.
+    """
+    for codificacao in CODIFICACOES:
+        sufixo = f'-{codificacao}"'
+        if etag.endswith(sufixo):
+            return etag[:-len(sufixo)] + '"'
+    return etag
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app, minimum_size: int, quality: int, **kwargs):
+        super().__init__(app, minimum_size, **kwargs)
+        self.quality = quality
+        self._compressor = None
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if self._compressor is None:
+            self._compressor = brotli.Compressor(quality=self.quality)
+        comprimido = self._compressor.process(body)
+        if more_body:
+            return comprimido + self._compressor.flush()
+        return comprimido + self._compressor.finish()
+
+
+class CompressaoMiddleware(GZipMiddleware):
+    """
+    Comprime respostas a partir de `minimum_size` bytes com br, quando o
+    cliente aceita e o pacote brotli está instalado, ou com gzip.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, compresslevel: int = 6, brotli_quality: int = 4):
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def enviar(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                _ajustar_cabecalhos(MutableHeaders(raw=message.setdefault("headers", [])))
+            await send(message)
+
+        if brotli is not None and _aceita_br(Headers(scope=scope)):
+            responder = BrotliResponder(
+                self.app,
+                self.minimum_size,
+                self.brotli_quality,
+                exclude_content_types=self.exclude_content_types
+            )
+            await responder(scope, receive, enviar)
+            return
+        await super().__call__(scope, receive, enviar)
+
+
+def _ajustar_cabecalhos(headers: MutableHeaders) -> None:
+    """
+    Vary: Accept-Encoding em toda resposta, inclusive as pequenas demais para
+    comprimir e os 304, e ETag próprio para o corpo comprimido.
+    """
+    vary = headers.get("vary", "")
+    if "accept-encoding" not in {parte.strip().lower() for parte in vary.split(",")}:
+        headers.add_vary_header("Accept-Encoding")
+
+    codificacao = headers.get("content-encoding")
+    etag = headers.get("etag")
+    if etag and codificacao in CODIFICACOES:
+        headers["ETag"] = etag_codificado(etag, codificacao)
+
+
+def _aceita_br(headers: Headers) -> bool:
+    codificacoes = headers.get("Accept-Encoding", "").split(",")
+    return any(codificacao.split(";")[0].strip() == "br" for codificacao in codificacoes)
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Literal, Optional
 import os
 from dotenv import load_dotenv
 
@@ -12,12 +12,61 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite:///./sql_app.db"
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+
+    # Na inicialização, recusa subir se o banco não estiver na última migração
+    VERIFICAR_MIGRACOES: bool = True
+
+    # Pragmas aplicados quando DATABASE_URL é SQLite
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KB: int = 65536
+    SQLITE_MMAP_SIZE: int = 268435456
     
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+
+    # Cache dos usuários autenticados (evita consultar o banco a cada requisição)
+    PRINCIPAL_CACHE_TAMANHO: int = 10000
+    PRINCIPAL_CACHE_TTL_SEGUNDOS: float = 60.0
+
+    # Senhas: custo do bcrypt e pool de processos que faz o hash/verificação
+    BCRYPT_ROUNDS: int = 12
+    SENHA_PROCESSOS: int = 2
+    SENHA_CONCORRENCIA_MAXIMA: int = 0  # 0 = igual a SENHA_PROCESSOS
+    SENHA_FILA_MAXIMA: int = 256
+
+    # Cache de estatísticas
+    CACHE_TAMANHO_MAXIMO: int = 1024
+    CACHE_TTL_SEGUNDOS: float = 300.0
+    # Séries de gastos mantidas em memória para /estatisticas/analise
+    ANALISE_SERIES_CACHE_TAMANHO: int = 8
+
+    # Paginação das listagens
+    PAGINACAO_LIMITE_PADRAO: int = 100
+    PAGINACAO_LIMITE_MAXIMO: int = 1000
+
+    # Quantidade máxima de itens nas rotas de criação em lote
+    LOTE_TAMANHO_MAXIMO: int = 1000
+
+    # Compressão das respostas (gzip, ou br quando o pacote brotli está instalado)
+    COMPRESSAO_TAMANHO_MINIMO: int = 1024
+    COMPRESSAO_NIVEL_GZIP: int = 6
+    COMPRESSAO_NIVEL_BROTLI: int = 4
     
+    # Orçamento de comandos SQL por requisição e detecção de N+1 (0 desativa);
+    # CONSULTAS_ORCAMENTO_ACAO: "log" (aviso) ou "erro" (OrcamentoExcedido)
+    CONSULTAS_ORCAMENTO: int = 25
+    CONSULTAS_REPETIDAS_MAXIMO: int = 5
+    CONSULTAS_ORCAMENTO_ACAO: Literal["log", "erro"] = "log"
+
+    # Logs (JSON em stderr): DEBUG, INFO, WARNING, ERROR
+    LOG_LEVEL: str = "INFO"
+
     # CORS
     BACKEND_CORS_ORIGINS: list = ["http://localhost:5173"]
     
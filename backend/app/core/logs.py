@@ -0,0 +1,132 @@
+import logging
+import queue
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+import orjson
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+
+# Cabeçalho com o identificador de correlação da requisição
+CABECALHO_CORRELACAO = "X-Request-ID"
+
+# Identificador da requisição em andamento, anexado a cada registro de log
+correlacao_id: ContextVar[Optional[str]] = ContextVar("correlacao_id", default=None)
+
+# Campos extras cujo nome contém um destes trechos têm o valor ocultado
+TRECHOS_SENSIVEIS = ("senha", "password", "hash", "token", "secret", "authorization", "cpf")
+OCULTO = "***"
+
+# Atributos padrão do LogRecord, que não são campos extras
+_ATRIBUTOS_PADRAO = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "correlacao_id"}
+
+_handler: Optional[QueueHandler] = None
+_listener: Optional[QueueListener] = None
+
+
+def ocultar(campo: str, valor):
+    nome = campo.lower()
+    return OCULTO if any(trecho in nome for trecho in TRECHOS_SENSIVEIS) else valor
+
+
+class FiltroCorrelacao(logging.Filter):
+    """
+    Copia o identificador da requisição para o registro ainda na thread que
+    o emitiu, antes de ele entrar na fila.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.correlacao_id = correlacao_id.get()
+        return True
+
+
+class FormatadorJson(logging.Formatter):
+    """
+    Uma linha JSON por registro, com os campos extras e os sensíveis ocultados.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        dados = {
+            "momento": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "mensagem": record.getMessage(),
+        }
+        if getattr(record, "correlacao_id", None):
+            dados["correlacao_id"] = record.correlacao_id
+        for campo, valor in vars(record).items():
+            if campo not in _ATRIBUTOS_PADRAO:
+                dados[campo] = ocultar(campo, valor)
+        return orjson.dumps(dados, default=str).decode()
+
+
+def configurar_logs(nivel: Optional[str] = None) -> None:
+    """
+    Envia os logs para uma fila em memória; uma thread separada formata e
+    escreve em stderr. Quem registra um log nunca espera pela escrita: na
+    thread da requisição só a mensagem (e o traceback) é montada.
+
+    O nível vem de LOG_LEVEL. Chamar de novo só ajusta o nível.
+    """
+    global _handler, _listener
+    raiz = logging.getLogger()
+    raiz.setLevel((nivel or settings.LOG_LEVEL).upper())
+    if _listener is not None:
+        return
+
+    fila: queue.SimpleQueue = queue.SimpleQueue()
+    _handler = QueueHandler(fila)
+    _handler.addFilter(FiltroCorrelacao())
+    saida = logging.StreamHandler(sys.stderr)
+    saida.setFormatter(FormatadorJson())
+
+    _listener = QueueListener(fila, saida)
+    _listener.start()
+    raiz.addHandler(_handler)
+
+
+def encerrar_logs() -> None:
+    """
+    Escreve o que ainda está na fila e para a thread dos logs.
+    """
+    global _handler, _listener
+    if _listener is None:
+        return
+    logging.getLogger().removeHandler(_handler)
+    _listener.stop()
+    _handler = _listener = None
+
+
+class CorrelacaoMiddleware:
+    """
+    Usa o X-Request-ID recebido (ou gera um) como identificador de correlação
+    da requisição e o devolve no mesmo cabeçalho da resposta.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        recebido = Headers(scope=scope).get(CABECALHO_CORRELACAO, "")
+        identificador = recebido[:64] if recebido.isprintable() and recebido else uuid.uuid4().hex
+
+        async def enviar(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[CABECALHO_CORRELACAO] = identificador
+            await send(message)
+
+        token = correlacao_id.set(identificador)
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            correlacao_id.reset(token)
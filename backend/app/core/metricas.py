@@ -0,0 +1,236 @@
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Limites (em segundos) dos buckets dos histogramas de latência
+LIMITES_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Rota usada quando a requisição não casou com nenhuma rota (evita um rótulo por URL)
+ROTA_DESCONHECIDA = "desconhecida"
+
+TIPO_CONTEUDO = "text/plain; version=0.0.4; charset=utf-8"
+
+Rotulos = Tuple[Tuple[str, str], ...]
+
+
+class Histograma:
+    """
+    Contagem por bucket, soma e total de observações (formato do Prometheus).
+    """
+
+    def __init__(self, limites: Tuple[float, ...] = LIMITES_LATENCIA):
+        self.limites = limites
+        self.contagens = [0] * (len(limites) + 1)
+        self.soma = 0.0
+
+    def observar(self, valor: float) -> None:
+        self.contagens[bisect.bisect_left(self.limites, valor)] += 1
+        self.soma += valor
+
+
+class ConsultasRequisicao:
+    """
+    Consultas SQL executadas durante uma requisição.
+    """
+    __slots__ = ("quantidade", "duracao")
+
+    def __init__(self):
+        self.quantidade = 0
+        self.duracao = 0.0
+
+
+# Acumulador da requisição em andamento (None fora de requisições)
+consultas_requisicao: ContextVar[Optional[ConsultasRequisicao]] = ContextVar("consultas_requisicao", default=None)
+
+
+class Metricas:
+    """
+    Registro em memória das métricas do processo, exposto em /metrics.
+
+    Cada atualização custa alguns incrementos sob um lock sem disputa, o que
+    permite deixar a coleta sempre ligada.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requisicoes: Dict[Rotulos, int] = {}
+        self.latencias: Dict[Rotulos, Histograma] = {}
+        self.em_andamento = 0
+        self.consultas: Dict[Rotulos, int] = {}
+        self.duracao_consultas: Dict[Rotulos, float] = {}
+        self.esperas_pool: Dict[Rotulos, Histograma] = {}
+
+    def iniciar_requisicao(self) -> None:
+        with self._lock:
+            self.em_andamento += 1
+
+    def concluir_requisicao(
+        self,
+        metodo: str,
+        rota: str,
+        status: int,
+        duracao: float,
+        consultas: ConsultasRequisicao
+    ) -> None:
+        rotulos = (("metodo", metodo), ("rota", rota))
+        with self._lock:
+            self.em_andamento -= 1
+            chave = rotulos + (("status", str(status)),)
+            self.requisicoes[chave] = self.requisicoes.get(chave, 0) + 1
+            histograma = self.latencias.get(rotulos)
+            if histograma is None:
+                histograma = self.latencias[rotulos] = Histograma()
+            histograma.observar(duracao)
+            self.consultas[rotulos] = self.consultas.get(rotulos, 0) + consultas.quantidade
+            self.duracao_consultas[rotulos] = self.duracao_consultas.get(rotulos, 0.0) + consultas.duracao
+
+    def registrar_espera_pool(self, pool: str, duracao: float) -> None:
+        rotulos = (("pool", pool),)
+        with self._lock:
+            histograma = self.esperas_pool.get(rotulos)
+            if histograma is None:
+                histograma = self.esperas_pool[rotulos] = Histograma()
+            histograma.observar(duracao)
+
+    def gerar_texto(self, medidores: Iterable[Tuple[str, str, str, Rotulos, float]] = ()) -> str:
+        """
+        Formato de exposição em texto do Prometheus.
+
+        `medidores` acrescenta valores lidos na hora da coleta, como
+        (nome, tipo, ajuda, rótulos, valor).
+        """
+        linhas: List[str] = []
+        with self._lock:
+            _serie(linhas, "http_requisicoes_total", "counter",
+                   "Requisições concluídas por rota e status", self.requisicoes.items())
+            _histogramas(linhas, "http_requisicao_duracao_segundos",
+                         "Latência das requisições por rota", self.latencias.items())
+            _serie(linhas, "http_requisicoes_em_andamento", "gauge",
+                   "Requisições em processamento", [((), self.em_andamento)])
+            _serie(linhas, "db_consultas_total", "counter",
+                   "Comandos SQL executados por rota", self.consultas.items())
+            _serie(linhas, "db_consultas_duracao_segundos_total", "counter",
+                   "Tempo total gasto no banco por rota", self.duracao_consultas.items())
+            _histogramas(linhas, "db_pool_checkout_segundos",
+                         "Espera para obter uma conexão do pool", self.esperas_pool.items())
+
+        por_nome: Dict[str, Tuple[str, str, list]] = {}
+        for nome, tipo, ajuda, rotulos, valor in medidores:
+            por_nome.setdefault(nome, (tipo, ajuda, []))[2].append((rotulos, valor))
+        for nome, (tipo, ajuda, valores) in por_nome.items():
+            _serie(linhas, nome, tipo, ajuda, valores)
+        return "\n".join(linhas) + "\n"
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _rotulos(rotulos: Rotulos) -> str:
+    if not rotulos:
+        return ""
+    return "{" + ",".join(f'{nome}="{_escapar(valor)}"' for nome, valor in rotulos) + "}"
+
+
+def _numero(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def _serie(linhas: List[str], nome: str, tipo: str, ajuda: str, valores) -> None:
+    linhas.append(f"# HELP {nome} {ajuda}")
+    linhas.append(f"# TYPE {nome} {tipo}")
+    for rotulos, valor in valores:
+        linhas.append(f"{nome}{_rotulos(rotulos)} {_numero(valor)}")
+
+
+def _histogramas(linhas: List[str], nome: str, ajuda: str, histogramas) -> None:
+    linhas.append(f"# HELP {nome} {ajuda}")
+    linhas.append(f"# TYPE {nome} histogram")
+    for rotulos, histograma in histogramas:
+        acumulado = 0
+        for limite, contagem in zip(histograma.limites + (float("inf"),), histograma.contagens):
+            acumulado += contagem
+            linhas.append(f"{nome}_bucket{_rotulos(rotulos + (('le', _numero(limite)),))} {acumulado}")
+        linhas.append(f"{nome}_sum{_rotulos(rotulos)} {_numero(histograma.soma)}")
+        linhas.append(f"{nome}_count{_rotulos(rotulos)} {acumulado}")
+
+
+metricas = Metricas()
+
+
+def _antes_do_comando(conn, cursor, statement, parameters, context, executemany):
+    context._metricas_inicio = time.perf_counter()
+
+
+def _depois_do_comando(conn, cursor, statement, parameters, context, executemany):
+    consultas = consultas_requisicao.get()
+    if consultas is not None:
+        consultas.quantidade += 1
+        consultas.duracao += time.perf_counter() - context._metricas_inicio
+
+
+def instrumentar_engine(engine: Engine) -> None:
+    """
+    Soma a quantidade e o tempo dos comandos SQL à requisição em andamento.
+    """
+    event.listen(engine, "before_cursor_execute", _antes_do_comando)
+    event.listen(engine, "after_cursor_execute", _depois_do_comando)
+
+
+def molde_rota(scope: Scope) -> str:
+    """
+    Caminho da rota que atendeu a requisição, com os parâmetros no lugar
+    dos valores (ex.: /api/v1/pacientes/{paciente_id}), para não criar um
+    rótulo por id.
+    """
+    caminho = getattr(scope.get("route"), "path", None)
+    if not isinstance(caminho, str):
+        return ROTA_DESCONHECIDA
+    # A rota de um APIRouter incluído guarda o caminho relativo ao prefixo
+    # do include_router: o prefixo é o que sobra do caminho da requisição
+    # sem os últimos segmentos, um por "/" do molde da rota
+    return scope["path"].rsplit("/", caminho.count("/"))[0] + caminho
+
+
+class MetricasMiddleware:
+    """
+    Mede cada requisição HTTP: quantidade, latência, requisições em
+    andamento e consultas ao banco, rotuladas pelo molde da rota
+    (ex.: /api/v1/pacientes/{paciente_id}).
+    """
+
+    def __init__(self, app: ASGIApp, ignorar: Iterable[str] = ("/metrics",)):
+        self.app = app
+        self.ignorar = set(ignorar)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.ignorar:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def enviar(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        consultas = ConsultasRequisicao()
+        token = consultas_requisicao.set(consultas)
+        metricas.iniciar_requisicao()
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            duracao = time.perf_counter() - inicio
+            consultas_requisicao.reset(token)
+            metricas.concluir_requisicao(scope["method"], molde_rota(scope), status, duracao, consultas)
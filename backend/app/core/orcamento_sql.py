@@ -0,0 +1,173 @@
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+from fastapi import Depends
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .config import settings
+from .metricas import molde_rota
+
+logger = logging.getLogger(__name__)
+
+
+class OrcamentoExcedido(RuntimeError):
+    """
+    Uma requisição executou mais comandos SQL que o orçamento, ou repetiu o
+    mesmo comando mais vezes que o permitido (provável N+1).
+    """
+
+
+class RegistroComandos:
+    """
+    Comandos SQL executados em uma requisição (ou em um bloco de teste),
+    agrupados pelo texto do comando: com os parâmetros separados, comandos
+    iguais indicam o mesmo formato de consulta repetido.
+    """
+
+    def __init__(self, limite: int = 0, repeticoes_maximas: int = 0, acao: str = "log"):
+        self.limite = limite
+        self.repeticoes_maximas = repeticoes_maximas
+        self.acao = acao
+        self.quantidade = 0
+        self.por_comando: Counter = Counter()
+
+    def registrar(self, comando: str) -> None:
+        self.quantidade += 1
+        vezes = self.por_comando[comando] = self.por_comando[comando] + 1
+        if self.acao == "erro" and (
+            (self.limite and self.quantidade > self.limite) or
+            (self.repeticoes_maximas and vezes > self.repeticoes_maximas)
+        ):
+            raise OrcamentoExcedido("; ".join(self.problemas()))
+
+    def repetidos(self) -> List[tuple]:
+        if not self.repeticoes_maximas:
+            return []
+        return [
+            (comando, vezes) for comando, vezes in self.por_comando.most_common()
+            if vezes > self.repeticoes_maximas
+        ]
+
+    def problemas(self) -> List[str]:
+        problemas = []
+        if self.limite and self.quantidade > self.limite:
+            problemas.append(f"{self.quantidade} comandos SQL (orçamento: {self.limite})")
+        for comando, vezes in self.repetidos():
+            problemas.append(f"comando repetido {vezes} vezes: {_resumir(comando)}")
+        return problemas
+
+
+def _resumir(comando: str, tamanho: int = 200) -> str:
+    comando = " ".join(comando.split())
+    return comando if len(comando) <= tamanho else comando[:tamanho] + "..."
+
+
+# Registro da requisição em andamento (None fora de requisições)
+registro_comandos: ContextVar[Optional[RegistroComandos]] = ContextVar("registro_comandos", default=None)
+
+
+def _depois_do_comando(conn, cursor, statement, parameters, context, executemany):
+    registro = registro_comandos.get()
+    if registro is not None:
+        registro.registrar(statement)
+
+
+def instrumentar_engine(engine: Engine) -> None:
+    """
+    Registra cada comando SQL na requisição em andamento.
+    """
+    event.listen(engine, "after_cursor_execute", _depois_do_comando)
+
+
+def orcamento_sql(limite: Optional[int] = None, repeticoes_maximas: Optional[int] = None):
+    """
+    Dependência de rota que troca o orçamento padrão (CONSULTAS_ORCAMENTO /
+    CONSULTAS_REPETIDAS_MAXIMO) da requisição; 0 desativa a verificação.
+    """
+    def ajustar() -> None:
+        registro = registro_comandos.get()
+        if registro is None:
+            return
+        if limite is not None:
+            registro.limite = limite
+        if repeticoes_maximas is not None:
+            registro.repeticoes_maximas = repeticoes_maximas
+
+    return Depends(ajustar)
+
+
+class OrcamentoSqlMiddleware:
+    """
+    Conta os comandos SQL de cada requisição. Quando a requisição passa do
+    orçamento ou repete um mesmo comando demais, registra um aviso no log
+    (CONSULTAS_ORCAMENTO_ACAO="log") ou interrompe o comando que excedeu
+    com OrcamentoExcedido ("erro", para desenvolvimento e CI).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        registro = RegistroComandos(
+            settings.CONSULTAS_ORCAMENTO,
+            settings.CONSULTAS_REPETIDAS_MAXIMO,
+            settings.CONSULTAS_ORCAMENTO_ACAO
+        )
+        token = registro_comandos.set(registro)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            registro_comandos.reset(token)
+            if registro.acao == "log":
+                problemas = registro.problemas()
+                if problemas:
+                    logger.warning("Orçamento de SQL excedido", extra={
+                        "rota": f"{scope['method']} {molde_rota(scope)}",
+                        "comandos": registro.quantidade,
+                        "problemas": problemas,
+                    })
+
+
+@contextmanager
+def maximo_comandos_sql(
+    maximo: int,
+    repeticoes_maximas: int = 0,
+    engine: Optional[Engine] = None
+) -> Iterator[RegistroComandos]:
+    """
+    Auxiliar de testes: falha (AssertionError) se o bloco executar mais de
+    `maximo` comandos SQL, ou repetir um comando mais de `repeticoes_maximas`
+    vezes. Conta tudo o que passa pelo engine, inclusive de outras threads,
+    como a do TestClient:
+
+        with maximo_comandos_sql(4):
+            client.get("/api/v1/pacientes/1/prontuario", headers=cabecalhos)
+    """
+    if engine is None:
+        from ..db.session import async_engine
+        engine = async_engine.sync_engine
+
+    registro = RegistroComandos(maximo, repeticoes_maximas)
+
+    def contar(conn, cursor, statement, parameters, context, executemany):
+        registro.registrar(statement)
+
+    event.listen(engine, "after_cursor_execute", contar)
+    try:
+        yield registro
+    finally:
+        event.remove(engine, "after_cursor_execute", contar)
+
+    problemas = registro.problemas()
+    if problemas:
+        comandos = "\n".join(f"  {vezes}x {_resumir(comando)}" for comando, vezes in registro.por_comando.items())
+        raise AssertionError("; ".join(problemas) + "\n" + comandos)
@@ -1,22 +1,75 @@
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .cache import AUSENTE, CacheMemoria
 from .config import settings
-from ..db.session import get_db
+from .senhas import FilaSenhasCheia, executor_senhas, gerar_hash, pwd_context, verificar, verificar_e_atualizar
+from ..db.session import get_async_db
 from ..models.models import Usuario
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/token")
 
+@dataclass(frozen=True)
+class Principal:
+    """
+    Usuário autenticado da requisição, sem vínculo com a sessão do banco.
+    """
+    id: int
+    email: str
+    nome: str
+    tipo: str
+
+    @classmethod
+    def de_usuario(cls, usuario: Usuario) -> "Principal":
+        return cls(id=usuario.id, email=usuario.email, nome=usuario.nome, tipo=usuario.tipo)
+
+# Usuários autenticados recentemente, por id, para não consultar o banco a cada requisição
+cache_principais = CacheMemoria(
+    tamanho_maximo=settings.PRINCIPAL_CACHE_TAMANHO,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SEGUNDOS
+)
+
+def invalidar_principal(usuario_id: int) -> None:
+    """
+    Descarta o usuário do cache de autenticação.
+
+    Deve ser chamada sempre que um usuário for alterado ou removido.
+    """
+    cache_principais.invalidar(f"usuario:{usuario_id}")
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return verificar(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return gerar_hash(password)
+
+async def _executar_senha(funcao, *args):
+    # bcrypt consome CPU por dezenas de milissegundos: fora do event loop e do threadpool
+    try:
+        return await executor_senhas.executar(funcao, *args)
+    except FilaSenhasCheia:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servidor ocupado, tente novamente",
+            headers={"Retry-After": "1"},
+        )
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _executar_senha(verificar, plain_password, hashed_password)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifica a senha e devolve o novo hash quando o atual usa outro custo de bcrypt.
+    """
+    return await _executar_senha(verificar_e_atualizar, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await _executar_senha(gerar_hash, password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
@@ -28,10 +81,19 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+def create_user_access_token(usuario: Usuario, expires_delta: Optional[timedelta] = None) -> str:
+    """
+    Gera o token de acesso com as claims usadas na autenticação: sub (email), id e tipo.
+    """
+    return create_access_token(
+        data={"sub": usuario.email, "id": usuario.id, "tipo": usuario.tipo},
+        expires_delta=expires_delta
+    )
+
 async def get_current_user(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     token: str = Depends(oauth2_scheme)
-) -> Usuario:
+) -> Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Credenciais inválidas",
@@ -40,12 +102,25 @@ async def get_current_user(
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         email: str = payload.get("sub")
+        usuario_id: Optional[int] = payload.get("id")
         if email is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    
-    user = db.query(Usuario).filter(Usuario.email == email).first()
-    if user is None:
+
+    if usuario_id is not None:
+        principal = cache_principais.obter(f"usuario:{usuario_id}")
+        if principal is not AUSENTE and principal.email == email:
+            return principal
+
+    # Tokens emitidos antes das claims id/tipo são resolvidos pelo email
+    if usuario_id is not None:
+        user = await db.get(Usuario, usuario_id)
+    else:
+        user = await db.scalar(select(Usuario).where(Usuario.email == email))
+    if user is None or user.email != email:
         raise credentials_exception
-    return user 
\ No newline at end of file
+
+    principal = Principal.de_usuario(user)
+    cache_principais.definir(f"usuario:{user.id}", principal, [f"usuario:{user.id}"])
+    return principal
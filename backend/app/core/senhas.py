@@ -0,0 +1,154 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from passlib.context import CryptContext
+
+from .config import settings
+
+# O custo do bcrypt é fixado pelo BCRYPT_ROUNDS: hashes com outro custo são
+# refeitos no próximo login (ver verificar_e_atualizar)
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_desired_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_desired_rounds=settings.BCRYPT_ROUNDS,
+)
+
+
+def gerar_hash(senha: str) -> str:
+    return pwd_context.hash(senha)
+
+
+def verificar(senha: str, hash_senha: str) -> bool:
+    return pwd_context.verify(senha, hash_senha)
+
+
+def verificar_e_atualizar(senha: str, hash_senha: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifica a senha e, se o hash foi gerado com outro custo, devolve um novo hash.
+    """
+    return pwd_context.verify_and_update(senha, hash_senha)
+
+
+def _pronto() -> int:
+    # Executada em cada processo do pool na inicialização: importa este
+    # módulo (passlib, bcrypt) antes do primeiro login
+    return os.getpid()
+
+
+class FilaSenhasCheia(Exception):
+    """
+    Há mais operações de senha aguardando do que SENHA_FILA_MAXIMA.
+    """
+
+
+class ExecutorSenhas:
+    """
+    Executa hash e verificação de senhas fora do event loop e do threadpool
+    das requisições, em um pool de processos limitado.
+
+    No máximo `concorrencia` operações rodam ao mesmo tempo; as demais
+    aguardam, até `fila_maxima`, e a partir daí são recusadas. Com
+    `processos=0` as operações rodam no threadpool, com os mesmos limites.
+    """
+
+    def __init__(self, processos: int, concorrencia: int, fila_maxima: int):
+        self.processos = processos
+        self.concorrencia = concorrencia
+        self.fila_maxima = fila_maxima
+        self.em_execucao = 0
+        self.aguardando = 0
+        self.aguardando_maximo = 0
+        self.concluidas = 0
+        self.recusadas = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._semaforo: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def _obter_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: o processo principal já tem threads (aiosqlite, threadpool)
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.processos,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def _obter_semaforo(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaforo is None or self._loop is not loop:
+            self._semaforo = asyncio.Semaphore(self.concorrencia)
+            self._loop = loop
+        return self._semaforo
+
+    async def executar(self, funcao: Callable[..., Any], *args: Any) -> Any:
+        semaforo = self._obter_semaforo()
+        if semaforo.locked():
+            if self.aguardando >= self.fila_maxima:
+                self.recusadas += 1
+                raise FilaSenhasCheia()
+            self.aguardando += 1
+            self.aguardando_maximo = max(self.aguardando_maximo, self.aguardando)
+            try:
+                await semaforo.acquire()
+            finally:
+                self.aguardando -= 1
+        else:
+            await semaforo.acquire()
+
+        self.em_execucao += 1
+        try:
+            if self.processos > 0:
+                return await asyncio.get_running_loop().run_in_executor(self._obter_pool(), funcao, *args)
+            return await run_in_threadpool(funcao, *args)
+        finally:
+            self.em_execucao -= 1
+            self.concluidas += 1
+            semaforo.release()
+
+    async def aquecer(self) -> int:
+        """
+        Inicia os processos do pool antes do primeiro login (com spawn, cada
+        processo leva centenas de milissegundos para subir).
+
+        Retorna quantos processos responderam.
+        """
+        if self.processos <= 0:
+            return 0
+        pool = self._obter_pool()
+        loop = asyncio.get_running_loop()
+        pids = await asyncio.gather(*(loop.run_in_executor(pool, _pronto) for _ in range(self.processos)))
+        return len(set(pids))
+
+    def estatisticas(self) -> Dict[str, int]:
+        return {
+            "processos": self.processos,
+            "concorrencia": self.concorrencia,
+            "fila_maxima": self.fila_maxima,
+            "em_execucao": self.em_execucao,
+            "aguardando": self.aguardando,
+            "aguardando_maximo": self.aguardando_maximo,
+            "concluidas": self.concluidas,
+            "recusadas": self.recusadas,
+        }
+
+    def encerrar(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True, cancel_futures=True)
+                self._pool = None
+
+
+executor_senhas = ExecutorSenhas(
+    processos=settings.SENHA_PROCESSOS,
+    concorrencia=settings.SENHA_CONCORRENCIA_MAXIMA or max(settings.SENHA_PROCESSOS, 1),
+    fila_maxima=settings.SENHA_FILA_MAXIMA
+)
@@ -1,4 +1,4 @@
 from app.models.base import Base, engine, SessionLocal
 
 # Importar todos os modelos aqui para que o Alembic possa detectá-los
-from app.models.models import Usuario, Medicamento, Consulta, Gasto 
\ No newline at end of file
+from app.models.models import Usuario, Medicamento, Consulta, Gasto, GastoMensal, Importacao, Versao 
\ No newline at end of file
@@ -0,0 +1,79 @@
+from typing import Iterable, List
+
+from sqlalchemy import Integer, String, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.functions import GenericFunction
+
+
+class mes_ano(GenericFunction):
+    """
+    Formata uma data como "AAAA-MM" de acordo com o dialeto do banco.
+    """
+    type = String()
+    inherit_cache = True
+
+
+@compiles(mes_ano)
+def _mes_ano_padrao(element, compiler, **kw):
+    return "to_char(%s, 'YYYY-MM')" % compiler.process(element.clauses, **kw)
+
+
+@compiles(mes_ano, "sqlite")
+def _mes_ano_sqlite(element, compiler, **kw):
+    return "strftime('%%Y-%%m', %s)" % compiler.process(element.clauses, **kw)
+
+
+class mes_numero(GenericFunction):
+    """
+    Meses de uma data desde 1970-01 (o datetime64[M] do NumPy como inteiro),
+    calculados pelo banco para que a leitura não precise converter texto.
+    """
+    type = Integer()
+    inherit_cache = True
+
+
+@compiles(mes_numero)
+def _mes_numero_padrao(element, compiler, **kw):
+    data = compiler.process(element.clauses, **kw)
+    return "((CAST(EXTRACT(YEAR FROM %s) AS INTEGER) - 1970) * 12 + CAST(EXTRACT(MONTH FROM %s) AS INTEGER) - 1)" % (data, data)
+
+
+@compiles(mes_numero, "sqlite")
+def _mes_numero_sqlite(element, compiler, **kw):
+    data = compiler.process(element.clauses, **kw)
+    return "((CAST(strftime('%%Y', %s) AS INTEGER) - 1970) * 12 + CAST(strftime('%%m', %s) AS INTEGER) - 1)" % (data, data)
+
+
+def insert_upsert(db: Session, modelo):
+    """
+    INSERT com suporte a ON CONFLICT do dialeto em uso (PostgreSQL ou SQLite).
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(modelo)
+    return sqlite.insert(modelo)
+
+
+def insert_retornando_ids(db: Session, modelo):
+    """
+    INSERT ... RETURNING id para executemany; os ids recebidos passam por
+    ids_na_ordem para ficarem na ordem das linhas.
+
+    Fora do SQLite, sort_by_parameter_order faz o SQLAlchemy devolvê-los na
+    ordem dos parâmetros (no PostgreSQL, ainda em lotes de várias linhas).
+    No SQLite ele faria um INSERT por linha; lá cada lote é um único INSERT,
+    que gera rowids crescentes na ordem das linhas, e basta ordenar os ids.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        return insert(modelo).returning(modelo.id)
+    return insert(modelo).returning(modelo.id, sort_by_parameter_order=True)
+
+
+def ids_na_ordem(db: Session, ids: Iterable[int]) -> List[int]:
+    """
+    Ids de um insert_retornando_ids, na ordem das linhas inseridas.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        return sorted(ids)
+    return list(ids)
@@ -0,0 +1,85 @@
+import os
+from typing import Optional
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "alembic.ini")
+
+
+class MigracoesPendentes(RuntimeError):
+    """
+    O banco não está na revisão mais recente das migrações.
+    """
+
+
+def alembic_config(engine: Engine) -> Config:
+    """
+    Configuração do Alembic apontando para o banco do engine informado.
+    """
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("sqlalchemy.url", engine.url.render_as_string(hide_password=False).replace("%", "%%"))
+    config.attributes["configurar_logging"] = False
+    return config
+
+
+def _revisao_legada(engine: Engine):
+    """
+    Identifica bancos criados por create_all, antes do Alembic existir.
+
+    Retorna a revisão equivalente ao esquema encontrado, ou None se o banco
+    já é controlado pelo Alembic ou está vazio.
+    """
+    tabelas = set(inspect(engine).get_table_names())
+    if "alembic_version" in tabelas or "usuarios" not in tabelas:
+        return None
+    if "gastos_mensais" in tabelas:
+        return "0002"
+    return "0001"
+
+
+def executar_migracoes(engine: Engine) -> None:
+    """
+    Aplica todas as migrações pendentes (alembic upgrade head).
+    """
+    config = alembic_config(engine)
+    revisao = _revisao_legada(engine)
+    if revisao:
+        command.stamp(config, revisao)
+    command.upgrade(config, "head")
+
+
+def revisao_esperada() -> str:
+    """
+    Revisão mais recente (head) entre as migrações do repositório.
+    """
+    return ScriptDirectory.from_config(Config(ALEMBIC_INI)).get_current_head()
+
+
+def _revisao_atual(conexao: Connection) -> Optional[str]:
+    return MigrationContext.configure(conexao).get_current_revision()
+
+
+async def verificar_migracoes(engine: AsyncEngine) -> str:
+    """
+    Confere, sem alterar nada, se o banco está na revisão head.
+
+    Feita na inicialização do servidor no lugar de aplicar as migrações:
+    várias instâncias (ou workers) podem iniciar juntas sem disputar a
+    escrita do esquema. As migrações são aplicadas antes, com
+    `python -m app.cli migrar`.
+    """
+    esperada = revisao_esperada()
+    async with engine.connect() as conexao:
+        atual = await conexao.run_sync(_revisao_atual)
+    if atual != esperada:
+        raise MigracoesPendentes(
+            f"Banco na revisão {atual or 'vazia'}, esperada {esperada}: "
+            "execute `python -m app.cli migrar` antes de iniciar o servidor"
+        )
+    return atual
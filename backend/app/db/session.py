@@ -1,15 +1,168 @@
-from sqlalchemy import create_engine
+import time
+from contextlib import AsyncExitStack
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine, URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
 from ..core.config import settings
+from ..core import orcamento_sql
+from ..core.metricas import instrumentar_engine, metricas
+
+# Driver assíncrono usado para cada banco suportado
+DRIVERS_ASSINCRONOS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+DRIVERS_JA_ASSINCRONOS = {"aiosqlite", "asyncpg", "psycopg"}
+
+
+def _configurar_sqlite(dbapi_connection, connection_record):
+    """
+    Aplica os pragmas de desempenho a cada nova conexão SQLite.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+class _EsperaMedida:
+    """
+    Registra nas métricas quanto tempo cada checkout esperou por uma conexão
+    (incluindo a abertura de uma nova, quando o pool ainda não está cheio).
+    """
+    nome_metrica = ""
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metricas.registrar_espera_pool(self.nome_metrica, time.perf_counter() - inicio)
+
+
+class PoolMedido(_EsperaMedida, QueuePool):
+    nome_metrica = "sincrono"
+
+
+class PoolAssincronoMedido(_EsperaMedida, AsyncAdaptedQueuePool):
+    nome_metrica = "assincrono"
+
+
+def _opcoes_engine(url: URL, assincrono: bool = False) -> dict:
+    """
+    Opções de pool e conexão comuns aos engines síncrono e assíncrono.
+    """
+    opcoes = {"pool_pre_ping": True}
+    pool_medido = PoolAssincronoMedido if assincrono else PoolMedido
+
+    if url.get_backend_name() == "sqlite":
+        opcoes["connect_args"] = {
+            "check_same_thread": False,
+            "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+        }
+        if url.database in (None, "", ":memory:"):
+            # Banco em memória: todas as sessões precisam da mesma conexão
+            opcoes["poolclass"] = StaticPool
+        else:
+            opcoes.update(
+                poolclass=pool_medido,
+                pool_size=settings.DB_POOL_SIZE,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+                pool_timeout=settings.DB_POOL_TIMEOUT,
+            )
+    else:
+        opcoes.update(
+            poolclass=pool_medido,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+    return opcoes
 
-engine = create_engine(
-    settings.DATABASE_URL, connect_args={"check_same_thread": False}
-)
+
+def criar_engine(url: str = None) -> Engine:
+    """
+    Cria o engine síncrono a partir de DATABASE_URL.
+
+    Em SQLite, ativa WAL e os demais pragmas em cada conexão; nos outros
+    bancos (Postgres), apenas configura o pool de conexões.
+    """
+    url = make_url(url or settings.DATABASE_URL)
+    engine = create_engine(url, **_opcoes_engine(url))
+    if url.get_backend_name() == "sqlite":
+        event.listen(engine, "connect", _configurar_sqlite)
+    instrumentar_engine(engine)
+    orcamento_sql.instrumentar_engine(engine)
+    return engine
+
+
+def url_assincrona(url: str = None) -> URL:
+    """
+    Converte a URL do banco para o driver assíncrono equivalente.
+    """
+    url = make_url(url or settings.DATABASE_URL)
+    driver = DRIVERS_ASSINCRONOS.get(url.get_backend_name())
+    if driver is None or url.drivername.partition("+")[2] in DRIVERS_JA_ASSINCRONOS:
+        return url
+    return url.set(drivername=driver)
+
+
+def criar_engine_assincrono(url: str = None) -> AsyncEngine:
+    """
+    Cria o engine assíncrono (aiosqlite ou asyncpg) usado pelas rotas da API.
+    """
+    url = url_assincrona(url)
+    engine = create_async_engine(url, **_opcoes_engine(url, assincrono=True))
+    if url.get_backend_name() == "sqlite":
+        event.listen(engine.sync_engine, "connect", _configurar_sqlite)
+    instrumentar_engine(engine.sync_engine)
+    orcamento_sql.instrumentar_engine(engine.sync_engine)
+    return engine
+
+
+async def aquecer_pool(engine: AsyncEngine, conexoes: int = None) -> int:
+    """
+    Abre de uma vez as conexões do pool (até DB_POOL_SIZE), para que as
+    primeiras requisições não paguem a abertura e os pragmas de cada uma.
+
+    Retorna quantas conexões foram abertas.
+    """
+    tamanho = getattr(engine.pool, "size", None)
+    if tamanho is None:
+        # StaticPool (SQLite em memória): uma única conexão
+        conexoes = 1
+    else:
+        conexoes = min(conexoes or settings.DB_POOL_SIZE, tamanho())
+    async with AsyncExitStack() as pilha:
+        for _ in range(conexoes):
+            conexao = await pilha.enter_async_context(engine.connect())
+            await conexao.execute(text("SELECT 1"))
+    return conexoes
+
+
+# Engine síncrono: migrações, população do banco e comandos administrativos
+engine = criar_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Engine assíncrono: caminho das requisições
+async_engine = criar_engine_assincrono()
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
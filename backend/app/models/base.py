@@ -1,12 +1,7 @@
-from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./sql_app.db"
+# O engine e a fábrica de sessões são únicos e vivem em app.db.session;
+# são reexportados aqui para quem já os importava deste módulo.
+from ..db.session import engine, SessionLocal
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-Base = declarative_base() 
\ No newline at end of file
+Base = declarative_base()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Index, Boolean
 from sqlalchemy.orm import relationship
 from .base import Base
 from datetime import datetime
@@ -10,7 +10,7 @@ class Usuario(Base):
     nome = Column(String, index=True)
     email = Column(String, unique=True, index=True)
     senha = Column(String)
-    tipo = Column(String)  # "medico" ou "paciente"
+    tipo = Column(String, index=True)  # "medico" ou "paciente"
     cpf = Column(String, unique=True)
 
     # Relacionamentos
@@ -23,6 +23,10 @@ class Usuario(Base):
 
 class Medicamento(Base):
     __tablename__ = "medicamentos"
+    __table_args__ = (
+        Index("ix_medicamentos_medico_id_id", "medico_id", "id"),
+        Index("ix_medicamentos_paciente_id_id", "paciente_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     nome = Column(String, index=True)
@@ -38,6 +42,10 @@ class Medicamento(Base):
 
 class Consulta(Base):
     __tablename__ = "consultas"
+    __table_args__ = (
+        Index("ix_consultas_medico_id_data", "medico_id", "data"),
+        Index("ix_consultas_paciente_id_data", "paciente_id", "data"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     data = Column(DateTime, default=datetime.now)
@@ -51,6 +59,10 @@ class Consulta(Base):
 
 class Gasto(Base):
     __tablename__ = "gastos"
+    __table_args__ = (
+        Index("ix_gastos_paciente_id_categoria_data", "paciente_id", "categoria", "data"),
+        Index("ix_gastos_medico_id_data", "medico_id", "data"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     descricao = Column(Text)
@@ -62,4 +74,44 @@ class Gasto(Base):
 
     # Relacionamentos
     medico = relationship("Usuario", back_populates="gastos_medico", foreign_keys=[medico_id])
-    paciente = relationship("Usuario", back_populates="gastos_paciente", foreign_keys=[paciente_id]) 
\ No newline at end of file
+    paciente = relationship("Usuario", back_populates="gastos_paciente", foreign_keys=[paciente_id]) 
+
+class GastoMensal(Base):
+    """
+    Consolidação mensal dos gastos, mantida junto com cada escrita em gastos.
+    """
+    __tablename__ = "gastos_mensais"
+    __table_args__ = (
+        Index("ix_gastos_mensais_medico_id_categoria", "medico_id", "categoria"),
+    )
+
+    paciente_id = Column(Integer, ForeignKey("usuarios.id"), primary_key=True)
+    medico_id = Column(Integer, ForeignKey("usuarios.id"), primary_key=True)
+    mes = Column(String, primary_key=True)  # "AAAA-MM"
+    categoria = Column(String, primary_key=True)
+    total = Column(Float, nullable=False, default=0)
+    quantidade = Column(Integer, nullable=False, default=0)
+
+class Importacao(Base):
+    """
+    Progresso de uma importação em lote, confirmado na mesma transação de cada lote.
+    """
+    __tablename__ = "importacoes"
+
+    arquivo = Column(String, primary_key=True)  # caminho absoluto do arquivo importado
+    tipo = Column(String, primary_key=True)  # "consultas", "gastos" ou "medicamentos"
+    registros = Column(Integer, nullable=False, default=0)  # registros já processados
+    inseridos = Column(Integer, nullable=False, default=0)
+    rejeitados = Column(Integer, nullable=False, default=0)
+    concluida = Column(Boolean, nullable=False, default=False)
+    atualizado_em = Column(DateTime, nullable=False, default=datetime.now)
+
+class Versao(Base):
+    """
+    Contador de alterações por escopo ("paciente:3", "medico:1", "pacientes"),
+    incrementado na mesma transação de cada escrita. Base dos ETags das rotas GET.
+    """
+    __tablename__ = "versoes"
+
+    escopo = Column(String, primary_key=True)
+    versao = Column(Integer, nullable=False, default=0)
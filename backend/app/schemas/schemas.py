@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
 # Token
@@ -36,6 +36,9 @@ class MedicamentoBase(BaseModel):
 class MedicamentoCreate(MedicamentoBase):
     pass
 
+class MedicamentoImportacao(MedicamentoBase):
+    medico_id: int
+
 class MedicamentoResponse(MedicamentoBase):
     id: int
     medico_id: int
@@ -51,6 +54,10 @@ class ConsultaBase(BaseModel):
 class ConsultaCreate(ConsultaBase):
     pass
 
+class ConsultaImportacao(ConsultaBase):
+    data: datetime
+    medico_id: int
+
 class ConsultaResponse(ConsultaBase):
     id: int
     data: datetime
@@ -69,10 +76,74 @@ class GastoBase(BaseModel):
 class GastoCreate(GastoBase):
     pass
 
+class GastoImportacao(GastoBase):
+    data: datetime
+    medico_id: int
+
 class GastoResponse(GastoBase):
     id: int
     data: datetime
     medico_id: int
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+
+# Lote
+class ItemLoteResultado(BaseModel):
+    indice: int
+    id: Optional[int] = None
+    erro: Optional[str] = None
+
+class LoteResultado(BaseModel):
+    criados: int
+    erros: int
+    itens: List[ItemLoteResultado]
+
+# Prontuário
+class MedicoResumo(BaseModel):
+    id: int
+    nome: str
+
+    class Config:
+        from_attributes = True
+
+class MedicamentoProntuario(MedicamentoResponse):
+    medico: MedicoResumo
+
+class ConsultaProntuario(ConsultaResponse):
+    medico: MedicoResumo
+
+class ProntuarioResponse(BaseModel):
+    paciente: UsuarioResponse
+    medicamentos: List[MedicamentoProntuario]
+    consultas: List[ConsultaProntuario]
+    gastos: List[GastoResponse]
+
+# Dashboard
+class DashboardTotais(BaseModel):
+    pacientes: int
+    medicamentos: int
+    consultas: int
+    gastos: int
+    gasto_total: float
+
+class DashboardMedicoResponse(BaseModel):
+    pacientes: List[UsuarioResponse]
+    medicamentos: List[MedicamentoResponse]
+    consultas: List[ConsultaResponse]
+    gastos: List[GastoResponse]
+    totais: DashboardTotais
+    # Cursor da próxima página de cada seção, para continuar nas rotas de listagem
+    cursores: Dict[str, str]
+
+# Busca
+class ResultadoBusca(BaseModel):
+    tipo: str  # "consulta" ou "medicamento"
+    id: int
+    # Trecho do texto com os termos encontrados entre « e »
+    trecho: str
+    relevancia: float
+    medico_id: Optional[int] = None
+    paciente_id: Optional[int] = None
+    data: Optional[datetime] = None  # consultas
+    nome: Optional[str] = None  # medicamentos
\ No newline at end of file
@@ -0,0 +1,254 @@
+from datetime import datetime
+from operator import itemgetter
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..db.funcoes import mes_numero
+from ..models.models import Gasto
+
+# Percentis calculados por padrão em percentis_por_categoria
+PERCENTIS_PADRAO = (50, 90, 95, 99)
+
+# Linhas lidas do cursor por vez ao montar a série
+TAMANHO_LOTE_LEITURA = 10000
+
+
+class SerieGastos:
+    """
+    Gastos de um escopo como colunas NumPy, uma posição por gasto.
+
+    `categoria` guarda o índice em `categorias` e `mes` a quantidade de
+    meses desde 1970-01 (datetime64[M] como inteiro), para que agrupamentos
+    virem np.bincount sobre índices.
+    """
+
+    def __init__(
+        self,
+        paciente_id: np.ndarray,
+        categoria: np.ndarray,
+        categorias: np.ndarray,
+        mes: np.ndarray,
+        valor: np.ndarray
+    ):
+        self.paciente_id = paciente_id
+        self.categoria = categoria
+        self.categorias = categorias
+        self.mes = mes
+        self.valor = valor
+
+    def __len__(self) -> int:
+        return len(self.valor)
+
+    @classmethod
+    def vazia(cls) -> "SerieGastos":
+        return cls(
+            np.empty(0, np.int64), np.empty(0, np.intp), np.empty(0, str),
+            np.empty(0, np.int64), np.empty(0, np.float64)
+        )
+
+    @classmethod
+    def de_cursor(cls, cursor, tamanho_lote: int = TAMANHO_LOTE_LEITURA) -> "SerieGastos":
+        """
+        Monta a série a partir de um cursor DBAPI com linhas (paciente_id,
+        categoria, mês como em mes_numero, valor).
+
+        Cada lote do fetchmany vira colunas int64/float64 sem passar por
+        objetos Row nem arrays de objetos; a categoria vira código (ordem de
+        aparição) ainda no lote, e os códigos são renumerados na ordem
+        alfabética no final.
+        """
+        codigos: Dict[str, int] = {}
+        lotes = []
+        while True:
+            linhas = cursor.fetchmany(tamanho_lote)
+            if not linhas:
+                break
+            quantidade = len(linhas)
+            lotes.append((
+                np.fromiter(map(itemgetter(0), linhas), np.int64, quantidade),
+                np.fromiter(
+                    (codigos.setdefault(categoria, len(codigos)) for categoria in map(itemgetter(1), linhas)),
+                    np.intp, quantidade
+                ),
+                np.fromiter(map(itemgetter(2), linhas), np.int64, quantidade),
+                np.fromiter(map(itemgetter(3), linhas), np.float64, quantidade),
+            ))
+        if not lotes:
+            return cls.vazia()
+
+        paciente_id, categoria, mes, valor = (np.concatenate(coluna) for coluna in zip(*lotes))
+        nomes = np.array([str(nome) for nome in codigos])
+        ordem = np.argsort(nomes, kind="stable")
+        renumeracao = np.empty(len(ordem), np.intp)
+        renumeracao[ordem] = np.arange(len(ordem))
+        return cls(paciente_id, renumeracao[categoria], nomes[ordem], mes, valor)
+
+
+def carregar_serie(
+    db: Session,
+    medico_id: Optional[int] = None,
+    paciente_id: Optional[int] = None,
+    data_inicio: Optional[datetime] = None,
+    data_fim: Optional[datetime] = None
+) -> SerieGastos:
+    """
+    Lê de uma vez as colunas (paciente, categoria, mês, valor) dos gastos do
+    médico e/ou do paciente no período. O mês já vem do banco como inteiro
+    (mes_numero) e as linhas são lidas direto do cursor DBAPI.
+    """
+    query = select(Gasto.paciente_id, Gasto.categoria, mes_numero(Gasto.data), func.coalesce(Gasto.valor, 0.0))
+    if medico_id is not None:
+        query = query.where(Gasto.medico_id == medico_id)
+    if paciente_id is not None:
+        query = query.where(Gasto.paciente_id == paciente_id)
+    if data_inicio:
+        query = query.where(Gasto.data >= data_inicio)
+    if data_fim:
+        query = query.where(Gasto.data <= data_fim)
+    resultado = db.connection().execute(query)
+    try:
+        return SerieGastos.de_cursor(resultado.cursor)
+    finally:
+        resultado.close()
+
+
+def _rotulos_meses(inicio: int, quantidade: int) -> List[str]:
+    meses = np.arange(inicio, inicio + quantidade).astype("datetime64[M]")
+    return np.datetime_as_string(meses, unit="M").tolist()
+
+
+def _mes_numero(momento: datetime) -> int:
+    return int(np.datetime64(momento.strftime("%Y-%m"), "M").astype(np.int64))
+
+
+def medias_moveis(serie: SerieGastos, janela: int = 3) -> List[Dict]:
+    """
+    Total mensal (geral e por categoria) e média móvel do total nos últimos
+    `janela` meses, do primeiro ao último mês com gastos, incluindo os meses
+    sem gasto no meio. A média só aparece quando há `janela` meses de
+    histórico.
+    """
+    if not len(serie):
+        return []
+    primeiro = int(serie.mes.min())
+    quantidade = int(serie.mes.max()) - primeiro + 1
+    categorias = len(serie.categorias)
+
+    por_categoria = np.bincount(
+        serie.categoria * quantidade + (serie.mes - primeiro),
+        weights=serie.valor,
+        minlength=categorias * quantidade
+    ).reshape(categorias, quantidade)
+    totais = por_categoria.sum(axis=0)
+
+    acumulado = np.concatenate(([0.0], np.cumsum(totais)))
+    medias = np.full(quantidade, np.nan)
+    if quantidade >= janela:
+        medias[janela - 1:] = (acumulado[janela:] - acumulado[:-janela]) / janela
+
+    nomes = serie.categorias.tolist()
+    colunas = por_categoria.T.tolist()
+    return [
+        {
+            "mes": mes,
+            "total": total,
+            "media_movel": None if np.isnan(media) else media,
+            "por_categoria": dict(zip(nomes, valores)),
+        }
+        for mes, total, media, valores in zip(_rotulos_meses(primeiro, quantidade), totais.tolist(), medias.tolist(), colunas)
+    ]
+
+
+def percentis_por_categoria(serie: SerieGastos, percentis: Sequence[float] = PERCENTIS_PADRAO) -> List[Dict]:
+    """
+    Quantidade, soma, média e percentis do valor dos gastos de cada
+    categoria, com a mesma interpolação linear de np.percentile.
+
+    Um único lexsort ordena os valores dentro de cada categoria; os
+    percentis de todas as categorias saem de uma indexação vetorizada.
+    """
+    if not len(serie):
+        return []
+    categorias = len(serie.categorias)
+    ordenados = serie.valor[np.lexsort((serie.valor, serie.categoria))]
+    quantidades = np.bincount(serie.categoria, minlength=categorias)
+    somas = np.bincount(serie.categoria, weights=serie.valor, minlength=categorias)
+    inicios = np.cumsum(quantidades) - quantidades
+
+    fracoes = np.asarray(percentis, dtype=np.float64) / 100
+    posicoes = inicios[:, None] + (quantidades[:, None] - 1) * fracoes[None, :]
+    abaixo = np.floor(posicoes).astype(np.int64)
+    acima = np.minimum(abaixo + 1, (inicios + quantidades - 1)[:, None])
+    valores = ordenados[abaixo] + (ordenados[acima] - ordenados[abaixo]) * (posicoes - abaixo)
+
+    rotulos = [f"p{p:g}" for p in percentis]
+    return [
+        {
+            "categoria": categoria,
+            "quantidade": quantidade,
+            "total": soma,
+            "media": soma / quantidade,
+            "percentis": dict(zip(rotulos, linha)),
+        }
+        for categoria, quantidade, soma, linha in zip(
+            serie.categorias.tolist(), quantidades.tolist(), somas.tolist(), valores.tolist()
+        )
+    ]
+
+
+def previsao_proximo_mes(
+    serie: SerieGastos,
+    meses: int = 6,
+    ate: Optional[datetime] = None,
+    limite: Optional[int] = None
+) -> Dict:
+    """
+    Prevê o gasto de cada paciente no mês seguinte ao de `ate` (padrão: o
+    mês corrente) por regressão linear sobre os totais dos `meses` meses
+    completos anteriores ao de `ate`, contando como zero os meses sem gasto.
+    O mês de `ate` ainda está em andamento e fica fora do histórico; a
+    reta é estendida por dois meses. A previsão nunca é negativa.
+
+    Os mínimos quadrados de todos os pacientes são resolvidos juntos, como
+    operações sobre a matriz paciente x mês. `limite` restringe a lista aos
+    pacientes com maior previsão; o total previsto considera todos.
+    """
+    atual = _mes_numero(ate or datetime.now())
+    alvo = atual + 1
+    primeiro = atual - meses
+    resultado = {"mes_previsto": _rotulos_meses(alvo, 1)[0], "meses_historico": meses, "total_previsto": 0.0, "pacientes": []}
+
+    no_historico = (serie.mes >= primeiro) & (serie.mes < atual)
+    if not no_historico.any():
+        return resultado
+    pacientes, indice = np.unique(serie.paciente_id[no_historico], return_inverse=True)
+    historico = np.bincount(
+        indice * meses + (serie.mes[no_historico] - primeiro),
+        weights=serie.valor[no_historico],
+        minlength=len(pacientes) * meses
+    ).reshape(len(pacientes), meses)
+
+    x = np.arange(meses, dtype=np.float64)
+    x_centrado = x - x.mean()
+    medias = historico.mean(axis=1)
+    if meses > 1:
+        inclinacoes = (historico - medias[:, None]) @ x_centrado / (x_centrado @ x_centrado)
+    else:
+        inclinacoes = np.zeros(len(pacientes))
+    previsoes = np.maximum(medias + inclinacoes * (alvo - primeiro - x.mean()), 0.0)
+
+    ordem = np.lexsort((pacientes, -previsoes))
+    if limite is not None:
+        ordem = ordem[:limite]
+    resultado["total_previsto"] = float(previsoes.sum())
+    resultado["pacientes"] = [
+        {"paciente_id": paciente_id, "previsao": previsao, "tendencia": inclinacao, "media_historico": media}
+        for paciente_id, previsao, inclinacao, media in zip(
+            pacientes[ordem].tolist(), previsoes[ordem].tolist(),
+            inclinacoes[ordem].tolist(), medias[ordem].tolist()
+        )
+    ]
+    return resultado
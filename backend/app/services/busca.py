@@ -0,0 +1,111 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from ..models.models import Consulta, Medicamento
+
+# Tabela FTS5 criada pela migração 0006 (rowid = id * 2 + TIPOS[tipo])
+TABELA_BUSCA = "busca_textual"
+TIPOS = {"consulta": 0, "medicamento": 1}
+
+# Marcadores dos termos encontrados no trecho devolvido
+MARCA_INICIO = "«"
+MARCA_FIM = "»"
+
+# Peso 0 na coluna dono: o filtro por usuário não influencia a relevância
+_RELEVANCIA = f"bm25({TABELA_BUSCA}, 1.0, 0.0)"
+
+_CONSULTA = f"""
+SELECT rowid, {_RELEVANCIA} AS relevancia,
+       snippet({TABELA_BUSCA}, 0, :marca_inicio, :marca_fim, '…', 16) AS trecho
+FROM {TABELA_BUSCA}
+WHERE {TABELA_BUSCA} MATCH :expressao {{filtros}}
+ORDER BY relevancia, rowid
+LIMIT :limite
+"""
+
+
+def expressao_busca(termos: str, dono: str) -> Optional[str]:
+    """
+    Monta a expressão MATCH: todos os termos, como prefixo (`hipertens`
+    encontra hipertensão e hipertensivo), restritos aos registros do dono.
+
+    Só as palavras do texto são usadas, entre aspas, então nenhuma entrada
+    do usuário é interpretada como sintaxe do FTS5. Retorna None se não há
+    palavras.
+    """
+    palavras = re.findall(r"\w+", termos)
+    if not palavras:
+        return None
+    return f'dono : "{dono}" AND texto : (' + " AND ".join(f'"{palavra}"*' for palavra in palavras) + ")"
+
+
+def dono_usuario(usuario_id: int, tipo: str) -> str:
+    return f"m{usuario_id}" if tipo == "medico" else f"p{usuario_id}"
+
+
+def buscar(
+    db: Session,
+    expressao: str,
+    limite: int,
+    tipo: Optional[str] = None,
+    apos: Optional[Tuple[float, int]] = None
+) -> Tuple[List[Dict], Optional[Tuple[float, int]]]:
+    """
+    Busca no índice textual, da maior para a menor relevância (bm25), e
+    completa cada resultado com os campos do registro de origem.
+
+    `apos` é a (relevância, rowid) do último item da página anterior.
+    Retorna os itens e a chave para a próxima página (None na última).
+    """
+    filtros = []
+    parametros = {
+        "expressao": expressao,
+        "limite": limite + 1,
+        "marca_inicio": MARCA_INICIO,
+        "marca_fim": MARCA_FIM,
+    }
+    if tipo is not None:
+        filtros.append("AND rowid % 2 = :tipo")
+        parametros["tipo"] = TIPOS[tipo]
+    if apos is not None:
+        filtros.append(f"AND ({_RELEVANCIA} > :relevancia OR ({_RELEVANCIA} = :relevancia AND rowid > :rowid))")
+        parametros["relevancia"], parametros["rowid"] = apos
+
+    linhas = db.execute(text(_CONSULTA.format(filtros=" ".join(filtros))), parametros).all()
+    proxima = None
+    if len(linhas) > limite:
+        linhas = linhas[:limite]
+        proxima = (linhas[-1].relevancia, linhas[-1].rowid)
+
+    ids = {nome: [linha.rowid // 2 for linha in linhas if linha.rowid % 2 == valor] for nome, valor in TIPOS.items()}
+    registros = {}
+    if ids["consulta"]:
+        for consulta in db.execute(
+            select(Consulta.id, Consulta.data, Consulta.medico_id, Consulta.paciente_id)
+            .where(Consulta.id.in_(ids["consulta"]))
+        ):
+            registros[consulta.id * 2] = {"data": consulta.data, "medico_id": consulta.medico_id, "paciente_id": consulta.paciente_id}
+    if ids["medicamento"]:
+        for medicamento in db.execute(
+            select(Medicamento.id, Medicamento.nome, Medicamento.medico_id, Medicamento.paciente_id)
+            .where(Medicamento.id.in_(ids["medicamento"]))
+        ):
+            registros[medicamento.id * 2 + 1] = {
+                "nome": medicamento.nome, "medico_id": medicamento.medico_id, "paciente_id": medicamento.paciente_id
+            }
+
+    itens = [
+        {
+            "tipo": "consulta" if linha.rowid % 2 == TIPOS["consulta"] else "medicamento",
+            "id": linha.rowid // 2,
+            "trecho": linha.trecho,
+            "relevancia": -linha.relevancia,
+            **registros[linha.rowid],
+        }
+        for linha in linhas
+        if linha.rowid in registros
+    ]
+    return itens, proxima
@@ -0,0 +1,216 @@
+import math
+import random
+import time
+from datetime import date, datetime, time as hora, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from ..core.senhas import gerar_hash
+from ..db.funcoes import ids_na_ordem, insert_retornando_ids
+from ..models.models import Consulta, Gasto, Medicamento, Usuario
+from .gastos_mensais import Variacoes, aplicar_variacoes
+from .estatisticas_service import escopo_medico, escopo_paciente
+from .versoes import ESCOPO_PACIENTES, incrementar_versoes
+
+DOMINIO = "sintetico.local"
+
+# (nome, descrição, dosagem, frequência) das prescrições geradas
+CATALOGO_MEDICAMENTOS = [
+    ("Losartana", "Anti-hipertensivo", "50mg", "1x ao dia"),
+    ("Metformina", "Antidiabético oral", "850mg", "12/12 horas"),
+    ("Sinvastatina", "Redutor de colesterol", "20mg", "1x ao dia, à noite"),
+    ("Omeprazol", "Protetor gástrico", "20mg", "1x ao dia, em jejum"),
+    ("Levotiroxina", "Hormônio tireoidiano", "50mcg", "1x ao dia, em jejum"),
+    ("Amoxicilina", "Antibiótico", "500mg", "8/8 horas por 7 dias"),
+    ("Dipirona", "Analgésico e antitérmico", "1g", "6/6 horas se dor"),
+    ("Paracetamol", "Analgésico e antitérmico", "500mg", "8/8 horas se dor"),
+    ("Ibuprofeno", "Anti-inflamatório", "600mg", "8/8 horas por 5 dias"),
+    ("Sertralina", "Antidepressivo", "50mg", "1x ao dia"),
+    ("Enalapril", "Anti-hipertensivo", "10mg", "12/12 horas"),
+    ("Salbutamol", "Broncodilatador", "100mcg", "2 jatos se falta de ar"),
+]
+
+MOTIVOS_CONSULTA = ["Consulta de rotina", "Retorno", "Avaliação de exames", "Queixa aguda", "Acompanhamento"]
+EXAMES = ["Hemograma", "Glicemia", "Perfil lipídico", "Raio-X", "Ultrassonografia", "Eletrocardiograma"]
+
+
+def email_medico(numero: int, semente: int) -> str:
+    return f"medico{numero}.s{semente}@{DOMINIO}"
+
+
+def email_paciente(numero: int, semente: int) -> str:
+    return f"paciente{numero}.s{semente}@{DOMINIO}"
+
+
+class _Buffer:
+    """
+    Linhas pendentes de cada tabela, gravadas com um executemany por tabela
+    quando o lote enche.
+    """
+
+    def __init__(self, db: Session, tamanho: int):
+        self.db = db
+        self.tamanho = tamanho
+        self.linhas: Dict[type, List[dict]] = {Consulta: [], Gasto: [], Medicamento: []}
+        self.variacoes: Variacoes = {}
+        self.inseridas: Dict[str, int] = {"consultas": 0, "gastos": 0, "medicamentos": 0}
+
+    def gasto(self, linha: dict) -> None:
+        self.linhas[Gasto].append(linha)
+        chave = (linha["paciente_id"], linha["medico_id"], linha["data"].strftime("%Y-%m"), linha["categoria"])
+        total, quantidade = self.variacoes.get(chave, (0.0, 0))
+        self.variacoes[chave] = (total + linha["valor"], quantidade + 1)
+
+    def cheio(self) -> bool:
+        return sum(len(linhas) for linhas in self.linhas.values()) >= self.tamanho
+
+    def gravar(self) -> None:
+        """
+        Insere as linhas pendentes e a consolidação mensal e incrementa as
+        versões dos pacientes e médicos tocados, tudo no mesmo commit.
+        """
+        pacientes, medicos = set(), set()
+        for modelo, linhas in self.linhas.items():
+            if linhas:
+                self.db.execute(insert(modelo.__table__), linhas)
+                self.inseridas[modelo.__tablename__] += len(linhas)
+                pacientes.update(linha["paciente_id"] for linha in linhas)
+                medicos.update(linha["medico_id"] for linha in linhas)
+                linhas.clear()
+        aplicar_variacoes(self.db, self.variacoes)
+        self.variacoes = {}
+        incrementar_versoes(self.db, [escopo_paciente(id_) for id_ in pacientes] + [escopo_medico(id_) for id_ in medicos])
+        self.db.commit()
+
+
+def gerar_dados(
+    db: Session,
+    medicos: int = 10,
+    pacientes_por_medico: int = 100,
+    anos: float = 3,
+    semente: int = 42,
+    ate: Optional[date] = None,
+    tamanho_lote: int = 20000,
+    senha: str = "senha123",
+    relatar: Callable[[str], None] = print,
+) -> Dict:
+    """
+    Gera médicos, pacientes e `anos` de histórico (consultas, gastos e
+    prescrições) terminando em `ate` (padrão: hoje).
+
+    A mesma semente e a mesma data final produzem exatamente os mesmos
+    dados. As linhas são inseridas com executemany do Core em lotes de
+    `tamanho_lote`, e a consolidação mensal dos gastos é atualizada a
+    cada lote.
+
+    Distribuições usadas, por paciente:
+    - frequência de consultas ~ Gama (média de 6 por ano, com pacientes
+      bem mais assíduos que outros) e datas como processo de Poisson;
+    - cada consulta gera um gasto de consulta (~ Normal(200, 40)) e, em
+      35% dos casos, um exame (~ LogNormal, mediana ~ R$ 120);
+    - 30% dos pacientes são crônicos: 1 a 3 medicamentos contínuos e um
+      gasto mensal de farmácia (~ LogNormal, mediana ~ R$ 90);
+    - prescrições avulsas ~ Poisson(média 2).
+
+    Todos os usuários gerados têm a senha `senha`.
+    """
+    aleatorio = random.Random(semente)
+    fim = datetime.combine(ate or date.today(), hora())
+    inicio_historico = fim - timedelta(days=365 * anos)
+    dias_historico = (fim - inicio_historico).total_seconds() / 86400
+
+    if db.scalar(select(Usuario.id).where(Usuario.email == email_medico(1, semente))):
+        raise ValueError(f"Dados da semente {semente} já foram gerados neste banco")
+
+    inicio = time.perf_counter()
+    senha_hash = gerar_hash(senha)
+    ids_medicos = ids_na_ordem(db, db.scalars(insert_retornando_ids(db, Usuario), [
+        {"nome": f"Médico Sintético {n}", "email": email_medico(n, semente), "senha": senha_hash, "tipo": "medico"}
+        for n in range(1, medicos + 1)
+    ]))
+    total_pacientes = medicos * pacientes_por_medico
+    ids_pacientes: List[int] = []
+    for primeiro in range(1, total_pacientes + 1, tamanho_lote):
+        ids_pacientes += ids_na_ordem(db, db.scalars(insert_retornando_ids(db, Usuario), [
+            {"nome": f"Paciente Sintético {n}", "email": email_paciente(n, semente), "senha": senha_hash, "tipo": "paciente"}
+            for n in range(primeiro, min(primeiro + tamanho_lote, total_pacientes + 1))
+        ]))
+    incrementar_versoes(db, [ESCOPO_PACIENTES] + [escopo_medico(id_) for id_ in ids_medicos])
+    db.commit()
+
+    buffer = _Buffer(db, tamanho_lote)
+    for n, paciente_id in enumerate(ids_pacientes):
+        medico_id = ids_medicos[n // pacientes_por_medico]
+
+        # Consultas: processo de Poisson com taxa própria do paciente
+        taxa_dia = aleatorio.gammavariate(2.0, 3.0) / 365
+        dia = aleatorio.expovariate(taxa_dia)
+        while dia < dias_historico:
+            data = inicio_historico + timedelta(days=dia, minutes=aleatorio.randrange(8 * 60, 18 * 60))
+            buffer.linhas[Consulta].append({
+                "data": data, "descricao": aleatorio.choice(MOTIVOS_CONSULTA),
+                "medico_id": medico_id, "paciente_id": paciente_id,
+            })
+            buffer.gasto({
+                "descricao": "Consulta", "valor": round(max(aleatorio.gauss(200, 40), 60), 2),
+                "categoria": "consulta", "data": data, "medico_id": medico_id, "paciente_id": paciente_id,
+            })
+            if aleatorio.random() < 0.35:
+                buffer.gasto({
+                    "descricao": aleatorio.choice(EXAMES), "valor": round(aleatorio.lognormvariate(math.log(120), 0.6), 2),
+                    "categoria": "exame", "data": min(data + timedelta(days=aleatorio.randint(1, 10)), fim),
+                    "medico_id": medico_id, "paciente_id": paciente_id,
+                })
+            dia += aleatorio.expovariate(taxa_dia)
+
+        # Prescrições: contínuas para os crônicos, avulsas para todos
+        cronico = aleatorio.random() < 0.3
+        continuos = aleatorio.randint(1, 3) if cronico else 0
+        avulsas = _poisson(aleatorio, 2.0)
+        for nome, descricao, dosagem, frequencia in aleatorio.sample(CATALOGO_MEDICAMENTOS, min(continuos + avulsas, len(CATALOGO_MEDICAMENTOS))):
+            buffer.linhas[Medicamento].append({
+                "nome": nome, "descricao": descricao, "dosagem": dosagem, "frequencia": frequencia,
+                "medico_id": medico_id, "paciente_id": paciente_id,
+            })
+        if cronico:
+            mensal = aleatorio.lognormvariate(math.log(90), 0.4) * continuos
+            dia = aleatorio.uniform(0, 30)
+            while dia < dias_historico:
+                buffer.gasto({
+                    "descricao": "Farmácia", "valor": round(mensal * aleatorio.uniform(0.9, 1.1), 2),
+                    "categoria": "medicamento", "data": inicio_historico + timedelta(days=dia),
+                    "medico_id": medico_id, "paciente_id": paciente_id,
+                })
+                dia += aleatorio.uniform(27, 33)
+
+        if buffer.cheio():
+            buffer.gravar()
+            decorrido = time.perf_counter() - inicio
+            linhas = sum(buffer.inseridas.values())
+            relatar(f"{n + 1}/{total_pacientes} pacientes - {linhas} linhas ({linhas / decorrido:.0f} linhas/s)")
+    buffer.gravar()
+
+    duracao = time.perf_counter() - inicio
+    linhas = sum(buffer.inseridas.values()) + medicos + total_pacientes
+    return {
+        "semente": semente,
+        "ate": fim.date().isoformat(),
+        "medicos": medicos,
+        "pacientes": total_pacientes,
+        **buffer.inseridas,
+        "duracao_s": round(duracao, 3),
+        "linhas_s": round(linhas / duracao, 1) if duracao else 0.0,
+        "email_primeiro_medico": email_medico(1, semente),
+    }
+
+
+def _poisson(aleatorio: random.Random, media: float) -> int:
+    # Algoritmo de Knuth: suficiente para médias pequenas
+    limite = math.exp(-media)
+    quantidade, produto = 0, aleatorio.random()
+    while produto > limite:
+        quantidade += 1
+        produto *= aleatorio.random()
+    return quantidade
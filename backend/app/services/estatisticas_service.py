@@ -0,0 +1,300 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import case, func, select, union
+from typing import Dict, Iterable, List, Optional, Tuple
+from datetime import datetime, timedelta
+
+from ..core.cache import cache_estatisticas, cache_series
+from ..db.funcoes import mes_ano
+from ..models.models import Gasto, GastoMensal, Usuario, Consulta
+
+# Quantidade de meses exibidos no gráfico do dashboard do paciente
+MESES_GRAFICO = 6
+
+
+def escopo_paciente(paciente_id: int) -> str:
+    return f"paciente:{paciente_id}"
+
+
+def escopo_medico(medico_id: int) -> str:
+    return f"medico:{medico_id}"
+
+
+def invalidar_estatisticas(paciente_id: int, medico_id: Optional[int] = None) -> None:
+    """
+    Descarta do cache as estatísticas afetadas por uma escrita no paciente.
+
+    Deve ser chamada depois do commit da escrita.
+    """
+    escopos = [escopo_paciente(paciente_id)]
+    if medico_id is not None:
+        escopos.append(escopo_medico(medico_id))
+    cache_estatisticas.invalidar(*escopos)
+    cache_series.invalidar(*escopos)
+
+
+def meses_grafico(agora: Optional[datetime] = None) -> List[str]:
+    """
+    Retorna os rótulos "AAAA-MM" dos meses do gráfico, do mais antigo ao atual.
+    """
+    agora = agora or datetime.now()
+    return [
+        (agora - timedelta(days=30 * i)).strftime("%Y-%m")
+        for i in range(MESES_GRAFICO - 1, -1, -1)
+    ]
+
+
+def montar_estatisticas(
+    linhas: Iterable[Tuple[str, str, float]],
+    total_consultas: int,
+    agora: Optional[datetime] = None
+) -> dict:
+    """
+    Monta a resposta de estatísticas a partir das somas por (mês, categoria).
+    """
+    por_mes: Dict[Tuple[str, str], float] = {}
+    por_categoria: Dict[str, float] = {}
+    for mes, categoria, total in linhas:
+        total = float(total or 0)
+        por_mes[(mes, categoria)] = por_mes.get((mes, categoria), 0.0) + total
+        por_categoria[categoria] = por_categoria.get(categoria, 0.0) + total
+
+    dados_grafico = []
+    for mes in meses_grafico(agora):
+        valor_consulta = por_mes.get((mes, "consulta"), 0.0)
+        valor_medicamento = por_mes.get((mes, "medicamento"), 0.0)
+        dados_grafico.append({
+            "data": mes,
+            "valor_consulta": valor_consulta,
+            "valor_medicamento": valor_medicamento,
+            "total": valor_consulta + valor_medicamento
+        })
+
+    return {
+        "gasto_total": sum(por_categoria.values()),
+        "gasto_consultas": por_categoria.get("consulta", 0.0),
+        "gasto_medicamentos": por_categoria.get("medicamento", 0.0),
+        "total_consultas": total_consultas,
+        "dados_grafico": dados_grafico
+    }
+
+
+def calcular_estatisticas_paciente(
+    db: Session,
+    paciente_id: int,
+    agora: Optional[datetime] = None
+) -> Optional[dict]:
+    """
+    Calcula as estatísticas de um paciente em duas idas ao banco.
+
+    A primeira verifica o paciente e conta suas consultas; a segunda lê a
+    consolidação mensal (gastos_mensais) agrupada por (mês, categoria), de
+    onde saem os totais e o gráfico.
+    Retorna None se o paciente não existir.
+    """
+    total_consultas = db.query(func.count(Consulta.id)).filter(
+        Consulta.paciente_id == paciente_id
+    ).scalar_subquery()
+
+    paciente = db.query(
+        Usuario.id,
+        total_consultas.label("total_consultas")
+    ).filter(
+        Usuario.id == paciente_id,
+        Usuario.tipo == "paciente"
+    ).first()
+    if not paciente:
+        return None
+
+    linhas = db.query(
+        GastoMensal.mes,
+        GastoMensal.categoria,
+        func.sum(GastoMensal.total)
+    ).filter(
+        GastoMensal.paciente_id == paciente_id
+    ).group_by(GastoMensal.mes, GastoMensal.categoria).all()
+
+    return montar_estatisticas(linhas, paciente.total_consultas or 0, agora)
+
+
+def _mes_anterior(mes: str) -> str:
+    ano, numero = int(mes[:4]), int(mes[5:7])
+    return f"{ano - 1}-12" if numero == 1 else f"{ano}-{numero - 1:02d}"
+
+
+def _gastos_por_mes(
+    medico_id: int,
+    data_inicio: Optional[datetime],
+    data_fim: Optional[datetime]
+):
+    """
+    Gastos do médico somados por (paciente, mês, categoria).
+
+    Sem período, é a própria consolidação mensal; com período, a soma sai
+    da tabela gastos, porque o período pode cortar um mês ao meio.
+    """
+    if data_inicio is None and data_fim is None:
+        return select(
+            GastoMensal.paciente_id,
+            GastoMensal.mes,
+            GastoMensal.categoria,
+            GastoMensal.total,
+            GastoMensal.quantidade
+        ).where(GastoMensal.medico_id == medico_id).subquery()
+
+    filtros = [Gasto.medico_id == medico_id]
+    if data_inicio:
+        filtros.append(Gasto.data >= data_inicio)
+    if data_fim:
+        filtros.append(Gasto.data <= data_fim)
+    mes = mes_ano(Gasto.data)
+    return select(
+        Gasto.paciente_id,
+        mes.label("mes"),
+        Gasto.categoria,
+        func.sum(Gasto.valor).label("total"),
+        func.count(Gasto.id).label("quantidade")
+    ).where(*filtros).group_by(Gasto.paciente_id, mes, Gasto.categoria).subquery()
+
+
+def calcular_estatisticas_medico(
+    db: Session,
+    medico_id: int,
+    data_inicio: Optional[datetime] = None,
+    data_fim: Optional[datetime] = None,
+    maiores: int = 10
+) -> dict:
+    """
+    Calcula a visão de coorte dos pacientes do médico em duas idas ao banco.
+
+    A primeira traz uma linha por paciente (gasto total, consultas, última
+    consulta) com a posição no ranking de gastos e a participação simples e
+    acumulada no total, calculadas por funções de janela. A segunda traz a
+    tendência mensal (gastos por categoria, consultas e pacientes ativos),
+    com o total do mês anterior via LAG.
+
+    Os pacientes são os que têm gastos ou consultas com o médico no período.
+    """
+    gastos = _gastos_por_mes(medico_id, data_inicio, data_fim)
+
+    filtros_consultas = [Consulta.medico_id == medico_id]
+    if data_inicio:
+        filtros_consultas.append(Consulta.data >= data_inicio)
+    if data_fim:
+        filtros_consultas.append(Consulta.data <= data_fim)
+
+    # Passo 1: uma linha por paciente
+    gastos_paciente = select(
+        gastos.c.paciente_id,
+        func.sum(gastos.c.total).label("total"),
+        func.count(func.distinct(gastos.c.mes)).label("meses")
+    ).group_by(gastos.c.paciente_id).cte("gastos_paciente")
+    consultas_paciente = select(
+        Consulta.paciente_id,
+        func.count(Consulta.id).label("consultas"),
+        func.max(Consulta.data).label("ultima_consulta")
+    ).where(*filtros_consultas).group_by(Consulta.paciente_id).cte("consultas_paciente")
+    pacientes = union(
+        select(gastos_paciente.c.paciente_id),
+        select(consultas_paciente.c.paciente_id)
+    ).cte("pacientes")
+
+    total = func.coalesce(gastos_paciente.c.total, 0.0)
+    ordem_gasto = (total.desc(), pacientes.c.paciente_id)
+    total_geral = func.sum(total).over()
+    linhas = db.execute(
+        select(
+            pacientes.c.paciente_id,
+            Usuario.nome,
+            total.label("gasto_total"),
+            func.coalesce(gastos_paciente.c.meses, 0).label("meses_com_gasto"),
+            func.coalesce(consultas_paciente.c.consultas, 0).label("consultas"),
+            consultas_paciente.c.ultima_consulta,
+            func.rank().over(order_by=total.desc()).label("posicao"),
+            (total / func.nullif(total_geral, 0)).label("participacao"),
+            (func.sum(total).over(order_by=ordem_gasto) / func.nullif(total_geral, 0)).label("participacao_acumulada")
+        )
+        .join(Usuario, Usuario.id == pacientes.c.paciente_id)
+        .outerjoin(gastos_paciente, gastos_paciente.c.paciente_id == pacientes.c.paciente_id)
+        .outerjoin(consultas_paciente, consultas_paciente.c.paciente_id == pacientes.c.paciente_id)
+        .order_by(*ordem_gasto)
+    ).all()
+
+    # Passo 2: tendência mensal
+    gastos_mes = select(
+        gastos.c.mes,
+        func.sum(gastos.c.total).label("total"),
+        func.sum(case((gastos.c.categoria == "consulta", gastos.c.total), else_=0.0)).label("consultas"),
+        func.sum(case((gastos.c.categoria == "medicamento", gastos.c.total), else_=0.0)).label("medicamentos"),
+        func.count(func.distinct(gastos.c.paciente_id)).label("pacientes")
+    ).group_by(gastos.c.mes).cte("gastos_mes")
+    mes_consulta = mes_ano(Consulta.data)
+    consultas_mes = select(
+        mes_consulta.label("mes"),
+        func.count(Consulta.id).label("consultas")
+    ).where(*filtros_consultas).group_by(mes_consulta).cte("consultas_mes")
+    meses = union(select(gastos_mes.c.mes), select(consultas_mes.c.mes)).cte("meses")
+
+    total_mes = func.coalesce(gastos_mes.c.total, 0.0)
+    tendencia = db.execute(
+        select(
+            meses.c.mes,
+            total_mes.label("gasto_total"),
+            func.coalesce(gastos_mes.c.consultas, 0.0).label("gasto_consultas"),
+            func.coalesce(gastos_mes.c.medicamentos, 0.0).label("gasto_medicamentos"),
+            func.coalesce(consultas_mes.c.consultas, 0).label("consultas"),
+            func.coalesce(gastos_mes.c.pacientes, 0).label("pacientes_com_gasto"),
+            func.lag(meses.c.mes).over(order_by=meses.c.mes).label("mes_anterior"),
+            func.lag(total_mes).over(order_by=meses.c.mes).label("total_anterior")
+        )
+        .outerjoin(gastos_mes, gastos_mes.c.mes == meses.c.mes)
+        .outerjoin(consultas_mes, consultas_mes.c.mes == meses.c.mes)
+        .order_by(meses.c.mes)
+    ).all()
+
+    lista_pacientes = [
+        {
+            "paciente_id": linha.paciente_id,
+            "nome": linha.nome,
+            "gasto_total": float(linha.gasto_total),
+            "meses_com_gasto": linha.meses_com_gasto,
+            "consultas": linha.consultas,
+            "ultima_consulta": linha.ultima_consulta,
+            "posicao": linha.posicao,
+            "participacao": float(linha.participacao or 0),
+            "participacao_acumulada": float(linha.participacao_acumulada or 0),
+        }
+        for linha in linhas
+    ]
+
+    dados_tendencia = []
+    for linha in tendencia:
+        # Variação só em relação ao mês imediatamente anterior e com gasto
+        variacao = None
+        if linha.mes_anterior == _mes_anterior(linha.mes) and linha.total_anterior:
+            variacao = (linha.gasto_total - linha.total_anterior) / linha.total_anterior
+        dados_tendencia.append({
+            "mes": linha.mes,
+            "gasto_total": float(linha.gasto_total),
+            "gasto_consultas": float(linha.gasto_consultas),
+            "gasto_medicamentos": float(linha.gasto_medicamentos),
+            "consultas": linha.consultas,
+            "pacientes_com_gasto": linha.pacientes_com_gasto,
+            "variacao": variacao,
+        })
+
+    quantidade = len(lista_pacientes)
+    gasto_total = sum(paciente["gasto_total"] for paciente in lista_pacientes)
+    total_consultas = sum(paciente["consultas"] for paciente in lista_pacientes)
+    return {
+        "periodo": {"data_inicio": data_inicio, "data_fim": data_fim},
+        "resumo": {
+            "pacientes": quantidade,
+            "gasto_total": gasto_total,
+            "total_consultas": total_consultas,
+            "gasto_medio_paciente": gasto_total / quantidade if quantidade else 0.0,
+            "consultas_por_paciente": total_consultas / quantidade if quantidade else 0.0,
+        },
+        "maiores_gastos": lista_pacientes[:maiores],
+        "pacientes": lista_pacientes,
+        "tendencia_mensal": dados_tendencia,
+    }
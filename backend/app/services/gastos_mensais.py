@@ -0,0 +1,142 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, delete, func, insert, select
+from typing import Dict, Iterable, Tuple
+
+from ..db.funcoes import insert_upsert, mes_ano
+from ..models.models import Gasto, GastoMensal
+
+# Colunas de gastos_mensais preenchidas por consolidacao_mensal, na ordem do SELECT
+COLUNAS_CONSOLIDACAO = ["paciente_id", "medico_id", "mes", "categoria", "total", "quantidade"]
+
+# (paciente_id, medico_id, mes, categoria) -> (variação do total, variação da quantidade)
+Variacoes = Dict[Tuple[int, int, str, str], Tuple[float, int]]
+
+
+def chave_gasto(gasto: Gasto) -> Tuple[int, int, str, str]:
+    """
+    Retorna a chave da consolidação mensal à qual o gasto pertence.
+    """
+    return (gasto.paciente_id, gasto.medico_id, gasto.data.strftime("%Y-%m"), gasto.categoria)
+
+
+def acumular_variacoes(gastos: Iterable[Gasto], sinal: int = 1) -> Variacoes:
+    """
+    Agrupa um conjunto de gastos nas variações que eles causam na consolidação.
+    """
+    variacoes: Variacoes = {}
+    for gasto in gastos:
+        chave = chave_gasto(gasto)
+        total, quantidade = variacoes.get(chave, (0.0, 0))
+        variacoes[chave] = (total + sinal * gasto.valor, quantidade + sinal)
+    return variacoes
+
+
+def aplicar_variacoes(db: Session, variacoes: Variacoes) -> None:
+    """
+    Aplica as variações na tabela gastos_mensais dentro da transação corrente.
+
+    Não faz commit: quem chama confirma a escrita do gasto e da consolidação
+    juntas.
+    """
+    if not variacoes:
+        return
+
+    stmt = insert_upsert(db, GastoMensal)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            GastoMensal.paciente_id,
+            GastoMensal.medico_id,
+            GastoMensal.mes,
+            GastoMensal.categoria
+        ],
+        set_={
+            "total": GastoMensal.total + stmt.excluded.total,
+            "quantidade": GastoMensal.quantidade + stmt.excluded.quantidade
+        }
+    )
+    db.execute(stmt, [
+        {
+            "paciente_id": paciente_id,
+            "medico_id": medico_id,
+            "mes": mes,
+            "categoria": categoria,
+            "total": total,
+            "quantidade": quantidade
+        }
+        for (paciente_id, medico_id, mes, categoria), (total, quantidade) in variacoes.items()
+    ])
+
+    # Meses que ficaram sem nenhum gasto deixam de existir na consolidação;
+    # só as chaves que perderam gastos podem ter zerado
+    reduzidas = [
+        {"paciente_id": paciente_id, "medico_id": medico_id, "mes": mes, "categoria": categoria}
+        for (paciente_id, medico_id, mes, categoria), (_, quantidade) in variacoes.items()
+        if quantidade < 0
+    ]
+    if reduzidas:
+        tabela = GastoMensal.__table__
+        db.execute(
+            delete(tabela).where(
+                tabela.c.paciente_id == bindparam("paciente_id"),
+                tabela.c.medico_id == bindparam("medico_id"),
+                tabela.c.mes == bindparam("mes"),
+                tabela.c.categoria == bindparam("categoria"),
+                tabela.c.quantidade <= 0
+            ),
+            reduzidas
+        )
+
+
+def registrar_gasto(db: Session, gasto: Gasto, sinal: int = 1) -> None:
+    """
+    Atualiza a consolidação para um gasto criado (sinal=1) ou removido (sinal=-1).
+    """
+    aplicar_variacoes(db, acumular_variacoes([gasto], sinal))
+
+
+def consolidacao_mensal(gastos):
+    """
+    SELECT (paciente_id, medico_id, mes, categoria, total, quantidade) que
+    consolida a tabela `gastos` por mês, na ordem das colunas de
+    gastos_mensais.
+
+    Recebe a tabela para servir também à migração 0002, que não usa os
+    modelos. Gastos sem paciente, médico, data ou categoria não têm chave
+    na consolidação e ficam de fora.
+    """
+    mes = mes_ano(gastos.c.data)
+    return select(
+        gastos.c.paciente_id,
+        gastos.c.medico_id,
+        mes,
+        gastos.c.categoria,
+        func.sum(gastos.c.valor),
+        func.count(gastos.c.id)
+    ).where(
+        gastos.c.paciente_id.is_not(None),
+        gastos.c.medico_id.is_not(None),
+        gastos.c.data.is_not(None),
+        gastos.c.categoria.is_not(None)
+    ).group_by(
+        gastos.c.paciente_id,
+        gastos.c.medico_id,
+        mes,
+        gastos.c.categoria
+    )
+
+
+def reconstruir_gastos_mensais(db: Session) -> int:
+    """
+    Recalcula toda a tabela gastos_mensais a partir da tabela gastos.
+
+    Retorna a quantidade de linhas consolidadas.
+    """
+    db.query(GastoMensal).delete(synchronize_session=False)
+    db.execute(
+        insert(GastoMensal).from_select(
+            COLUNAS_CONSOLIDACAO,
+            consolidacao_mensal(Gasto.__table__)
+        )
+    )
+    db.commit()
+    return db.query(func.count()).select_from(GastoMensal).scalar()
@@ -0,0 +1,196 @@
+import csv
+import itertools
+import json
+import os
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from ..models.models import Consulta, Gasto, Importacao, Medicamento, Usuario
+from ..schemas.schemas import ConsultaImportacao, GastoImportacao, MedicamentoImportacao
+from .estatisticas_service import escopo_medico, escopo_paciente
+from .gastos_mensais import acumular_variacoes, aplicar_variacoes
+from .versoes import incrementar_versoes
+
+# Tipo de registro -> (modelo, schema de validação de cada linha)
+TIPOS = {
+    "consultas": (Consulta, ConsultaImportacao),
+    "gastos": (Gasto, GastoImportacao),
+    "medicamentos": (Medicamento, MedicamentoImportacao),
+}
+
+# (número do registro no arquivo, dados lidos ou None, erro de leitura ou None)
+Registro = Tuple[int, Optional[dict], Optional[str]]
+
+
+def detectar_formato(caminho: str) -> str:
+    extensao = os.path.splitext(caminho)[1].lower().lstrip(".")
+    if extensao in ("ndjson", "jsonl"):
+        return "ndjson"
+    if extensao == "csv":
+        return "csv"
+    raise ValueError(f"Formato não reconhecido pela extensão: {caminho} (use --formato)")
+
+
+def ler_registros(caminho: str, formato: str) -> Iterator[Registro]:
+    """
+    Lê o arquivo registro a registro, sem carregá-lo inteiro em memória.
+
+    Linhas NDJSON vazias são ignoradas; linhas que não são JSON válido são
+    devolvidas com o erro, para serem rejeitadas sem interromper a importação.
+    """
+    with open(caminho, newline="", encoding="utf-8") as arquivo:
+        if formato == "csv":
+            for numero, dados in enumerate(csv.DictReader(arquivo), 1):
+                yield numero, dados, None
+            return
+
+        numero = 0
+        for linha in arquivo:
+            if not linha.strip():
+                continue
+            numero += 1
+            try:
+                yield numero, json.loads(linha), None
+            except ValueError as erro:
+                yield numero, None, f"JSON inválido: {erro}"
+
+
+def _mensagem(erro: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(parte) for parte in detalhe['loc'])}: {detalhe['msg']}"
+        for detalhe in erro.errors()
+    )
+
+
+def validar_lote(db: Session, schema: Type[BaseModel], lote: List[Registro]) -> Tuple[List[dict], List[dict]]:
+    """
+    Valida os registros contra o schema e confere, em uma única consulta,
+    se paciente_id e medico_id apontam para usuários do tipo certo.
+
+    Retorna as linhas prontas para inserir e os registros rejeitados.
+    """
+    linhas: List[Tuple[int, dict]] = []
+    rejeitados: List[dict] = []
+    for numero, dados, erro in lote:
+        if erro is None:
+            try:
+                linhas.append((numero, schema.model_validate(dados).model_dump()))
+                continue
+            except ValidationError as invalido:
+                erro = _mensagem(invalido)
+        rejeitados.append({"registro": numero, "erro": erro})
+
+    ids = {linha[coluna] for _, linha in linhas for coluna in ("paciente_id", "medico_id")}
+    tipos: Dict[int, str] = dict(db.execute(
+        select(Usuario.id, Usuario.tipo).where(Usuario.id.in_(ids))
+    ).all()) if ids else {}
+
+    validas = []
+    for numero, linha in linhas:
+        if tipos.get(linha["paciente_id"]) != "paciente":
+            rejeitados.append({"registro": numero, "erro": "Paciente não encontrado"})
+        elif tipos.get(linha["medico_id"]) != "medico":
+            rejeitados.append({"registro": numero, "erro": "Médico não encontrado"})
+        else:
+            validas.append(linha)
+    return validas, rejeitados
+
+
+def _lotes(registros: Iterator[Registro], tamanho: int) -> Iterator[List[Registro]]:
+    while True:
+        lote = list(itertools.islice(registros, tamanho))
+        if not lote:
+            return
+        yield lote
+
+
+def importar(
+    db: Session,
+    caminho: str,
+    tipo: str,
+    formato: Optional[str] = None,
+    tamanho_lote: int = 5000,
+    reiniciar: bool = False,
+    rejeitar: Callable[[dict], None] = lambda rejeitado: None,
+    relatar: Callable[[str], None] = print,
+) -> Dict:
+    """
+    Importa um arquivo CSV ou NDJSON de consultas, gastos ou medicamentos.
+
+    Cada lote é inserido com um único executemany e confirmado junto com o
+    progresso da importação (tabela importacoes). Se o processo for
+    interrompido, a próxima execução com o mesmo arquivo continua do último
+    lote confirmado. `reiniciar=True` descarta o progresso e importa tudo de
+    novo, inclusive o que já tinha sido inserido.
+
+    Registros inválidos não interrompem a importação. Eles são passados a
+    `rejeitar` depois do commit do lote: um lote que não chegou a ser
+    confirmado é lido de novo na retomada e não repete rejeições.
+    """
+    modelo, schema = TIPOS[tipo]
+    formato = formato or detectar_formato(caminho)
+    arquivo = os.path.abspath(caminho)
+
+    progresso = db.get(Importacao, (arquivo, tipo))
+    if progresso is None:
+        progresso = Importacao(arquivo=arquivo, tipo=tipo)
+        db.add(progresso)
+    if progresso.registros is None or reiniciar:
+        progresso.registros = progresso.inseridos = progresso.rejeitados = 0
+        progresso.concluida = False
+
+    if progresso.concluida:
+        relatar(f"{arquivo} ({tipo}) já foi importado; use --reiniciar para importar de novo")
+        return _resumo(progresso, 0.0, 0)
+    if progresso.registros:
+        relatar(f"Retomando {arquivo} ({tipo}) após o registro {progresso.registros}")
+
+    inicio = time.perf_counter()
+    processados = 0
+    registros = itertools.islice(ler_registros(arquivo, formato), progresso.registros, None)
+    for lote in _lotes(registros, tamanho_lote):
+        linhas, rejeitados = validar_lote(db, schema, lote)
+        if linhas:
+            db.execute(insert(modelo.__table__), linhas)
+            if modelo is Gasto:
+                aplicar_variacoes(db, acumular_variacoes(Gasto(**linha) for linha in linhas))
+            incrementar_versoes(db, [escopo_paciente(linha["paciente_id"]) for linha in linhas] +
+                                    [escopo_medico(linha["medico_id"]) for linha in linhas])
+
+        progresso.registros = lote[-1][0]
+        progresso.inseridos += len(linhas)
+        progresso.rejeitados += len(rejeitados)
+        progresso.atualizado_em = datetime.now()
+        db.commit()
+        for rejeitado in rejeitados:
+            rejeitar(rejeitado)
+
+        processados += len(lote)
+        decorrido = time.perf_counter() - inicio
+        relatar(
+            f"{tipo}: {progresso.registros} registros "
+            f"({progresso.inseridos} inseridos, {progresso.rejeitados} rejeitados) - "
+            f"{processados / decorrido:.0f} registros/s"
+        )
+
+    progresso.concluida = True
+    progresso.atualizado_em = datetime.now()
+    db.commit()
+    return _resumo(progresso, time.perf_counter() - inicio, processados)
+
+
+def _resumo(progresso: Importacao, duracao: float, processados: int) -> Dict:
+    return {
+        "arquivo": progresso.arquivo,
+        "tipo": progresso.tipo,
+        "registros": progresso.registros,
+        "inseridos": progresso.inseridos,
+        "rejeitados": progresso.rejeitados,
+        "duracao_s": round(duracao, 3),
+        "registros_s": round(processados / duracao, 1) if duracao else 0.0,
+    }
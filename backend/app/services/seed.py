@@ -1,18 +1,22 @@
+import logging
+
 from sqlalchemy.orm import Session
 from ..models.models import Usuario, Medicamento, Consulta, Gasto
 from ..core.security import get_password_hash
+from .gastos_mensais import reconstruir_gastos_mensais
 from datetime import datetime, timedelta
 import random
 
+logger = logging.getLogger(__name__)
+
 def seed_database(db: Session):
     # Verificar se já existem usuários
     if db.query(Usuario).first():
-        print("Banco de dados já populado!")
+        logger.info("Banco de dados já populado")
         return
 
     # Criar usuários de teste
     senha_hash = get_password_hash("senha123")
-    print(f"Hash da senha gerado: {senha_hash}")
 
     medico = Usuario(
         nome="Médico Teste",
@@ -140,4 +144,8 @@ def seed_database(db: Session):
         )
         db.add(gasto_medicamento)
     
-    db.commit() 
\ No newline at end of file
+    db.commit()
+
+    # Consolida os gastos criados acima na tabela gastos_mensais
+    reconstruir_gastos_mensais(db)
+    logger.info("Banco de dados populado")
@@ -0,0 +1,37 @@
+from sqlalchemy.orm import Session
+from typing import Iterable, Optional
+
+from ..db.funcoes import insert_upsert
+from ..models.models import Versao
+from .estatisticas_service import escopo_medico, escopo_paciente
+
+# Escopo da lista de pacientes, alterada a cada paciente criado
+ESCOPO_PACIENTES = "pacientes"
+
+
+def escopos_escrita(paciente_ids: Iterable[int], medico_id: Optional[int] = None) -> list:
+    """
+    Escopos afetados por uma escrita nos registros dos pacientes informados.
+    """
+    escopos = [escopo_paciente(paciente_id) for paciente_id in set(paciente_ids)]
+    if medico_id is not None:
+        escopos.append(escopo_medico(medico_id))
+    return escopos
+
+
+def incrementar_versoes(db: Session, escopos: Iterable[str]) -> None:
+    """
+    Incrementa a versão dos escopos dentro da transação corrente.
+
+    Não faz commit: a nova versão fica visível junto com a escrita.
+    """
+    escopos = sorted(set(escopos))
+    if not escopos:
+        return
+
+    stmt = insert_upsert(db, Versao)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Versao.escopo],
+        set_={"versao": Versao.versao + 1}
+    )
+    db.execute(stmt, [{"escopo": escopo, "versao": 1} for escopo in escopos])
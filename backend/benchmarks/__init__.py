@@ -0,0 +1,6 @@
+"""
+Benchmarks do backend.
+
+Execute a partir da pasta backend, por exemplo:
+    python -m benchmarks.indices --gastos 500000
+"""
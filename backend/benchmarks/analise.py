@@ -0,0 +1,192 @@
+"""
+Compara a análise vetorizada (app.services.analise_gastos: uma leitura das
+colunas + NumPy) com as mesmas métricas calculadas só em SQL, com funções
+de janela e agregações, sobre os gastos de um médico.
+
+Métricas: total mensal com média móvel, percentis do valor por categoria e
+previsão do próximo mês por paciente (regressão linear).
+
+Uso:
+    python -m benchmarks.analise --gastos 1000000 --pacientes 5000
+"""
+import argparse
+import json
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.services.analise_gastos import (
+    PERCENTIS_PADRAO,
+    _mes_numero,
+    carregar_serie,
+    medias_moveis,
+    percentis_por_categoria,
+    previsao_proximo_mes
+)
+
+from .comum import banco_temporario, medir
+from .indices import popular
+
+MEDIAS_MOVEIS = """
+WITH mensal AS (
+    SELECT strftime('%Y-%m', data) AS mes, sum(valor) AS total
+    FROM gastos WHERE medico_id = :medico_id GROUP BY mes
+)
+SELECT mes, total, avg(total) OVER (ORDER BY mes ROWS BETWEEN :janela - 1 PRECEDING AND CURRENT ROW)
+FROM mensal ORDER BY mes
+"""
+
+# Mesma interpolação linear de np.percentile: soma ponderada das duas
+# posições vizinhas de (n - 1) * q na ordem do valor dentro da categoria
+PERCENTIS = """
+WITH percentis(q) AS (VALUES {valores}),
+ordenados AS (
+    SELECT categoria, valor,
+           row_number() OVER (PARTITION BY categoria ORDER BY valor) - 1 AS posicao,
+           count(*) OVER (PARTITION BY categoria) AS n
+    FROM gastos WHERE medico_id = :medico_id
+)
+SELECT categoria, q, sum(CASE
+    WHEN posicao = CAST((n - 1) * q AS INTEGER) THEN valor * (1 - ((n - 1) * q - CAST((n - 1) * q AS INTEGER)))
+    ELSE valor * ((n - 1) * q - CAST((n - 1) * q AS INTEGER))
+END)
+FROM ordenados JOIN percentis
+  ON posicao BETWEEN CAST((n - 1) * q AS INTEGER) AND CAST((n - 1) * q AS INTEGER) + 1
+GROUP BY categoria, q ORDER BY categoria, q
+"""
+
+# Meses sem gasto valem zero: só somam em n, x médio e Sxx, que são constantes
+PREVISAO = """
+WITH historico AS (
+    SELECT paciente_id,
+           CAST(strftime('%Y', data) AS INTEGER) * 12 + CAST(strftime('%m', data) AS INTEGER) - 1 - :primeiro AS x,
+           sum(valor) AS y
+    FROM gastos
+    WHERE medico_id = :medico_id AND data >= :inicio AND data < :fim
+    GROUP BY paciente_id, x
+),
+regressao AS (
+    SELECT paciente_id, sum(y) / :meses AS media, (sum(x * y) - :x_medio * sum(y)) / :sxx AS tendencia
+    FROM historico GROUP BY paciente_id
+)
+SELECT paciente_id, max(media + tendencia * (:meses + 1 - :x_medio), 0.0) AS previsao, tendencia, media
+FROM regressao ORDER BY previsao DESC, paciente_id
+"""
+
+
+def _parametros_previsao(medico_id: int, meses: int) -> dict:
+    atual = _mes_numero(datetime.now())
+    primeiro = atual - meses
+    x_medio = (meses - 1) / 2
+
+    def data(mes: int) -> datetime:
+        return datetime(1970 + mes // 12, mes % 12 + 1, 1)
+
+    return {
+        "medico_id": medico_id,
+        "meses": meses,
+        # Em meses desde o ano zero, como calculado no SQL a partir de strftime
+        "primeiro": primeiro + 1970 * 12,
+        "inicio": data(primeiro),
+        "fim": data(atual),
+        "x_medio": x_medio,
+        "sxx": sum((x - x_medio) ** 2 for x in range(meses)),
+    }
+
+
+def _conferir(conn, serie, medico_id: int, janela: int, meses: int) -> dict:
+    """
+    Maior diferença absoluta entre os dois caminhos, por métrica.
+    """
+    sql = {mes: (total, media) for mes, total, media in conn.execute(
+        text(MEDIAS_MOVEIS), {"medico_id": medico_id, "janela": janela}
+    ).all()}
+    vetorizado = {linha["mes"]: linha["total"] for linha in medias_moveis(serie, janela)}
+    # O SQL só tem os meses com gasto; a média móvel do NumPy conta os vazios como zero
+    diferenca_mensal = max(abs(total - vetorizado[mes]) for mes, (total, _) in sql.items())
+
+    valores = ", ".join(f"({p / 100})" for p in PERCENTIS_PADRAO)
+    sql_percentis = conn.execute(text(PERCENTIS.format(valores=valores)), {"medico_id": medico_id}).all()
+    por_categoria = {linha["categoria"]: list(linha["percentis"].values()) for linha in percentis_por_categoria(serie)}
+    diferenca_percentis = max(
+        abs(valor - por_categoria[categoria][[p / 100 for p in PERCENTIS_PADRAO].index(q)])
+        for categoria, q, valor in sql_percentis
+    )
+
+    sql_previsao = {linha[0]: linha[1] for linha in conn.execute(
+        text(PREVISAO), _parametros_previsao(medico_id, meses)
+    ).all()}
+    previsoes = {linha["paciente_id"]: linha["previsao"] for linha in previsao_proximo_mes(serie, meses)["pacientes"]}
+    diferenca_previsao = max(abs(valor - previsoes[paciente_id]) for paciente_id, valor in sql_previsao.items())
+
+    return {
+        "total_mensal": diferenca_mensal,
+        "percentis": diferenca_percentis,
+        "previsao": diferenca_previsao,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--gastos", type=int, default=1000000, help="Gastos do médico analisado")
+    parser.add_argument("--pacientes", type=int, default=5000)
+    parser.add_argument("--janela", type=int, default=3)
+    parser.add_argument("--meses", type=int, default=6, help="Meses de histórico da previsão")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    engine = banco_temporario()
+    Base.metadata.create_all(engine)
+    popular(engine, 1, args.pacientes, args.gastos, 0, args.semente)
+    medico_id = 1
+
+    valores = ", ".join(f"({p / 100})" for p in PERCENTIS_PADRAO)
+    with engine.connect() as conn:
+        conn.execute(text("ANALYZE"))
+        sql = {
+            "medias_moveis": medir(lambda: conn.execute(
+                text(MEDIAS_MOVEIS), {"medico_id": medico_id, "janela": args.janela}
+            ).all(), args.repeticoes),
+            "percentis": medir(lambda: conn.execute(
+                text(PERCENTIS.format(valores=valores)), {"medico_id": medico_id}
+            ).all(), args.repeticoes),
+            "previsao": medir(lambda: conn.execute(
+                text(PREVISAO), _parametros_previsao(medico_id, args.meses)
+            ).all(), args.repeticoes),
+        }
+
+    with Session(engine) as db:
+        carga = medir(lambda: carregar_serie(db, medico_id=medico_id), args.repeticoes)
+        serie = carregar_serie(db, medico_id=medico_id)
+        vetorizado = {
+            "medias_moveis": medir(lambda: medias_moveis(serie, args.janela), args.repeticoes),
+            "percentis": medir(lambda: percentis_por_categoria(serie), args.repeticoes),
+            "previsao": medir(lambda: previsao_proximo_mes(serie, args.meses), args.repeticoes),
+        }
+        with engine.connect() as conn:
+            diferencas = _conferir(conn, serie, medico_id, args.janela, args.meses)
+
+    total_sql = sum(tempos["mediana_ms"] for tempos in sql.values())
+    total_calculo = sum(tempos["mediana_ms"] for tempos in vetorizado.values())
+    relatorio = {
+        "gastos": len(serie),
+        "sql": sql,
+        "numpy": {"carga": carga, **vetorizado},
+        "total_ms": {
+            "sql": round(total_sql, 3),
+            # Primeira requisição: leitura das colunas + as três métricas
+            "numpy_sem_cache": round(carga["mediana_ms"] + total_calculo, 3),
+            # Série já em cache_series: só o cálculo
+            "numpy_com_cache": round(total_calculo, 3),
+        },
+        "diferenca_maxima": diferencas,
+    }
+    print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
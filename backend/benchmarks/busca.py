@@ -0,0 +1,142 @@
+"""
+Mede a busca textual (/busca, índice FTS5 da migração 0006) com milhões de
+anotações de consultas, comparada ao filtro com LIKE nas consultas do
+médico, que é o que restava sem o índice.
+
+O vocabulário sintético é pequeno, então quase todo termo aparece em boa
+parte das anotações: é o pior caso para o bm25, que lê a frequência de
+cada termo no índice inteiro.
+
+Uso:
+    python -m benchmarks.busca --notas 1000000 --medicos 100
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from app.db.migracoes import executar_migracoes
+from app.models.models import Consulta, Usuario
+from app.services.busca import buscar, dono_usuario, expressao_busca
+
+from .comum import banco_temporario, percentis
+
+# Vocabulário das anotações; os primeiros termos são bem mais frequentes
+VOCABULARIO = (
+    "paciente refere relata nega dor leve moderada intensa há dias semanas meses "
+    "melhora piora após uso de medicação orientado retorno exame físico sem alterações "
+    "pressão arterial controlada glicemia jejum elevada febre tosse seca produtiva "
+    "cefaleia frontal tontura náusea vômitos diarreia constipação dispneia aos esforços "
+    "edema membros inferiores lombalgia artralgia mialgia insônia ansiedade humor deprimido "
+    "hipertensão hipertenso diabetes mellitus tipo dislipidemia obesidade asma bronquite "
+    "sinusite otite faringite amigdalite pneumonia infecção urinária gastrite refluxo "
+    "hipotireoidismo enxaqueca fibromialgia osteoporose arritmia insuficiência cardíaca "
+    "losartana metformina sinvastatina omeprazol levotiroxina amoxicilina dipirona "
+    "solicitado hemograma ecocardiograma eletrocardiograma ultrassonografia tomografia"
+).split()
+
+# Termos medidos: frequente, raro, prefixo e combinação
+TERMOS = ["pressão", "fibromialgia", "hipertens", "dor lombalgia", "diabetes metformina"]
+
+
+_PESOS = [1 / (posicao + 1) for posicao in range(len(VOCABULARIO))]
+
+
+def _nota(aleatorio: random.Random) -> str:
+    palavras = aleatorio.choices(VOCABULARIO, weights=_PESOS, k=aleatorio.randint(8, 24))
+    return " ".join(palavras).capitalize()
+
+
+def popular(engine, medicos: int, pacientes_por_medico: int, notas: int, semente: int) -> float:
+    """
+    Cria médicos, pacientes e consultas com anotações aleatórias. O índice
+    textual é preenchido pelos triggers. Retorna as linhas por segundo.
+    """
+    aleatorio = random.Random(semente)
+    agora = datetime.now()
+    with engine.begin() as conn:
+        conn.execute(insert(Usuario), [
+            {"id": i, "nome": f"Médico {i}", "email": f"medico{i}@bench", "tipo": "medico", "senha": ""}
+            for i in range(1, medicos + 1)
+        ] + [
+            {"id": medicos + i, "nome": f"Paciente {i}", "email": f"paciente{i}@bench", "tipo": "paciente", "senha": ""}
+            for i in range(1, medicos * pacientes_por_medico + 1)
+        ])
+
+    inicio = time.perf_counter()
+    lote = 20000
+    with engine.begin() as conn:
+        for primeira in range(0, notas, lote):
+            linhas = []
+            for _ in range(min(lote, notas - primeira)):
+                medico_id = aleatorio.randint(1, medicos)
+                paciente = aleatorio.randrange(pacientes_por_medico)
+                linhas.append({
+                    "descricao": _nota(aleatorio),
+                    "data": agora - timedelta(minutes=aleatorio.randint(0, 3 * 365 * 24 * 60)),
+                    "medico_id": medico_id,
+                    "paciente_id": medicos + (medico_id - 1) * pacientes_por_medico + paciente + 1,
+                })
+            conn.execute(insert(Consulta), linhas)
+    return notas / (time.perf_counter() - inicio)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notas", type=int, default=1000000)
+    parser.add_argument("--medicos", type=int, default=100)
+    parser.add_argument("--pacientes-por-medico", type=int, default=200)
+    parser.add_argument("--buscas", type=int, default=50, help="Buscas por termo (médicos sorteados)")
+    parser.add_argument("--limite", type=int, default=20)
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    engine = banco_temporario()
+    executar_migracoes(engine)
+    linhas_s = popular(engine, args.medicos, args.pacientes_por_medico, args.notas, args.semente)
+
+    aleatorio = random.Random(args.semente)
+    relatorio = {
+        "notas": args.notas,
+        "medicos": args.medicos,
+        "insercao_com_indice_linhas_s": round(linhas_s, 1),
+        "termos": {},
+    }
+    with Session(engine) as db:
+        db.execute(text("ANALYZE"))
+        for termos in TERMOS:
+            fts, like, encontrados = [], [], []
+            palavras = termos.split()
+            for _ in range(args.buscas):
+                medico_id = aleatorio.randint(1, args.medicos)
+                expressao = expressao_busca(termos, dono_usuario(medico_id, "medico"))
+
+                inicio = time.perf_counter()
+                itens, _ = buscar(db, expressao, args.limite)
+                fts.append((time.perf_counter() - inicio) * 1000)
+                encontrados.append(len(itens))
+
+                # Sem o índice: varrer as consultas do médico com LIKE
+                condicoes = " AND ".join(f"descricao LIKE :p{i}" for i in range(len(palavras)))
+                inicio = time.perf_counter()
+                db.execute(
+                    text(f"SELECT id FROM consultas WHERE medico_id = :medico_id AND {condicoes} ORDER BY data DESC, id DESC"),
+                    {"medico_id": medico_id, **{f"p{i}": f"%{palavra}%" for i, palavra in enumerate(palavras)}}
+                ).all()
+                like.append((time.perf_counter() - inicio) * 1000)
+
+            relatorio["termos"][termos] = {
+                "fts": percentis(fts),
+                "like": percentis(like),
+                "itens_por_pagina": round(sum(encontrados) / len(encontrados), 1),
+            }
+    print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,291 @@
+"""
+Suíte de carga da API: login, listagens, criação e estatísticas do paciente,
+com concorrência e volume de dados configuráveis. O resultado (p50/p95/p99
+e vazão por cenário) sai em JSON, para comparar revisões do backend.
+
+Em processo (app ASGI direto, banco temporário):
+    python -m benchmarks.carga --clientes 50 --requisicoes 2000 --itens 5000
+
+Contra um uvicorn local iniciado pela suíte (banco temporário):
+    python -m benchmarks.carga --alvo uvicorn --saida resultado.json
+
+Com dados sintéticos (app.services.dados_sinteticos) no banco temporário,
+autenticando como o primeiro médico gerado:
+    python -m benchmarks.carga --medicos 50 --pacientes-por-medico 200 --anos 3
+
+Contra um servidor já em execução:
+    python -m benchmarks.carga --url http://localhost:8000
+
+Comparar com um resultado anterior (sai com código 1 se algum cenário
+piorar além da tolerância):
+    python -m benchmarks.carga --comparar base.json --tolerancia 0.2
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+CENARIOS = ("login", "listagens", "criacao", "estatisticas")
+
+LISTAGENS = ("/api/v1/gastos/", "/api/v1/consultas/", "/api/v1/medicamentos/", "/api/v1/pacientes/")
+
+
+def _versao() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecida"
+
+
+def _porta_livre() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _preparar_banco(args) -> dict:
+    """
+    Cria o banco temporário (migrações + seed) e, se pedido, gera os dados
+    sintéticos. Define DATABASE_URL para o app em processo e para o uvicorn.
+    """
+    pasta = tempfile.mkdtemp(prefix="bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(pasta, 'bench.db')}"
+
+    from app.cli import preparar_banco
+    from app.models.base import SessionLocal
+    from app.services.dados_sinteticos import gerar_dados
+
+    preparar_banco()
+    if not args.medicos:
+        return {}
+    db = SessionLocal()
+    try:
+        return gerar_dados(
+            db,
+            medicos=args.medicos,
+            pacientes_por_medico=args.pacientes_por_medico,
+            anos=args.anos,
+            semente=args.semente,
+            relatar=lambda mensagem: None
+        )
+    finally:
+        db.close()
+
+
+@contextlib.asynccontextmanager
+async def _servidor_uvicorn(clientes: int, partida: dict):
+    """
+    Sobe `uvicorn main:app` em uma porta livre, com o banco de DATABASE_URL,
+    e espera /saude/pronto antes de devolver o cliente. Os tempos até o
+    processo responder e até ficar pronto vão para `partida`.
+    """
+    import httpx
+
+    porta = _porta_livre()
+    log = open(os.path.join(tempfile.mkdtemp(prefix="bench-"), "uvicorn.log"), "wb")
+    inicio = time.perf_counter()
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(porta),
+         "--log-level", "warning", "--no-access-log"],
+        stdout=log, stderr=subprocess.STDOUT
+    )
+    url = f"http://127.0.0.1:{porta}"
+    try:
+        async with httpx.AsyncClient(
+            base_url=url, limits=httpx.Limits(max_connections=clientes), timeout=60
+        ) as cliente:
+            for _ in range(3000):
+                if processo.poll() is not None:
+                    raise RuntimeError(f"uvicorn terminou com código {processo.returncode}; veja {log.name}")
+                with contextlib.suppress(httpx.TransportError):
+                    resposta = await cliente.get("/saude/pronto")
+                    partida.setdefault("vivo_ms", round((time.perf_counter() - inicio) * 1000, 1))
+                    if resposta.status_code == 200:
+                        partida["pronto_ms"] = round((time.perf_counter() - inicio) * 1000, 1)
+                        break
+                await asyncio.sleep(0.02)
+            else:
+                raise RuntimeError(f"uvicorn não respondeu em {url}; veja {log.name}")
+            yield cliente
+    finally:
+        processo.terminate()
+        processo.wait(timeout=30)
+        log.close()
+
+
+def _cliente(args, partida: dict):
+    if args.url:
+        import httpx
+        return httpx.AsyncClient(
+            base_url=args.url, limits=httpx.Limits(max_connections=args.clientes), timeout=60
+        )
+    if args.alvo == "uvicorn":
+        return _servidor_uvicorn(args.clientes, partida)
+
+    import httpx
+    import main
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench")
+
+
+async def _medir(requisicao, clientes: int, total: int) -> dict:
+    """
+    Executa `total` chamadas de `requisicao(i)` com `clientes` tarefas
+    simultâneas e resume latência e vazão.
+    """
+    from .comum import percentis
+
+    latencias = []
+    erros = 0
+    fila = iter(range(total))
+
+    async def trabalhador():
+        nonlocal erros
+        for i in fila:
+            inicio = time.perf_counter()
+            resposta = await requisicao(i)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+            if resposta.status_code >= 400:
+                erros += 1
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabalhador() for _ in range(min(clientes, total))))
+    duracao = time.perf_counter() - inicio
+    return {
+        "requisicoes": total,
+        "erros": erros,
+        "duracao_s": round(duracao, 3),
+        "vazao_rps": round(total / duracao, 1),
+        **percentis(latencias),
+    }
+
+
+async def _popular(cliente, cabecalhos: dict, paciente_id: int, itens: int, aleatorio: random.Random) -> None:
+    from .lote import ROTAS as GERADORES
+
+    for rota, gerar in GERADORES.items():
+        linhas = [gerar(paciente_id, aleatorio.randrange(1_000_000)) for _ in range(itens)]
+        for i in range(0, len(linhas), 1000):
+            resposta = await cliente.post(f"/api/v1/{rota}/lote", json=linhas[i:i + 1000], headers=cabecalhos)
+            resposta.raise_for_status()
+
+
+async def _executar(args) -> dict:
+    from .lote import ROTAS as GERADORES
+
+    aleatorio = random.Random(args.semente)
+    dados = {} if args.url else _preparar_banco(args)
+    if args.email is None:
+        args.email = dados.get("email_primeiro_medico", "medico@teste.com")
+    relatorio = {
+        "configuracao": {
+            "versao": _versao(),
+            "alvo": args.url or args.alvo,
+            "clientes": args.clientes,
+            "requisicoes": args.requisicoes,
+            "logins": args.logins,
+            "itens": args.itens,
+            "dados_sinteticos": {
+                chave: dados[chave] for chave in ("medicos", "pacientes", "consultas", "gastos", "medicamentos")
+            } if dados else None,
+            "semente": args.semente,
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+        },
+        "partida": {},
+        "cenarios": {},
+    }
+
+    async with _cliente(args, relatorio["partida"]) as cliente:
+        resposta = await cliente.post("/api/v1/auth/token", data={"username": args.email, "password": args.senha})
+        resposta.raise_for_status()
+        cabecalhos = {"Authorization": f"Bearer {resposta.json()['access_token']}"}
+        paciente_id = (await cliente.get("/api/v1/pacientes/", headers=cabecalhos)).json()[0]["id"]
+        if args.itens:
+            await _popular(cliente, cabecalhos, paciente_id, args.itens, aleatorio)
+
+        criacoes = list(GERADORES.items())
+        requisicoes = {
+            "login": lambda i: cliente.post(
+                "/api/v1/auth/token", data={"username": args.email, "password": args.senha}
+            ),
+            "listagens": lambda i: cliente.get(LISTAGENS[i % len(LISTAGENS)], headers=cabecalhos),
+            "criacao": lambda i: cliente.post(
+                f"/api/v1/{criacoes[i % len(criacoes)][0]}/",
+                json=criacoes[i % len(criacoes)][1](paciente_id, aleatorio.randrange(1_000_000)),
+                headers=cabecalhos
+            ),
+            "estatisticas": lambda i: cliente.get(f"/api/v1/estatisticas/paciente/{paciente_id}", headers=cabecalhos),
+        }
+
+        for cenario in args.cenarios:
+            total = args.logins if cenario == "login" else args.requisicoes
+            # Aquecimento: conexões do pool, caches e código ainda não executado
+            await _medir(requisicoes[cenario], args.clientes, min(total, args.clientes))
+            relatorio["cenarios"][cenario] = await _medir(requisicoes[cenario], args.clientes, total)
+    return relatorio
+
+
+def comparar(base: dict, atual: dict, tolerancia: float) -> list:
+    """
+    Lista os cenários em que o p95 subiu ou a vazão caiu mais que a tolerância.
+    """
+    regressoes = []
+    for cenario, resultado in atual["cenarios"].items():
+        anterior = base.get("cenarios", {}).get(cenario)
+        if not anterior:
+            continue
+        if anterior["p95_ms"] and resultado["p95_ms"] > anterior["p95_ms"] * (1 + tolerancia):
+            regressoes.append(f"{cenario}: p95 {anterior['p95_ms']} -> {resultado['p95_ms']} ms")
+        if resultado["vazao_rps"] < anterior["vazao_rps"] * (1 - tolerancia):
+            regressoes.append(f"{cenario}: vazão {anterior['vazao_rps']} -> {resultado['vazao_rps']} req/s")
+    return regressoes
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--alvo", choices=["processo", "uvicorn"], default="processo")
+    parser.add_argument("--url", help="URL de um servidor em execução (ignora --alvo)")
+    parser.add_argument("--cenarios", nargs="+", choices=CENARIOS, default=list(CENARIOS))
+    parser.add_argument("--clientes", type=int, default=50)
+    parser.add_argument("--requisicoes", type=int, default=2000, help="Requisições por cenário")
+    parser.add_argument("--logins", type=int, default=100, help="Requisições do cenário de login (bcrypt)")
+    parser.add_argument("--itens", type=int, default=5000, help="Gastos, consultas e medicamentos criados antes")
+    parser.add_argument("--medicos", type=int, default=0, help="Médicos sintéticos gerados antes (0: só o seed)")
+    parser.add_argument("--pacientes-por-medico", type=int, default=100)
+    parser.add_argument("--anos", type=float, default=3, help="Anos de histórico dos dados sintéticos")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--email", help="Padrão: medico@teste.com, ou o primeiro médico sintético")
+    parser.add_argument("--senha", default="senha123")
+    parser.add_argument("--saida", help="Grava o JSON neste arquivo, além de imprimir")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior")
+    parser.add_argument("--tolerancia", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    relatorio = asyncio.run(_executar(args))
+    texto = json.dumps(relatorio, indent=2)
+    print(texto)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto + "\n")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            regressoes = comparar(json.load(arquivo), relatorio, args.tolerancia)
+        for regressao in regressoes:
+            print(f"REGRESSÃO {regressao}", file=sys.stderr)
+        return 1 if regressoes else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
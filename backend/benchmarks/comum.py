@@ -0,0 +1,54 @@
+import os
+import statistics
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from sqlalchemy.engine import Engine
+
+from app.db.session import criar_engine
+
+
+def banco_temporario() -> Engine:
+    """
+    Cria um engine SQLite em um arquivo temporário, isolado do banco da aplicação.
+    """
+    pasta = tempfile.mkdtemp(prefix="bench-")
+    return criar_engine(f"sqlite:///{os.path.join(pasta, 'bench.db')}")
+
+
+def medir(funcao: Callable[[], object], repeticoes: int = 20) -> Dict[str, float]:
+    """
+    Executa a função várias vezes e retorna estatísticas de tempo em milissegundos.
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return {
+        "min_ms": round(tempos[0], 3),
+        "mediana_ms": round(statistics.median(tempos), 3),
+        "max_ms": round(tempos[-1], 3),
+    }
+
+
+def percentis(tempos_ms: List[float]) -> Dict[str, float]:
+    """
+    Resume uma lista de latências (ms) em p50, p95, p99 e máximo.
+    """
+    if not tempos_ms:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    ordenados = sorted(tempos_ms)
+
+    def percentil(p: float) -> float:
+        indice = min(len(ordenados) - 1, max(0, round(p / 100 * len(ordenados)) - 1))
+        return round(ordenados[indice], 3)
+
+    return {
+        "p50_ms": percentil(50),
+        "p95_ms": percentil(95),
+        "p99_ms": percentil(99),
+        "max_ms": round(ordenados[-1], 3),
+    }
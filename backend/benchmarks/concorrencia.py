@@ -0,0 +1,110 @@
+"""
+Mede vazão e latência da API com muitos clientes simultâneos em um único
+worker (um event loop), o cenário que motivou o caminho assíncrono.
+
+Em processo (banco temporário, populado pelo seed):
+    python -m benchmarks.concorrencia --clientes 200 --requisicoes 5000
+
+Contra um servidor já em execução (por exemplo, para comparar com uma
+revisão anterior do backend):
+    python -m benchmarks.concorrencia --url http://localhost:8000 --clientes 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+# Rotas autenticadas exercitadas pelo dashboard
+ROTAS = [
+    "/api/v1/auth/me",
+    "/api/v1/gastos/",
+    "/api/v1/consultas/",
+    "/api/v1/estatisticas/gastos/total",
+    "/api/v1/estatisticas/paciente/{paciente_id}",
+]
+
+
+def _cliente_em_processo():
+    """
+    Cria um banco temporário, aplica as migrações, popula e devolve um
+    cliente httpx ligado diretamente ao app ASGI.
+    """
+    pasta = tempfile.mkdtemp(prefix="bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(pasta, 'bench.db')}"
+
+    import httpx
+    import main
+    from app.cli import preparar_banco
+
+    preparar_banco()
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench")
+
+
+async def _executar(cliente, email: str, senha: str, clientes: int, requisicoes: int) -> dict:
+    from .comum import percentis
+
+    resposta = await cliente.post("/api/v1/auth/token", data={"username": email, "password": senha})
+    resposta.raise_for_status()
+    cabecalhos = {"Authorization": f"Bearer {resposta.json()['access_token']}"}
+    paciente_id = (await cliente.get("/api/v1/pacientes/", headers=cabecalhos)).json()[0]["id"]
+    rotas = [rota.format(paciente_id=paciente_id) for rota in ROTAS]
+
+    latencias = []
+    erros = 0
+    fila = iter(range(requisicoes))
+
+    async def trabalhador():
+        nonlocal erros
+        for i in fila:
+            inicio = time.perf_counter()
+            resposta = await cliente.get(rotas[i % len(rotas)], headers=cabecalhos)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+            if resposta.status_code != 200:
+                erros += 1
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabalhador() for _ in range(clientes)))
+    duracao = time.perf_counter() - inicio
+
+    return {
+        "clientes": clientes,
+        "requisicoes": requisicoes,
+        "erros": erros,
+        "duracao_s": round(duracao, 3),
+        "vazao_rps": round(requisicoes / duracao, 1),
+        **percentis(latencias),
+    }
+
+
+async def _principal(args) -> dict:
+    if args.url:
+        import httpx
+        cliente = httpx.AsyncClient(
+            base_url=args.url,
+            limits=httpx.Limits(max_connections=args.clientes),
+            timeout=60
+        )
+    else:
+        cliente = _cliente_em_processo()
+
+    async with cliente:
+        return await _executar(cliente, args.email, args.senha, args.clientes, args.requisicoes)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="URL de um servidor em execução; sem ela, o app roda em processo")
+    parser.add_argument("--clientes", type=int, default=200)
+    parser.add_argument("--requisicoes", type=int, default=5000)
+    parser.add_argument("--email", default="medico@teste.com")
+    parser.add_argument("--senha", default="senha123")
+    args = parser.parse_args(argv)
+
+    print(json.dumps(asyncio.run(_principal(args)), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,137 @@
+"""
+Compara o plano de execução e o tempo das consultas mais frequentes da API
+com e sem os índices compostos da migração 0003.
+
+Uso:
+    python -m benchmarks.indices --gastos 500000 --medicos 50 --pacientes 2000
+"""
+import argparse
+import json
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.models.models import Usuario, Consulta, Gasto
+from app.services.gastos_mensais import reconstruir_gastos_mensais
+
+from .comum import banco_temporario, medir
+
+CATEGORIAS = ["consulta", "medicamento", "exame", "procedimento"]
+
+# Consultas equivalentes às executadas pelos endpoints de listagem e estatísticas
+CONSULTAS = {
+    "gastos do médico no período": "SELECT * FROM gastos WHERE medico_id = :medico_id AND data >= :inicio ORDER BY data DESC",
+    "gastos do paciente por categoria": "SELECT sum(valor) FROM gastos WHERE paciente_id = :paciente_id AND categoria = 'consulta' AND data >= :inicio",
+    "consultas do médico no período": "SELECT * FROM consultas WHERE medico_id = :medico_id AND data >= :inicio ORDER BY data DESC",
+    "total de consultas do paciente": "SELECT count(id) FROM consultas WHERE paciente_id = :paciente_id",
+    "gastos por categoria do médico": "SELECT categoria, sum(total) FROM gastos_mensais WHERE medico_id = :medico_id GROUP BY categoria",
+}
+
+
+def indices_compostos():
+    """
+    Índices do modelo com mais de uma coluna, mais o índice de usuarios.tipo.
+    """
+    indices = []
+    for tabela in Base.metadata.sorted_tables:
+        for indice in tabela.indexes:
+            if len(indice.columns) > 1 or indice.name == "ix_usuarios_tipo":
+                indices.append(indice)
+    return indices
+
+
+def popular(engine, medicos: int, pacientes: int, gastos: int, consultas: int, semente: int) -> None:
+    aleatorio = random.Random(semente)
+    agora = datetime.now()
+
+    with engine.begin() as conn:
+        conn.execute(insert(Usuario), [
+            {"id": i, "nome": f"Médico {i}", "email": f"medico{i}@bench", "tipo": "medico", "senha": ""}
+            for i in range(1, medicos + 1)
+        ] + [
+            {"id": medicos + i, "nome": f"Paciente {i}", "email": f"paciente{i}@bench", "tipo": "paciente", "senha": ""}
+            for i in range(1, pacientes + 1)
+        ])
+
+    def linha():
+        paciente_id = aleatorio.randint(medicos + 1, medicos + pacientes)
+        return {
+            "medico_id": (paciente_id % medicos) + 1,
+            "paciente_id": paciente_id,
+            "data": agora - timedelta(minutes=aleatorio.randint(0, 3 * 365 * 24 * 60)),
+        }
+
+    lote = 20000
+    with engine.begin() as conn:
+        for inicio in range(0, gastos, lote):
+            conn.execute(insert(Gasto), [
+                dict(linha(), descricao="", valor=round(aleatorio.uniform(10, 500), 2),
+                     categoria=aleatorio.choice(CATEGORIAS))
+                for _ in range(min(lote, gastos - inicio))
+            ])
+        for inicio in range(0, consultas, lote):
+            conn.execute(insert(Consulta), [
+                dict(linha(), descricao="")
+                for _ in range(min(lote, consultas - inicio))
+            ])
+
+    with Session(engine) as db:
+        reconstruir_gastos_mensais(db)
+
+
+def executar(engine, parametros: dict, repeticoes: int) -> dict:
+    resultado = {}
+    with engine.connect() as conn:
+        conn.execute(text("ANALYZE"))
+        for nome, sql in CONSULTAS.items():
+            plano = conn.execute(text("EXPLAIN QUERY PLAN " + sql), parametros).all()
+            tempos = medir(lambda: conn.execute(text(sql), parametros).all(), repeticoes)
+            resultado[nome] = {"plano": [linha[-1] for linha in plano], **tempos}
+    return resultado
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--medicos", type=int, default=50)
+    parser.add_argument("--pacientes", type=int, default=2000)
+    parser.add_argument("--gastos", type=int, default=500000)
+    parser.add_argument("--consultas", type=int, default=250000)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    engine = banco_temporario()
+    Base.metadata.create_all(engine)
+    compostos = indices_compostos()
+    for indice in compostos:
+        indice.drop(engine)
+
+    popular(engine, args.medicos, args.pacientes, args.gastos, args.consultas, args.semente)
+
+    parametros = {
+        "medico_id": 1,
+        "paciente_id": args.medicos + 1,
+        "inicio": datetime.now() - timedelta(days=90),
+    }
+    sem_indices = executar(engine, parametros, args.repeticoes)
+    for indice in compostos:
+        indice.create(engine)
+    com_indices = executar(engine, parametros, args.repeticoes)
+
+    relatorio = {
+        nome: {
+            "sem_indices": sem_indices[nome],
+            "com_indices": com_indices[nome],
+            "ganho": round(sem_indices[nome]["mediana_ms"] / max(com_indices[nome]["mediana_ms"], 1e-6), 1),
+        }
+        for nome in CONSULTAS
+    }
+    print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
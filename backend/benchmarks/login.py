@@ -0,0 +1,115 @@
+"""
+Mede a latência das rotas que não fazem autenticação por senha durante uma
+rajada de logins (troca de turno), com o bcrypt no pool de processos ou no
+threadpool das requisições.
+
+Uso (em processo, banco temporário populado pelo seed):
+    python -m benchmarks.login --clientes 50 --logins 20 --duracao 10
+    python -m benchmarks.login --modo threadpool
+
+Cada execução mede duas fases: só as rotas comuns e as mesmas rotas com
+`--logins` clientes fazendo login sem parar.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from .concorrencia import ROTAS
+
+
+async def _fase(cliente, cabecalhos: dict, rotas: list, clientes: int, logins: int,
+                duracao: float, email: str, senha: str) -> dict:
+    from .comum import percentis
+
+    latencias = []
+    latencias_login = []
+    erros = 0
+    fim = time.perf_counter() + duracao
+
+    async def trabalhador(i: int):
+        nonlocal erros
+        while time.perf_counter() < fim:
+            inicio = time.perf_counter()
+            resposta = await cliente.get(rotas[i % len(rotas)], headers=cabecalhos)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+            if resposta.status_code != 200:
+                erros += 1
+            i += 1
+
+    async def login():
+        nonlocal erros
+        while time.perf_counter() < fim:
+            inicio = time.perf_counter()
+            resposta = await cliente.post("/api/v1/auth/token", data={"username": email, "password": senha})
+            latencias_login.append((time.perf_counter() - inicio) * 1000)
+            if resposta.status_code != 200:
+                erros += 1
+
+    await asyncio.gather(
+        *(trabalhador(i) for i in range(clientes)),
+        *(login() for _ in range(logins))
+    )
+
+    resultado = {
+        "requisicoes": len(latencias),
+        "vazao_rps": round(len(latencias) / duracao, 1),
+        "erros": erros,
+        **percentis(latencias),
+    }
+    if logins:
+        resultado["logins"] = {"total": len(latencias_login), **percentis(latencias_login)}
+    return resultado
+
+
+async def _executar(args) -> dict:
+    from .concorrencia import _cliente_em_processo
+    from app.core.senhas import executor_senhas
+
+    async with _cliente_em_processo() as cliente:
+        resposta = await cliente.post("/api/v1/auth/token", data={"username": args.email, "password": args.senha})
+        resposta.raise_for_status()
+        cabecalhos = {"Authorization": f"Bearer {resposta.json()['access_token']}"}
+        paciente_id = (await cliente.get("/api/v1/pacientes/", headers=cabecalhos)).json()[0]["id"]
+        rotas = [rota.format(paciente_id=paciente_id) for rota in ROTAS]
+
+        comum = dict(cabecalhos=cabecalhos, rotas=rotas, clientes=args.clientes,
+                     duracao=args.duracao, email=args.email, senha=args.senha)
+        sem_logins = await _fase(cliente, logins=0, **comum)
+        com_logins = await _fase(cliente, logins=args.logins, **comum)
+        fila = executor_senhas.estatisticas()
+        executor_senhas.encerrar()
+
+    return {
+        "modo": args.modo,
+        "sem_logins": sem_logins,
+        "com_logins": com_logins,
+        "fila_senhas": fila,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modo", choices=["processos", "threadpool"], default="processos")
+    parser.add_argument("--processos", type=int, default=2)
+    parser.add_argument("--clientes", type=int, default=50)
+    parser.add_argument("--logins", type=int, default=20)
+    parser.add_argument("--duracao", type=float, default=10.0)
+    parser.add_argument("--email", default="medico@teste.com")
+    parser.add_argument("--senha", default="senha123")
+    args = parser.parse_args(argv)
+
+    # Antes de importar o app: as configurações são lidas na importação
+    if args.modo == "threadpool":
+        os.environ["SENHA_PROCESSOS"] = "0"
+        os.environ["SENHA_CONCORRENCIA_MAXIMA"] = "40"
+    else:
+        os.environ["SENHA_PROCESSOS"] = str(args.processos)
+
+    print(json.dumps(asyncio.run(_executar(args)), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,78 @@
+"""
+Compara linhas por segundo da criação item a item (POST /) com a criação em
+lote (POST /lote) de gastos, consultas e medicamentos.
+
+Uso (em processo, banco temporário populado pelo seed):
+    python -m benchmarks.lote --itens 2000 --tamanho-lote 500
+"""
+import argparse
+import asyncio
+import json
+import time
+
+ROTAS = {
+    "gastos": lambda paciente_id, i: {
+        "descricao": f"Gasto {i}", "valor": 10.0 + i % 90, "categoria": "medicamento", "paciente_id": paciente_id
+    },
+    "consultas": lambda paciente_id, i: {
+        "descricao": f"Consulta {i}", "paciente_id": paciente_id
+    },
+    "medicamentos": lambda paciente_id, i: {
+        "nome": f"Medicamento {i}", "descricao": "", "dosagem": "10mg", "frequencia": "1x ao dia", "paciente_id": paciente_id
+    },
+}
+
+
+async def _item_a_item(cliente, cabecalhos: dict, rota: str, itens: list) -> float:
+    inicio = time.perf_counter()
+    for item in itens:
+        resposta = await cliente.post(f"/api/v1/{rota}/", json=item, headers=cabecalhos)
+        resposta.raise_for_status()
+    return time.perf_counter() - inicio
+
+
+async def _em_lote(cliente, cabecalhos: dict, rota: str, itens: list, tamanho: int) -> float:
+    inicio = time.perf_counter()
+    for i in range(0, len(itens), tamanho):
+        resposta = await cliente.post(f"/api/v1/{rota}/lote", json=itens[i:i + tamanho], headers=cabecalhos)
+        resposta.raise_for_status()
+        assert resposta.json()["erros"] == 0
+    return time.perf_counter() - inicio
+
+
+async def _executar(args) -> dict:
+    from .concorrencia import _cliente_em_processo
+
+    relatorio = {}
+    async with _cliente_em_processo() as cliente:
+        resposta = await cliente.post("/api/v1/auth/token", data={"username": args.email, "password": args.senha})
+        resposta.raise_for_status()
+        cabecalhos = {"Authorization": f"Bearer {resposta.json()['access_token']}"}
+        paciente_id = (await cliente.get("/api/v1/pacientes/", headers=cabecalhos)).json()[0]["id"]
+
+        for rota, gerar in ROTAS.items():
+            itens = [gerar(paciente_id, i) for i in range(args.itens)]
+            unitario = await _item_a_item(cliente, cabecalhos, rota, itens)
+            lote = await _em_lote(cliente, cabecalhos, rota, itens, args.tamanho_lote)
+            relatorio[rota] = {
+                "item_a_item_linhas_s": round(args.itens / unitario, 1),
+                "lote_linhas_s": round(args.itens / lote, 1),
+                "ganho": round(unitario / lote, 1),
+            }
+    return relatorio
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--itens", type=int, default=2000)
+    parser.add_argument("--tamanho-lote", type=int, default=500)
+    parser.add_argument("--email", default="medico@teste.com")
+    parser.add_argument("--senha", default="senha123")
+    args = parser.parse_args(argv)
+
+    print(json.dumps(asyncio.run(_executar(args)), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,152 @@
+"""
+Mede a partida a frio do servidor: sobe `uvicorn main:app` várias vezes
+sobre o mesmo banco já preparado (migrações + seed) e registra o tempo até
+o processo responder em /saude/vivo, até /saude/pronto devolver 200 e o
+primeiro login depois de pronto.
+
+    python -m benchmarks.partida --repeticoes 10
+    python -m benchmarks.partida --workers 2 --saida partida.json
+
+Com dados sintéticos no banco (app.services.dados_sinteticos):
+    python -m benchmarks.partida --medicos 50 --pacientes-por-medico 200
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from .carga import _porta_livre, _versao
+
+
+def _preparar_banco(args) -> None:
+    pasta = tempfile.mkdtemp(prefix="bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(pasta, 'bench.db')}"
+
+    from app.cli import preparar_banco
+    from app.models.base import SessionLocal
+    from app.services.dados_sinteticos import gerar_dados
+
+    preparar_banco()
+    if args.medicos:
+        db = SessionLocal()
+        try:
+            gerar_dados(
+                db,
+                medicos=args.medicos,
+                pacientes_por_medico=args.pacientes_por_medico,
+                semente=args.semente,
+                relatar=lambda mensagem: None
+            )
+        finally:
+            db.close()
+
+
+def _duracao_inicializacao(caminho_log: str):
+    """
+    duracao_ms do log "Servidor pronto" (verificação de migrações e
+    aquecimento dos pools), se o nível de log permitir.
+    """
+    with open(caminho_log, encoding="utf-8", errors="replace") as log:
+        for linha in log:
+            if '"Servidor pronto"' in linha:
+                try:
+                    return json.loads(linha).get("duracao_ms")
+                except ValueError:
+                    return None
+    return None
+
+
+def _partida(args) -> dict:
+    """
+    Uma partida: do Popen até vivo, pronto e o primeiro login.
+    """
+    import httpx
+
+    porta = _porta_livre()
+    caminho_log = os.path.join(tempfile.mkdtemp(prefix="bench-"), "uvicorn.log")
+    comando = [sys.executable, "-m", "uvicorn", "main:app", "--port", str(porta), "--no-access-log"]
+    if args.workers > 1:
+        comando += ["--workers", str(args.workers)]
+
+    resultado = {}
+    with open(caminho_log, "wb") as log:
+        inicio = time.perf_counter()
+        processo = subprocess.Popen(comando, stdout=log, stderr=subprocess.STDOUT)
+        try:
+            with httpx.Client(base_url=f"http://127.0.0.1:{porta}", timeout=60) as cliente:
+                while "pronto_ms" not in resultado:
+                    if processo.poll() is not None:
+                        raise RuntimeError(f"uvicorn terminou com código {processo.returncode}; veja {caminho_log}")
+                    if time.perf_counter() - inicio > args.limite:
+                        raise RuntimeError(f"uvicorn não ficou pronto em {args.limite} s; veja {caminho_log}")
+                    try:
+                        if "vivo_ms" not in resultado and cliente.get("/saude/vivo").status_code == 200:
+                            resultado["vivo_ms"] = (time.perf_counter() - inicio) * 1000
+                        if cliente.get("/saude/pronto").status_code == 200:
+                            resultado["pronto_ms"] = (time.perf_counter() - inicio) * 1000
+                            break
+                    except httpx.TransportError:
+                        pass
+                    time.sleep(0.01)
+
+                antes = time.perf_counter()
+                resposta = cliente.post("/api/v1/auth/token", data={"username": args.email, "password": args.senha})
+                resposta.raise_for_status()
+                resultado["primeiro_login_ms"] = (time.perf_counter() - antes) * 1000
+        finally:
+            processo.terminate()
+            processo.wait(timeout=30)
+
+    inicializacao = _duracao_inicializacao(caminho_log)
+    if inicializacao is not None:
+        resultado["inicializacao_ms"] = inicializacao
+    return resultado
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=1, help="Workers do uvicorn")
+    parser.add_argument("--medicos", type=int, default=0, help="Médicos sintéticos gerados antes (0: só o seed)")
+    parser.add_argument("--pacientes-por-medico", type=int, default=100)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--email", default="medico@teste.com")
+    parser.add_argument("--senha", default="senha123")
+    parser.add_argument("--limite", type=float, default=120, help="Segundos de espera por partida")
+    parser.add_argument("--saida", help="Grava o JSON neste arquivo, além de imprimir")
+    args = parser.parse_args(argv)
+
+    # Antes de importar o app: DATABASE_URL aponta para o banco temporário
+    _preparar_banco(args)
+    from .comum import percentis
+
+    partidas = [_partida(args) for _ in range(args.repeticoes)]
+
+    relatorio = {
+        "configuracao": {
+            "versao": _versao(),
+            "repeticoes": args.repeticoes,
+            "workers": args.workers,
+            "medicos": args.medicos,
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+        },
+        "partida": {
+            medida: percentis([p[medida] for p in partidas if medida in p])
+            for medida in ("vivo_ms", "pronto_ms", "inicializacao_ms", "primeiro_login_ms")
+        },
+    }
+    texto = json.dumps(relatorio, indent=2)
+    print(texto)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,78 @@
+"""
+Compara a listagem padrão (objetos do ORM + response_model) com o caminho
+rápido (?rapido=true: colunas + orjson), sem compressão, com gzip e com br
+(quando o pacote brotli está instalado).
+
+Uso (em processo, banco temporário populado pelo seed):
+    python -m benchmarks.serializacao --itens 5000 --limite 1000 --requisicoes 30
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from app.core.compressao import brotli
+
+from .lote import ROTAS
+
+
+async def _medir(cliente, cabecalhos: dict, parametros: dict, requisicoes: int) -> dict:
+    from .comum import percentis
+
+    latencias = []
+    tamanho = 0
+    for _ in range(requisicoes):
+        inicio = time.perf_counter()
+        resposta = await cliente.get("/api/v1/gastos/", params=parametros, headers=cabecalhos)
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        resposta.raise_for_status()
+        tamanho = resposta.num_bytes_downloaded
+    return dict(percentis(latencias), bytes=tamanho)
+
+
+async def _executar(args) -> dict:
+    from .concorrencia import _cliente_em_processo
+
+    codificacoes = ["identity", "gzip"] + (["br"] if brotli is not None else [])
+    relatorio = {"itens_por_pagina": args.limite}
+    async with _cliente_em_processo() as cliente:
+        resposta = await cliente.post("/api/v1/auth/token", data={"username": args.email, "password": args.senha})
+        resposta.raise_for_status()
+        autorizacao = {"Authorization": f"Bearer {resposta.json()['access_token']}"}
+        paciente_id = (await cliente.get("/api/v1/pacientes/", headers=autorizacao)).json()[0]["id"]
+
+        itens = [ROTAS["gastos"](paciente_id, i) for i in range(args.itens)]
+        for i in range(0, len(itens), 1000):
+            resposta = await cliente.post("/api/v1/gastos/lote", json=itens[i:i + 1000], headers=autorizacao)
+            resposta.raise_for_status()
+
+        for caminho, rapido in (("padrao", False), ("rapido", True)):
+            parametros = {"limite": args.limite, "rapido": rapido}
+            relatorio[caminho] = {
+                codificacao: await _medir(
+                    cliente, dict(autorizacao, **{"Accept-Encoding": codificacao}), parametros, args.requisicoes
+                )
+                for codificacao in codificacoes
+            }
+
+    relatorio["ganho_p50"] = round(
+        relatorio["padrao"]["identity"]["p50_ms"] / relatorio["rapido"]["identity"]["p50_ms"], 2
+    )
+    return relatorio
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--itens", type=int, default=5000)
+    parser.add_argument("--limite", type=int, default=1000)
+    parser.add_argument("--requisicoes", type=int, default=30)
+    parser.add_argument("--email", default="medico@teste.com")
+    parser.add_argument("--senha", default="senha123")
+    args = parser.parse_args(argv)
+
+    print(json.dumps(asyncio.run(_executar(args)), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
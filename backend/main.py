@@ -1,11 +1,51 @@
+import logging
+import time
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.api import api_router
-from app.models.base import Base, engine
-from app.models.base import SessionLocal
-from app.services.seed import seed_database
+from app.api.v1.paginacao import CABECALHO_PROXIMO_CURSOR
+from app.api import saude
+from app.models.base import engine
+from app.db.session import aquecer_pool, async_engine
+from app.db.migracoes import verificar_migracoes
+from app.core.senhas import executor_senhas
+from app.core.compressao import CompressaoMiddleware
+from app.core.config import settings
+from app.core.logs import CABECALHO_CORRELACAO, CorrelacaoMiddleware, configurar_logs, encerrar_logs
+from app.core.metricas import TIPO_CONTEUDO, MetricasMiddleware, metricas
+from app.core.orcamento_sql import OrcamentoSqlMiddleware
+
+configurar_logs()
+logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Compilador Médico API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Esquema e dados iniciais são preparados fora do servidor:
+    # python -m app.cli preparar (ou migrar / popular)
+    inicio = time.perf_counter()
+    if settings.VERIFICAR_MIGRACOES:
+        revisao = await verificar_migracoes(async_engine)
+        logger.info("Banco na revisão %s", revisao)
+    conexoes = await aquecer_pool(async_engine)
+    processos = await executor_senhas.aquecer()
+    saude.prontidao.pronto = True
+    logger.info("Servidor pronto", extra={
+        "duracao_ms": round((time.perf_counter() - inicio) * 1000, 1),
+        "conexoes_aquecidas": conexoes,
+        "processos_executor": processos,
+    })
+    try:
+        yield
+    finally:
+        # O pool de senhas e o QueueListener dos logs param junto com o servidor
+        saude.prontidao.pronto = False
+        executor_senhas.encerrar()
+        encerrar_logs()
+
+app = FastAPI(title="Compilador Médico API", lifespan=lifespan)
 
 # Configurar CORS
 app.add_middleware(
@@ -14,27 +54,50 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[CABECALHO_PROXIMO_CURSOR, CABECALHO_CORRELACAO],
 )
 
+# Comprimir respostas grandes (gzip, ou br com o pacote brotli instalado)
+app.add_middleware(
+    CompressaoMiddleware,
+    minimum_size=settings.COMPRESSAO_TAMANHO_MINIMO,
+    compresslevel=settings.COMPRESSAO_NIVEL_GZIP,
+    brotli_quality=settings.COMPRESSAO_NIVEL_BROTLI,
+)
+
+# Identificador de correlação (X-Request-ID) em cada requisição e nos logs
+app.add_middleware(CorrelacaoMiddleware)
+
+# Orçamento de comandos SQL por requisição e detecção de N+1
+app.add_middleware(OrcamentoSqlMiddleware)
+
+# Contagem e latência por rota, requisições em andamento e tempo de banco (GET /metrics)
+app.add_middleware(MetricasMiddleware, ignorar=("/metrics", "/saude/vivo", "/saude/pronto"))
+
 # Incluir rotas da API
 app.include_router(api_router, prefix="/api/v1")
 
-def init_db():
-    print("Criando banco de dados...")
-    Base.metadata.create_all(bind=engine)
-    print("Tabelas criadas com sucesso!")
-    
-    print("Iniciando população do banco de dados...")
-    db = SessionLocal()
-    try:
-        seed_database(db)
-        print("Banco de dados populado com sucesso!")
-    finally:
-        db.close()
+# Sondas de liveness e readiness (fora do versionamento da API)
+app.include_router(saude.router, prefix="/saude", tags=["saude"])
 
-@app.on_event("startup")
-async def startup_event():
-    init_db()
+@app.get("/metrics", include_in_schema=False)
+async def obter_metricas():
+    """
+    Métricas no formato de texto do Prometheus.
+    """
+    medidores = []
+    for nome, motor in (("sincrono", engine), ("assincrono", async_engine.sync_engine)):
+        if hasattr(motor.pool, "checkedout"):
+            medidores.append((
+                "db_pool_conexoes_em_uso", "gauge", "Conexões retiradas do pool",
+                (("pool", nome),), motor.pool.checkedout()
+            ))
+    for chave, valor in executor_senhas.estatisticas().items():
+        if chave in ("concluidas", "recusadas"):
+            medidores.append((f"senhas_{chave}_total", "counter", f"Operações de senha {chave}", (), valor))
+        else:
+            medidores.append((f"senhas_{chave}", "gauge", f"Pool de senhas: {chave}", (), valor))
+    return PlainTextResponse(metricas.gerar_texto(medidores), media_type=TIPO_CONTEUDO)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,89 @@
+import os
+import tempfile
+
+# Banco próprio e bcrypt barato; precisa vir antes de importar a aplicação,
+# porque as configurações e o engine são lidos na importação
+_PASTA = tempfile.mkdtemp(prefix="testes-backend-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_PASTA}/testes.db"
+os.environ["SENHA_PROCESSOS"] = "0"
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.cli import preparar_banco
+from app.core.cache import cache_estatisticas, cache_series
+from app.models.base import SessionLocal
+from app.models.models import Usuario
+
+
+def _login(client: TestClient, email: str) -> dict:
+    resposta = client.post("/api/v1/auth/token", data={"username": email, "password": "senha123"})
+    assert resposta.status_code == 200, resposta.text
+    return {"Authorization": f"Bearer {resposta.json()['access_token']}"}
+
+
+@pytest.fixture(scope="session")
+def client():
+    preparar_banco()
+    import main
+
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def cabecalhos_medico(client) -> dict:
+    return _login(client, "medico@teste.com")
+
+
+@pytest.fixture(scope="session")
+def cabecalhos_paciente(client) -> dict:
+    return _login(client, "paciente@teste.com")
+
+
+@pytest.fixture(scope="session")
+def ids(client) -> dict:
+    """
+    Ids do médico e do paciente criados pelos dados de teste.
+    """
+    db = SessionLocal()
+    try:
+        return {
+            usuario.tipo: usuario.id
+            for usuario in db.query(Usuario).filter(
+                Usuario.email.in_(["medico@teste.com", "paciente@teste.com"])
+            )
+        }
+    finally:
+        db.close()
+
+
+@pytest.fixture(scope="session")
+def outros(client) -> dict:
+    """
+    Um segundo médico e um segundo paciente, sem registros, para os testes
+    de acesso aos dados de outro usuário: {tipo: (id, cabeçalhos)}.
+    """
+    usuarios = {}
+    for tipo in ("medico", "paciente"):
+        email = f"outro.{tipo}@teste.com"
+        resposta = client.post("/api/v1/auth/register", json={
+            "email": email, "nome": f"Outro {tipo}", "tipo": tipo, "senha": "senha123"
+        })
+        assert resposta.status_code == 200, resposta.text
+        usuarios[tipo] = (resposta.json()["id"], _login(client, email))
+    return usuarios
+
+
+@pytest.fixture
+def sem_cache():
+    """
+    Esvazia os caches de resultados, para que a rota vá ao banco.
+    """
+    cache_estatisticas.backend.limpar()
+    cache_series.backend.limpar()
+    yield
+    cache_estatisticas.backend.limpar()
+    cache_series.backend.limpar()
@@ -0,0 +1,54 @@
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from app.services.analise_gastos import SerieGastos, previsao_proximo_mes
+
+
+def _mes(ano: int, mes: int) -> int:
+    return (ano - 1970) * 12 + mes - 1
+
+
+def _cursor(linhas):
+    conexao = sqlite3.connect(":memory:")
+    conexao.execute("CREATE TABLE t (paciente_id INTEGER, categoria TEXT, mes INTEGER, valor REAL)")
+    conexao.executemany("INSERT INTO t VALUES (?, ?, ?, ?)", linhas)
+    return conexao.execute("SELECT * FROM t ORDER BY rowid")
+
+
+def test_serie_do_cursor_em_lotes():
+    linhas = [
+        (1, "exame", _mes(2024, 1), 10.0),
+        (2, "consulta", _mes(2024, 2), 20.0),
+        (1, "medicamento", _mes(2024, 2), 5.5),
+        (3, "exame", _mes(2024, 3), 7.0),
+        (2, "consulta", _mes(2024, 3), 1.0),
+    ]
+    serie = SerieGastos.de_cursor(_cursor(linhas), tamanho_lote=2)
+
+    assert serie.categorias.tolist() == ["consulta", "exame", "medicamento"]
+    assert serie.categorias[serie.categoria].tolist() == [categoria for _, categoria, _, _ in linhas]
+    assert serie.paciente_id.tolist() == [1, 2, 1, 3, 2]
+    assert serie.mes.astype("datetime64[M]").astype(str).tolist() == ["2024-01", "2024-02", "2024-02", "2024-03", "2024-03"]
+    assert serie.valor.tolist() == [10.0, 20.0, 5.5, 7.0, 1.0]
+    for coluna in (serie.paciente_id, serie.categoria, serie.mes, serie.valor):
+        assert coluna.dtype != object
+
+
+def test_serie_de_cursor_vazio():
+    assert len(SerieGastos.de_cursor(_cursor([]))) == 0
+
+
+def test_previsao_do_proximo_mes():
+    # 10, 20, 30 nos três meses completos antes de abril; o parcial de abril não entra
+    linhas = [(1, "exame", _mes(2024, mes), 10.0 * mes) for mes in (1, 2, 3)]
+    linhas.append((1, "exame", _mes(2024, 4), 1.0))
+    serie = SerieGastos.de_cursor(_cursor(linhas))
+
+    resultado = previsao_proximo_mes(serie, meses=3, ate=datetime(2024, 4, 15))
+
+    assert resultado["mes_previsto"] == "2024-05"
+    assert resultado["pacientes"][0]["previsao"] == pytest.approx(50.0)
+    assert resultado["pacientes"][0]["tendencia"] == pytest.approx(10.0)
+    assert resultado["total_previsto"] == pytest.approx(50.0)
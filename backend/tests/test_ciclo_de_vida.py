@@ -0,0 +1,22 @@
+import asyncio
+
+from app.api import saude
+
+
+def test_lifespan_encerra_senhas_e_logs(client, monkeypatch):
+    import main
+
+    encerrados = []
+    monkeypatch.setattr(main.executor_senhas, "encerrar", lambda: encerrados.append("senhas"))
+    monkeypatch.setattr(main, "encerrar_logs", lambda: encerrados.append("logs"))
+    # O servidor da sessão de testes continua pronto depois deste teste
+    monkeypatch.setattr(saude.prontidao, "pronto", saude.prontidao.pronto)
+
+    async def ciclo():
+        async with main.lifespan(main.app):
+            assert saude.prontidao.pronto
+            assert encerrados == []
+        assert not saude.prontidao.pronto
+
+    asyncio.run(ciclo())
+    assert encerrados == ["senhas", "logs"]
@@ -0,0 +1,34 @@
+import pytest
+
+from app.core.compressao import brotli
+
+CODIFICACOES = ["identity", "gzip"] + (["br"] if brotli is not None else [])
+
+
+@pytest.mark.parametrize("codificacao", CODIFICACOES)
+def test_etag_por_codificacao(client, cabecalhos_medico, codificacao):
+    # Grande o bastante para ser comprimida
+    url = "/api/v1/gastos/?limite=1000"
+    cabecalhos = {**cabecalhos_medico, "Accept-Encoding": codificacao}
+
+    resposta = client.get(url, headers=cabecalhos)
+    assert resposta.status_code == 200
+    assert "Accept-Encoding" in resposta.headers["vary"]
+    etag = resposta.headers["etag"]
+    if codificacao == "identity":
+        assert "content-encoding" not in resposta.headers
+        assert not etag.endswith(('-gzip"', '-br"'))
+    else:
+        assert resposta.headers["content-encoding"] == codificacao
+        assert etag.endswith(f'-{codificacao}"')
+
+    revalidacao = client.get(url, headers={**cabecalhos, "If-None-Match": etag})
+    assert revalidacao.status_code == 304
+    assert revalidacao.headers["etag"] == etag
+    assert "Accept-Encoding" in revalidacao.headers["vary"]
+
+
+def test_vary_em_resposta_pequena(client, cabecalhos_medico):
+    resposta = client.get("/api/v1/estatisticas/gastos/total", headers={**cabecalhos_medico, "Accept-Encoding": "gzip"})
+    assert "content-encoding" not in resposta.headers
+    assert "Accept-Encoding" in resposta.headers["vary"]
@@ -0,0 +1,80 @@
+import csv
+
+import pytest
+
+from app.models.base import SessionLocal
+from app.services.importacao import importar
+
+
+def test_escrita_fora_das_rotas_renova_corpo_e_etag(client, cabecalhos_medico, ids, tmp_path):
+    url = "/api/v1/estatisticas/gastos/total"
+    antes = client.get(url, headers=cabecalhos_medico)
+    assert antes.status_code == 200
+
+    # A importação incrementa as versões, mas não limpa o cache deste processo
+    arquivo = tmp_path / "gastos.csv"
+    with open(arquivo, "w", newline="", encoding="utf-8") as saida:
+        escritor = csv.DictWriter(saida, ["descricao", "valor", "categoria", "paciente_id", "medico_id", "data"])
+        escritor.writeheader()
+        escritor.writerow({
+            "descricao": "Exame importado",
+            "valor": "100.0",
+            "categoria": "exame",
+            "paciente_id": ids["paciente"],
+            "medico_id": ids["medico"],
+            "data": "2024-01-10T10:00:00",
+        })
+    db = SessionLocal()
+    try:
+        importar(db, str(arquivo), "gastos", relatar=lambda mensagem: None)
+    finally:
+        db.close()
+
+    depois = client.get(url, headers={**cabecalhos_medico, "If-None-Match": antes.headers["etag"]})
+    assert depois.status_code == 200
+    assert depois.headers["etag"] != antes.headers["etag"]
+    assert depois.json()["total"] == pytest.approx(antes.json()["total"] + 100.0)
+
+    # E a versão nova volta a ser servida do cache, com 304 para quem já a tem
+    assert client.get(url, headers={**cabecalhos_medico, "If-None-Match": depois.headers["etag"]}).status_code == 304
+
+
+@pytest.mark.parametrize("rota", [
+    "/api/v1/estatisticas/paciente/{paciente}",
+    "/api/v1/pacientes/{paciente}/prontuario",
+    "/api/v1/pacientes/{paciente}",
+    "/api/v1/pacientes/",
+    "/api/v1/estatisticas/medico",
+    "/api/v1/dashboard/medico",
+])
+def test_sem_acesso_nao_revalida(client, ids, outros, rota):
+    _, cabecalhos = outros["paciente"]
+    # Nem If-None-Match: * pula a autorização
+    resposta = client.get(rota.format(**ids), headers={**cabecalhos, "If-None-Match": "*"})
+    assert resposta.status_code == 403
+
+
+def test_registro_de_outro_revalida_contra_o_dono(client, cabecalhos_medico, ids, outros):
+    criado = client.post("/api/v1/medicamentos/", headers=cabecalhos_medico, json={
+        "nome": "Dipirona", "descricao": "Analgésico", "dosagem": "500mg",
+        "frequencia": "6/6h", "paciente_id": ids["paciente"],
+    })
+    assert criado.status_code == 200, criado.text
+    url = f"/api/v1/medicamentos/{criado.json()['id']}"
+
+    _, cabecalhos_outro = outros["medico"]
+    lido = client.get(url, headers=cabecalhos_outro)
+    assert lido.status_code == 200
+    assert client.get(url, headers={**cabecalhos_outro, "If-None-Match": lido.headers["etag"]}).status_code == 304
+
+    # A exclusão pelo médico dono muda o ETag de quem só lê o registro
+    assert client.delete(url, headers=cabecalhos_medico).status_code == 200
+    assert client.get(url, headers={**cabecalhos_outro, "If-None-Match": lido.headers["etag"]}).status_code == 404
+
+
+def test_registro_de_outro_sem_acesso(client, cabecalhos_medico, outros):
+    consulta_id = client.get("/api/v1/consultas/", headers=cabecalhos_medico).json()[0]["id"]
+    for tipo in ("medico", "paciente"):
+        _, cabecalhos = outros[tipo]
+        resposta = client.get(f"/api/v1/consultas/{consulta_id}", headers={**cabecalhos, "If-None-Match": "*"})
+        assert resposta.status_code == 403
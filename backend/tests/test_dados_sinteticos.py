@@ -0,0 +1,21 @@
+from sqlalchemy import select
+
+from app.models.base import SessionLocal
+from app.models.models import Consulta, Usuario, Versao
+from app.services.dados_sinteticos import email_medico, gerar_dados
+from app.services.estatisticas_service import escopo_medico, escopo_paciente
+
+
+def test_lotes_gerados_incrementam_as_versoes(client):
+    db = SessionLocal()
+    try:
+        gerar_dados(db, medicos=1, pacientes_por_medico=3, anos=1, semente=7, tamanho_lote=50, relatar=lambda mensagem: None)
+        medico_id = db.scalar(select(Usuario.id).where(Usuario.email == email_medico(1, semente=7)))
+        pacientes = set(db.scalars(select(Consulta.paciente_id).where(Consulta.medico_id == medico_id)))
+        versoes = dict(db.execute(select(Versao.escopo, Versao.versao)).all())
+    finally:
+        db.close()
+
+    # Uma versão pela criação do médico e ao menos uma pelos lotes de registros
+    assert versoes[escopo_medico(medico_id)] >= 2
+    assert pacientes and all(versoes.get(escopo_paciente(paciente_id), 0) >= 1 for paciente_id in pacientes)
@@ -0,0 +1,44 @@
+from app.core.orcamento_sql import maximo_comandos_sql
+
+
+def test_estatisticas_paciente_comandos_fixos(client, cabecalhos_paciente, ids, sem_cache):
+    url = f"/api/v1/estatisticas/paciente/{ids['paciente']}"
+    # Aquece o cache de usuários autenticados, que não entra na conta
+    client.get("/api/v1/auth/me", headers=cabecalhos_paciente)
+
+    # Versões do escopo (ETag), paciente com a contagem de consultas e
+    # gastos_mensais agrupados: não depende de quantos gastos o paciente tem
+    with maximo_comandos_sql(3, repeticoes_maximas=1) as registro:
+        resposta = client.get(url, headers=cabecalhos_paciente)
+    assert resposta.status_code == 200
+    assert registro.quantidade == 3
+
+    # Em cache, só as versões do escopo
+    with maximo_comandos_sql(1) as registro:
+        assert client.get(url, headers=cabecalhos_paciente).status_code == 200
+    assert registro.quantidade == 1
+
+
+def test_estatisticas_medico_contam_consultas_criadas(client, cabecalhos_medico, ids):
+    url = "/api/v1/estatisticas/medico"
+    antes = client.get(url, headers=cabecalhos_medico)
+    assert antes.status_code == 200
+    total = antes.json()["resumo"]["total_consultas"]
+
+    resposta = client.post(
+        "/api/v1/consultas/",
+        json={"descricao": "Retorno", "paciente_id": ids["paciente"]},
+        headers=cabecalhos_medico
+    )
+    assert resposta.status_code == 200
+    depois = client.get(url, headers={**cabecalhos_medico, "If-None-Match": antes.headers["etag"]})
+    assert depois.status_code == 200
+    assert depois.json()["resumo"]["total_consultas"] == total + 1
+
+    resposta = client.post(
+        "/api/v1/consultas/lote",
+        json=[{"descricao": f"Lote {n}", "paciente_id": ids["paciente"]} for n in range(2)],
+        headers=cabecalhos_medico
+    )
+    assert resposta.status_code == 200
+    assert client.get(url, headers=cabecalhos_medico).json()["resumo"]["total_consultas"] == total + 3
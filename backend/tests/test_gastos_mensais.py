@@ -0,0 +1,36 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.base import SessionLocal
+from app.models.models import Gasto, GastoMensal
+from app.services.gastos_mensais import reconstruir_gastos_mensais
+
+
+def test_reconstrucao_ignora_gastos_sem_chave(client, ids):
+    db = SessionLocal()
+    try:
+        antes = db.execute(select(func.count(), func.sum(GastoMensal.total))).one()
+        sem_chave = [
+            Gasto(descricao="Sem categoria", valor=10.0, categoria=None, paciente_id=ids["paciente"], medico_id=ids["medico"], data=datetime(2024, 1, 5)),
+            Gasto(descricao="Sem data", valor=10.0, categoria="exame", paciente_id=ids["paciente"], medico_id=ids["medico"], data=None),
+        ]
+        db.add_all(sem_chave)
+        db.commit()
+        # Sem data, o default do modelo preencheria a coluna
+        db.execute(Gasto.__table__.update().where(Gasto.id == sem_chave[1].id).values(data=None))
+        db.commit()
+
+        try:
+            # Como na migração 0002: linhas sem chave não violam o NOT NULL de gastos_mensais
+            reconstruir_gastos_mensais(db)
+            quantidade, total = db.execute(select(func.count(), func.sum(GastoMensal.total))).one()
+            assert quantidade == antes[0]
+            assert total == pytest.approx(antes[1])
+        finally:
+            for gasto in sem_chave:
+                db.delete(gasto)
+            db.commit()
+    finally:
+        db.close()
@@ -0,0 +1,61 @@
+import csv
+
+import pytest
+from sqlalchemy import select
+
+from app.models.base import SessionLocal
+from app.models.models import Consulta
+from app.services.importacao import importar
+
+
+class Queda(Exception):
+    pass
+
+
+def test_retomada_nao_duplica_linhas_nem_rejeicoes(client, ids, tmp_path, monkeypatch):
+    # 20 registros, um a cada cinco com paciente inexistente; lotes de 3
+    arquivo = tmp_path / "consultas.csv"
+    with open(arquivo, "w", newline="", encoding="utf-8") as saida:
+        escritor = csv.DictWriter(saida, ["descricao", "paciente_id", "medico_id", "data"])
+        escritor.writeheader()
+        for numero in range(1, 21):
+            escritor.writerow({
+                "descricao": f"Importada {numero} de {arquivo.name}",
+                "paciente_id": 999999 if numero % 5 == 0 else ids["paciente"],
+                "medico_id": ids["medico"],
+                "data": "2024-02-01T09:00:00",
+            })
+    rejeitados = []
+
+    # O processo cai no commit do quarto lote (registros 10 a 12), depois do INSERT
+    db = SessionLocal()
+    commit = db.commit
+    commits = []
+
+    def commit_com_queda():
+        commits.append(None)
+        if len(commits) == 4:
+            raise Queda()
+        commit()
+
+    monkeypatch.setattr(db, "commit", commit_com_queda)
+    try:
+        with pytest.raises(Queda):
+            importar(db, str(arquivo), "consultas", tamanho_lote=3, rejeitar=rejeitados.append, relatar=lambda mensagem: None)
+        db.rollback()
+    finally:
+        db.close()
+    assert [rejeitado["registro"] for rejeitado in rejeitados] == [5]
+
+    db = SessionLocal()
+    try:
+        resumo = importar(db, str(arquivo), "consultas", tamanho_lote=3, rejeitar=rejeitados.append, relatar=lambda mensagem: None)
+        descricoes = db.scalars(
+            select(Consulta.descricao).where(Consulta.descricao.like(f"Importada % de {arquivo.name}"))
+        ).all()
+    finally:
+        db.close()
+
+    assert (resumo["registros"], resumo["inseridos"], resumo["rejeitados"]) == (20, 16, 4)
+    assert sorted(descricoes) == sorted(f"Importada {numero} de {arquivo.name}" for numero in range(1, 21) if numero % 5)
+    assert [rejeitado["registro"] for rejeitado in rejeitados] == [5, 10, 15, 20]
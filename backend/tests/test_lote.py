@@ -0,0 +1,52 @@
+import pytest
+
+from app.models.base import SessionLocal
+from app.models.models import Consulta, Gasto, Medicamento
+
+# (rota, modelo, item válido sem paciente_id, campo que distingue as linhas)
+LOTES = [
+    ("/api/v1/consultas/lote", Consulta, {"descricao": ""}, "descricao"),
+    ("/api/v1/gastos/lote", Gasto, {"descricao": "", "valor": 12.5, "categoria": "exame"}, "descricao"),
+    ("/api/v1/medicamentos/lote", Medicamento, {"nome": "", "descricao": "Lote", "dosagem": "5mg", "frequencia": "8/8h"}, "nome"),
+]
+
+
+@pytest.mark.parametrize("rota, modelo, item, campo", LOTES)
+def test_lote_parcial(client, cabecalhos_medico, ids, rota, modelo, item, campo):
+    # O id do médico não é de um paciente: os dois inválidos são recusados
+    pacientes = [ids["paciente"], 999999, ids["paciente"], ids["medico"], ids["paciente"]]
+    itens = [
+        {**item, campo: f"Item {indice} de {rota}", "paciente_id": paciente_id}
+        for indice, paciente_id in enumerate(pacientes)
+    ]
+
+    resposta = client.post(rota, headers=cabecalhos_medico, json=itens)
+
+    assert resposta.status_code == 200, resposta.text
+    resultado = resposta.json()
+    assert (resultado["criados"], resultado["erros"]) == (3, 2)
+    assert [linha["indice"] for linha in resultado["itens"]] == list(range(len(itens)))
+    for linha in resultado["itens"]:
+        if linha["indice"] in (1, 3):
+            assert linha["id"] is None
+            assert linha["erro"] == "Paciente não encontrado"
+        else:
+            assert linha["id"] is not None and linha["erro"] is None
+
+    # Cada id devolvido é o da linha gravada a partir do item de mesmo índice
+    db = SessionLocal()
+    try:
+        for linha in resultado["itens"]:
+            if linha["id"] is None:
+                continue
+            gravado = db.get(modelo, linha["id"])
+            assert getattr(gravado, campo) == itens[linha["indice"]][campo]
+            assert gravado.medico_id == ids["medico"]
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize("rota, modelo, item, campo", LOTES)
+def test_lote_recusa_paciente(client, cabecalhos_paciente, ids, rota, modelo, item, campo):
+    resposta = client.post(rota, headers=cabecalhos_paciente, json=[{**item, "paciente_id": ids["paciente"]}])
+    assert resposta.status_code == 403
@@ -0,0 +1,13 @@
+import pytest
+
+
+@pytest.mark.parametrize("rota, molde", [
+    ("/api/v1/pacientes/{paciente}/prontuario", "/api/v1/pacientes/{paciente_id}/prontuario"),
+    ("/api/v1/estatisticas/paciente/{paciente}", "/api/v1/estatisticas/paciente/{paciente_id}"),
+    ("/api/v1/consultas/", "/api/v1/consultas/"),
+    ("/api/v1/rota/inexistente", "desconhecida"),
+])
+def test_metricas_rotuladas_pelo_molde_da_rota(client, cabecalhos_medico, ids, rota, molde):
+    client.get(rota.format(**ids), headers=cabecalhos_medico)
+
+    assert f'rota="{molde}"' in client.get("/metrics").text
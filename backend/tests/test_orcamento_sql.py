@@ -0,0 +1,55 @@
+import pytest
+
+from app.core.orcamento_sql import maximo_comandos_sql
+
+# (usuário, rota, comandos SQL com o cache de resultados vazio). Todas as
+# contagens incluem a leitura das versões do escopo feita por condicional,
+# e nenhum comando pode se repetir (N+1).
+ORCAMENTOS = [
+    # Estatísticas
+    ("paciente", "/api/v1/estatisticas/paciente/{paciente}", 3),
+    ("medico", "/api/v1/estatisticas/paciente/{paciente}", 3),
+    ("medico", "/api/v1/estatisticas/medico", 3),
+    ("medico", "/api/v1/estatisticas/gastos/total", 2),
+    ("medico", "/api/v1/estatisticas/gastos/categoria", 2),
+    ("medico", "/api/v1/estatisticas/analise/medias-moveis", 2),
+    ("medico", "/api/v1/estatisticas/analise/percentis", 2),
+    ("medico", "/api/v1/estatisticas/analise/previsao", 2),
+    # Listagens
+    ("medico", "/api/v1/pacientes/", 2),
+    ("medico", "/api/v1/medicamentos/", 2),
+    ("medico", "/api/v1/consultas/", 2),
+    ("medico", "/api/v1/gastos/", 2),
+    ("medico", "/api/v1/gastos/?rapido=true", 2),
+    ("paciente", "/api/v1/consultas/", 2),
+    ("paciente", "/api/v1/gastos/", 2),
+    ("medico", "/api/v1/pacientes/{paciente}/prontuario", 5),
+    # Dashboard: quatro páginas e um SELECT com os totais
+    ("medico", "/api/v1/dashboard/medico", 6),
+]
+
+
+@pytest.fixture
+def cabecalhos(cabecalhos_medico, cabecalhos_paciente) -> dict:
+    return {"medico": cabecalhos_medico, "paciente": cabecalhos_paciente}
+
+
+@pytest.mark.parametrize("usuario, rota, maximo", ORCAMENTOS)
+def test_orcamento_sql(client, cabecalhos, ids, sem_cache, usuario, rota, maximo):
+    # Aquece o cache de usuários autenticados, que não entra na conta
+    client.get("/api/v1/auth/me", headers=cabecalhos[usuario])
+
+    with maximo_comandos_sql(maximo, repeticoes_maximas=1):
+        resposta = client.get(rota.format(**ids), headers=cabecalhos[usuario])
+    assert resposta.status_code == 200, resposta.text
+
+
+@pytest.mark.parametrize("usuario, rota", [(usuario, rota) for usuario, rota, _ in ORCAMENTOS])
+def test_revalidacao_so_le_versoes(client, cabecalhos, ids, usuario, rota):
+    url = rota.format(**ids)
+    etag = client.get(url, headers=cabecalhos[usuario]).headers["etag"]
+
+    # Um 304 não executa as consultas da rota
+    with maximo_comandos_sql(1):
+        resposta = client.get(url, headers={**cabecalhos[usuario], "If-None-Match": etag})
+    assert resposta.status_code == 304
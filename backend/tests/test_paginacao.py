@@ -0,0 +1,81 @@
+import pytest
+
+from app.api.v1.paginacao import CABECALHO_PROXIMO_CURSOR, codificar_cursor
+from app.core.config import settings
+
+LISTAGENS = [
+    ("medico", "/api/v1/consultas/"),
+    ("medico", "/api/v1/gastos/"),
+    ("medico", "/api/v1/medicamentos/"),
+    ("medico", "/api/v1/pacientes/"),
+    ("paciente", "/api/v1/consultas/"),
+    ("paciente", "/api/v1/gastos/"),
+]
+
+
+@pytest.fixture(scope="module")
+def cabecalhos(client, cabecalhos_medico, cabecalhos_paciente, ids) -> dict:
+    # Os lotes gravam todos os itens com a mesma data: empates em (data, id)
+    # que atravessam as páginas
+    for rota, item in [
+        ("/api/v1/consultas/lote", {"descricao": "Retorno", "paciente_id": ids["paciente"]}),
+        ("/api/v1/gastos/lote", {"descricao": "Exame", "valor": 50.0, "categoria": "exame", "paciente_id": ids["paciente"]}),
+    ]:
+        resposta = client.post(rota, headers=cabecalhos_medico, json=[item] * 5)
+        assert resposta.status_code == 200, resposta.text
+    # Medicamentos e pacientes são paginados só por id; basta haver mais de uma página
+    for numero in range(3):
+        resposta = client.post("/api/v1/medicamentos/", headers=cabecalhos_medico, json={
+            "nome": f"Medicamento {numero}", "descricao": "Uso contínuo", "dosagem": "10mg",
+            "frequencia": "1x ao dia", "paciente_id": ids["paciente"],
+        })
+        assert resposta.status_code == 200, resposta.text
+        resposta = client.post("/api/v1/auth/register", json={
+            "email": f"paginacao{numero}@teste.com", "nome": f"Paciente {numero}", "tipo": "paciente", "senha": "senha123"
+        })
+        assert resposta.status_code == 200, resposta.text
+    return {"medico": cabecalhos_medico, "paciente": cabecalhos_paciente}
+
+
+def _todas_as_paginas(client, url: str, cabecalhos: dict, params: dict) -> list:
+    itens, cursor = [], None
+    while True:
+        resposta = client.get(url, headers=cabecalhos, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert resposta.status_code == 200, resposta.text
+        pagina = resposta.json()
+        assert len(pagina) <= params["limite"]
+        itens.extend(pagina)
+        cursor = resposta.headers.get(CABECALHO_PROXIMO_CURSOR)
+        if not cursor:
+            return itens
+
+
+@pytest.mark.parametrize("usuario, rota", LISTAGENS)
+@pytest.mark.parametrize("ordem", ["asc", "desc"])
+@pytest.mark.parametrize("rapido", [False, True])
+@pytest.mark.parametrize("limite", [2, 3])
+def test_paginas_cobrem_a_lista(client, cabecalhos, usuario, rota, ordem, rapido, limite):
+    params = {"ordem": ordem, "rapido": str(rapido).lower()}
+    completa = client.get(rota, headers=cabecalhos[usuario], params={**params, "limite": settings.PAGINACAO_LIMITE_MAXIMO})
+    assert CABECALHO_PROXIMO_CURSOR not in completa.headers
+    esperado = completa.json()
+    assert len(esperado) > limite
+
+    paginado = _todas_as_paginas(client, rota, cabecalhos[usuario], {**params, "limite": limite})
+
+    assert paginado == esperado
+    chaves = [(item.get("data", ""), item["id"]) for item in esperado]
+    assert chaves == sorted(chaves, reverse=ordem == "desc")
+
+
+@pytest.mark.parametrize("cursor", [
+    "não é base64",
+    codificar_cursor(["2024-01-01T00:00:00"]),
+    codificar_cursor(["ontem", 1]),
+    codificar_cursor(["2024-01-01T00:00:00", "um"]),
+    codificar_cursor({"id": 1}),
+])
+def test_cursor_malformado(client, cabecalhos, cursor):
+    resposta = client.get("/api/v1/consultas/", headers=cabecalhos["medico"], params={"cursor": cursor})
+    assert resposta.status_code == 400
+    assert resposta.json()["detail"] == "Cursor inválido"
@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { useAuth } from '../contexts/AuthContext';
 import { ProntuarioModal } from '../components/ProntuarioModal';
 import { Sidebar } from '../components/Sidebar';
+import { buscarPagina } from '../utils/paginacao';
 
 interface Paciente {
   id: number;
@@ -38,6 +39,8 @@ interface Gasto {
   medico_id: number;
 }
 
+type Lista = 'pacientes' | 'medicamentos' | 'consultas' | 'gastos';
+
 export function MedicoDashboard() {
   const { token, user } = useAuth();
   const [activeTab, setActiveTab] = useState('pacientes');
@@ -45,6 +48,8 @@ export function MedicoDashboard() {
   const [medicamentos, setMedicamentos] = useState<Medicamento[]>([]);
   const [consultas, setConsultas] = useState<Consulta[]>([]);
   const [gastos, setGastos] = useState<Gasto[]>([]);
+  // Cursor da próxima página de cada lista (ausente quando a lista já está completa)
+  const [cursores, setCursores] = useState<Partial<Record<Lista, string>>>({});
   const [error, setError] = useState('');
   const [success, setSuccess] = useState('');
   const [loading, setLoading] = useState({
@@ -52,7 +57,8 @@ export function MedicoDashboard() {
     medicamentos: false,
     consultas: false,
     gastos: false,
-    submit: false
+    submit: false,
+    mais: false
   });
   const [selectedPaciente, setSelectedPaciente] = useState<Paciente | null>(null);
   const [isProntuarioOpen, setIsProntuarioOpen] = useState(false);
@@ -84,73 +90,62 @@ export function MedicoDashboard() {
   };
 
   useEffect(() => {
-    fetchPacientes();
-    fetchMedicamentos();
-    fetchConsultas();
-    fetchGastos();
+    fetchDashboard();
   }, [token]);
 
-  const fetchPacientes = async () => {
+  // Pacientes, medicamentos, consultas e gastos em uma única requisição
+  const fetchDashboard = async () => {
     try {
-      setLoading(prev => ({ ...prev, pacientes: true }));
-      const response = await fetch('http://localhost:8000/api/v1/pacientes/', {
+      setLoading(prev => ({ ...prev, pacientes: true, medicamentos: true, consultas: true, gastos: true }));
+      const response = await fetch('http://localhost:8000/api/v1/dashboard/medico', {
         headers: { 'Authorization': `Bearer ${token}` }
       });
+      if (!response.ok) throw new Error('Erro ao buscar dados do dashboard');
       const data = await response.json();
-      setPacientes(data);
+      setPacientes(data.pacientes);
+      setMedicamentos(data.medicamentos);
+      setConsultas(data.consultas);
+      setGastos(data.gastos);
+      setCursores(data.cursores ?? {});
     } catch (error) {
-      console.error('Erro ao buscar pacientes:', error);
-      showError('Erro ao buscar pacientes');
+      console.error('Erro ao buscar dados do dashboard:', error);
+      showError('Erro ao buscar dados do dashboard');
     } finally {
-      setLoading(prev => ({ ...prev, pacientes: false }));
+      setLoading(prev => ({ ...prev, pacientes: false, medicamentos: false, consultas: false, gastos: false }));
     }
   };
 
-  const fetchMedicamentos = async () => {
+  // Próxima página da lista, pela rota de listagem correspondente
+  const carregarMais = async (lista: Lista) => {
+    const cursor = cursores[lista];
+    if (!cursor) return;
     try {
-      setLoading(prev => ({ ...prev, medicamentos: true }));
-      const response = await fetch('http://localhost:8000/api/v1/medicamentos/', {
-        headers: { 'Authorization': `Bearer ${token}` }
-      });
-      const data = await response.json();
-      setMedicamentos(data);
+      setLoading(prev => ({ ...prev, mais: true }));
+      const url = `http://localhost:8000/api/v1/${lista}/`;
+      let proximoCursor: string | null;
+      if (lista === 'pacientes') {
+        const pagina = await buscarPagina<Paciente>(url, token, cursor);
+        setPacientes(prev => [...prev, ...pagina.itens]);
+        proximoCursor = pagina.proximoCursor;
+      } else if (lista === 'medicamentos') {
+        const pagina = await buscarPagina<Medicamento>(url, token, cursor);
+        setMedicamentos(prev => [...prev, ...pagina.itens]);
+        proximoCursor = pagina.proximoCursor;
+      } else if (lista === 'consultas') {
+        const pagina = await buscarPagina<Consulta>(url, token, cursor);
+        setConsultas(prev => [...prev, ...pagina.itens]);
+        proximoCursor = pagina.proximoCursor;
+      } else {
+        const pagina = await buscarPagina<Gasto>(url, token, cursor);
+        setGastos(prev => [...prev, ...pagina.itens]);
+        proximoCursor = pagina.proximoCursor;
+      }
+      setCursores(prev => ({ ...prev, [lista]: proximoCursor ?? undefined }));
     } catch (error) {
-      console.error('Erro ao buscar medicamentos:', error);
-      showError('Erro ao buscar medicamentos');
+      console.error(`Erro ao carregar mais ${lista}:`, error);
+      showError(`Erro ao carregar mais ${lista}`);
     } finally {
-      setLoading(prev => ({ ...prev, medicamentos: false }));
-    }
-  };
-
-  const fetchConsultas = async () => {
-    try {
-      setLoading(prev => ({ ...prev, consultas: true }));
-      const response = await fetch('http://localhost:8000/api/v1/consultas/', {
-        headers: { 'Authorization': `Bearer ${token}` }
-      });
-      const data = await response.json();
-      setConsultas(data);
-    } catch (error) {
-      console.error('Erro ao buscar consultas:', error);
-      showError('Erro ao buscar consultas');
-    } finally {
-      setLoading(prev => ({ ...prev, consultas: false }));
-    }
-  };
-
-  const fetchGastos = async () => {
-    try {
-      setLoading(prev => ({ ...prev, gastos: true }));
-      const response = await fetch('http://localhost:8000/api/v1/gastos/', {
-        headers: { 'Authorization': `Bearer ${token}` }
-      });
-      const data = await response.json();
-      setGastos(data);
-    } catch (error) {
-      console.error('Erro ao buscar gastos:', error);
-      showError('Erro ao buscar gastos');
-    } finally {
-      setLoading(prev => ({ ...prev, gastos: false }));
+      setLoading(prev => ({ ...prev, mais: false }));
     }
   };
 
@@ -170,9 +165,10 @@ export function MedicoDashboard() {
         })
       });
       if (!response.ok) throw new Error('Erro ao criar paciente');
+      const paciente = await response.json();
       showSuccess('Paciente criado com sucesso!');
       setNovoPaciente({ nome: '', email: '', senha: '' });
-      fetchPacientes();
+      setPacientes(prev => [paciente, ...prev]);
     } catch (error) {
       showError('Erro ao criar paciente');
     } finally {
@@ -196,9 +192,10 @@ export function MedicoDashboard() {
         })
       });
       if (!response.ok) throw new Error('Erro ao criar medicamento');
+      const medicamento = await response.json();
       showSuccess('Medicamento criado com sucesso!');
       setNovoMedicamento({ nome: '', descricao: '', dosagem: '', frequencia: '', paciente_id: '' });
-      fetchMedicamentos();
+      setMedicamentos(prev => [medicamento, ...prev]);
     } catch (error) {
       showError('Erro ao criar medicamento');
     } finally {
@@ -222,9 +219,10 @@ export function MedicoDashboard() {
         })
       });
       if (!response.ok) throw new Error('Erro ao criar consulta');
+      const consulta = await response.json();
       showSuccess('Consulta criada com sucesso!');
       setNovaConsulta({ descricao: '', paciente_id: '' });
-      fetchConsultas();
+      setConsultas(prev => [consulta, ...prev]);
     } catch (error) {
       showError('Erro ao criar consulta');
     } finally {
@@ -249,9 +247,10 @@ export function MedicoDashboard() {
         })
       });
       if (!response.ok) throw new Error('Erro ao registrar gasto');
+      const gasto = await response.json();
       showSuccess('Gasto registrado com sucesso!');
       setNovoGasto({ descricao: '', valor: '', categoria: '', paciente_id: '' });
-      fetchGastos();
+      setGastos(prev => [gasto, ...prev]);
     } catch (error) {
       showError('Erro ao registrar gasto');
     } finally {
@@ -270,7 +269,7 @@ export function MedicoDashboard() {
       });
       if (!response.ok) throw new Error('Erro ao excluir medicamento');
       showSuccess('Medicamento excluído com sucesso!');
-      fetchMedicamentos();
+      setMedicamentos(prev => prev.filter(medicamento => medicamento.id !== id));
     } catch (error) {
       showError('Erro ao excluir medicamento');
     } finally {
@@ -289,7 +288,7 @@ export function MedicoDashboard() {
       });
       if (!response.ok) throw new Error('Erro ao excluir consulta');
       showSuccess('Consulta excluída com sucesso!');
-      fetchConsultas();
+      setConsultas(prev => prev.filter(consulta => consulta.id !== id));
     } catch (error) {
       showError('Erro ao excluir consulta');
     } finally {
@@ -308,7 +307,7 @@ export function MedicoDashboard() {
       });
       if (!response.ok) throw new Error('Erro ao excluir gasto');
       showSuccess('Gasto excluído com sucesso!');
-      fetchGastos();
+      setGastos(prev => prev.filter(gasto => gasto.id !== id));
     } catch (error) {
       showError('Erro ao excluir gasto');
     } finally {
@@ -772,6 +771,22 @@ export function MedicoDashboard() {
                   )}
                 </div>
               )}
+
+              {cursores[activeTab as Lista] && !loading[activeTab as Lista] && (
+                <button
+                  onClick={() => carregarMais(activeTab as Lista)}
+                  disabled={loading.mais}
+                  className="mt-4 w-full py-2 px-4 border border-red-600 text-red-600 rounded-lg hover:bg-red-50 transition-colors disabled:opacity-50"
+                >
+                  {loading.mais ? (
+                    <div className="flex items-center justify-center">
+                      <div className="animate-spin rounded-full h-5 w-5 border-b-2 border-red-600"></div>
+                    </div>
+                  ) : (
+                    'Carregar mais'
+                  )}
+                </button>
+              )}
             </div>
           </div>
 
@@ -12,6 +12,7 @@ import {
   Legend
 } from 'chart.js';
 import { Sidebar } from '../components/Sidebar';
+import { buscarTodasPaginas } from '../utils/paginacao';
 
 ChartJS.register(
   CategoryScale,
@@ -103,10 +104,8 @@ export function PacienteDashboard() {
   const fetchMedicamentos = async () => {
     try {
       setLoading(prev => ({ ...prev, medicamentos: true }));
-      const response = await fetch('http://localhost:8000/api/v1/medicamentos/', {
-        headers: { 'Authorization': `Bearer ${token}` }
-      });
-      const data = await response.json();
+      // A listagem é paginada: segue X-Proximo-Cursor até a última página
+      const data = await buscarTodasPaginas<Medicamento>('http://localhost:8000/api/v1/medicamentos/?limite=1000', token);
       setMedicamentos(data);
     } catch (error) {
       console.error('Erro ao buscar medicamentos:', error);
@@ -119,10 +118,7 @@ export function PacienteDashboard() {
   const fetchConsultas = async () => {
     try {
       setLoading(prev => ({ ...prev, consultas: true }));
-      const response = await fetch('http://localhost:8000/api/v1/consultas/', {
-        headers: { 'Authorization': `Bearer ${token}` }
-      });
-      const data = await response.json();
+      const data = await buscarTodasPaginas<Consulta>('http://localhost:8000/api/v1/consultas/?limite=1000', token);
       setConsultas(data);
     } catch (error) {
       console.error('Erro ao buscar consultas:', error);
@@ -135,10 +131,7 @@ export function PacienteDashboard() {
   const fetchGastos = async () => {
     try {
       setLoading(prev => ({ ...prev, gastos: true }));
-      const response = await fetch('http://localhost:8000/api/v1/gastos/', {
-        headers: { 'Authorization': `Bearer ${token}` }
-      });
-      const data = await response.json();
+      const data = await buscarTodasPaginas<Gasto>('http://localhost:8000/api/v1/gastos/?limite=1000', token);
       setGastos(data);
     } catch (error) {
       console.error('Erro ao buscar gastos:', error);
@@ -48,29 +48,15 @@ export function ProntuarioPaciente() {
       setLoading(true);
       setError('');
 
-      // Buscar dados do paciente
-      const pacienteResponse = await fetch(`http://localhost:8000/api/v1/pacientes/${id}`, {
+      // Paciente, medicamentos e consultas em uma única requisição
+      const response = await fetch(`http://localhost:8000/api/v1/pacientes/${id}/prontuario`, {
         headers: { 'Authorization': `Bearer ${token}` }
       });
-      if (!pacienteResponse.ok) throw new Error('Erro ao buscar dados do paciente');
-      const pacienteData = await pacienteResponse.json();
-      setPaciente(pacienteData);
-
-      // Buscar medicamentos do paciente
-      const medicamentosResponse = await fetch(`http://localhost:8000/api/v1/medicamentos/paciente/${id}`, {
-        headers: { 'Authorization': `Bearer ${token}` }
-      });
-      if (!medicamentosResponse.ok) throw new Error('Erro ao buscar medicamentos');
-      const medicamentosData = await medicamentosResponse.json();
-      setMedicamentos(medicamentosData);
-
-      // Buscar consultas do paciente
-      const consultasResponse = await fetch(`http://localhost:8000/api/v1/consultas/paciente/${id}`, {
-        headers: { 'Authorization': `Bearer ${token}` }
-      });
-      if (!consultasResponse.ok) throw new Error('Erro ao buscar consultas');
-      const consultasData = await consultasResponse.json();
-      setConsultas(consultasData);
+      if (!response.ok) throw new Error('Erro ao buscar prontuário do paciente');
+      const prontuario = await response.json();
+      setPaciente(prontuario.paciente);
+      setMedicamentos(prontuario.medicamentos);
+      setConsultas(prontuario.consultas);
 
     } catch (error) {
       console.error('Erro ao carregar dados:', error);
@@ -0,0 +1,34 @@
+// Cabeçalho em que as listagens da API devolvem o cursor da próxima página
+// (ausente na última página)
+export const CABECALHO_PROXIMO_CURSOR = 'X-Proximo-Cursor';
+
+export interface Pagina<T> {
+  itens: T[];
+  proximoCursor: string | null;
+}
+
+// Busca uma página de uma listagem; sem cursor, a primeira
+export async function buscarPagina<T>(url: string, token: string | null, cursor?: string | null): Promise<Pagina<T>> {
+  const endereco = new URL(url);
+  if (cursor) endereco.searchParams.set('cursor', cursor);
+  const response = await fetch(endereco.toString(), {
+    headers: { 'Authorization': `Bearer ${token}` }
+  });
+  if (!response.ok) throw new Error(`Erro ${response.status} ao buscar ${url}`);
+  return {
+    itens: await response.json(),
+    proximoCursor: response.headers.get(CABECALHO_PROXIMO_CURSOR)
+  };
+}
+
+// Busca todas as páginas de uma listagem, seguindo o cursor até o fim
+export async function buscarTodasPaginas<T>(url: string, token: string | null): Promise<T[]> {
+  const itens: T[] = [];
+  let cursor: string | null = null;
+  do {
+    const pagina: Pagina<T> = await buscarPagina<T>(url, token, cursor);
+    itens.push(...pagina.itens);
+    cursor = pagina.proximoCursor;
+  } while (cursor);
+  return itens;
+}